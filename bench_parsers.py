@@ -0,0 +1,63 @@
+# bench_parsers.py
+"""
+比较各 HTML 解析后端在离线快照上的解析耗时
+
+对 fixtures/html 中每个交易所的页面快照，分别用每个已安装的后端执行
+parse_news_html（解析 + 提取 + 时间格式化），输出平均耗时、相对 html.parser 的加速比，
+并检查各后端解析结果一致。同时给出在页面中提取列表（SCRAPER_IN_PAGE_EXTRACT）时
+传回 Python 的数据量与整个页面 HTML 的对比。
+
+用法: python bench_parsers.py [--repeat 5]
+"""
+import argparse
+import json
+import time
+
+from exchange_scraper import EXCHANGE_CONFIGS, parse_news_html
+from fixtures import load_html_fixture
+from html_parser import available_backends
+from news_scraper import format_news_time
+
+
+def time_backend(html, config, backend, repeat):
+    """返回 (平均耗时秒, 解析结果)"""
+    news_list = parse_news_html(html, config, backend=backend, format_time=format_news_time)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse_news_html(html, config, backend=backend, format_time=format_news_time)
+    return (time.perf_counter() - start) / repeat, news_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 解析后端基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个后端重复解析的次数")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"已安装的解析后端: {', '.join(backends)}\n")
+    print(f"{'交易所':<10}{'页面大小':>10}{'后端':>14}{'条数':>6}{'耗时(ms)':>11}{'加速比':>8}")
+
+    for name, config in EXCHANGE_CONFIGS.items():
+        html = load_html_fixture(name)
+        if html is None:
+            continue
+        results = {backend: time_backend(html, config, backend, args.repeat) for backend in backends}
+        baseline = results["html.parser"][0]
+        for backend, (seconds, news_list) in results.items():
+            print(f"{name:<10}{len(html) / 1024:>8.0f}KB{backend:>14}{len(news_list):>6}"
+                  f"{seconds * 1000:>11.1f}{baseline / seconds:>7.1f}x")
+
+        # 相对时间（如 "2 hours ago"）按解析时的当前时间换算，比较时只比较标题和链接
+        reference = results["html.parser"][1]
+        for backend, (_, news_list) in results.items():
+            if [(n["title"], n["link"]) for n in news_list] != [(n["title"], n["link"]) for n in reference]:
+                print(f"⚠️ {name} {backend} 的解析结果与 html.parser 不一致")
+
+        # 页面内提取只传回每项的标题、链接和时间
+        rows = [{"title": item["title"], "link": item["link"], "time": item["time"]} for item in reference]
+        in_page_bytes = len(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+        print(f"{'':<10}页面内提取传回 {in_page_bytes / 1024:.1f} KB，整个页面 HTML {len(html.encode('utf-8')) / 1024:.0f} KB\n")
+
+
+if __name__ == "__main__":
+    main()
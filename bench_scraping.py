@@ -0,0 +1,169 @@
+# bench_scraping.py
+"""
+离线抓取基准测试：在 fixtures 中的页面快照和接口响应上测量每个抓取源的解析成本
+
+- HTML 抓取源：分别计时 解析（构建 DOM）、提取（选择器）和 format_news_time
+- JSON 抓取源（Bybit 和 source_adapters 中的接口）：分别计时 JSON 解码和提取（含时间格式化）
+
+输出每个抓取源的各阶段耗时、每秒处理条数和峰值内存。
+--save 保存结果，--baseline 与保存的结果比较，任一抓取源变慢超过 --tolerance 时以非零状态退出，
+可以在部署前发现性能退化。不访问网络。
+
+用法:
+    python bench_scraping.py --save bench_baseline.json
+    python bench_scraping.py --baseline bench_baseline.json --tolerance 0.25
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+from exchange_scraper import EXCHANGE_CONFIGS, extract_news_data
+from fixtures import json_fixture_path, load_html_fixture
+from html_parser import parse_html, resolve_backend
+from news_scraper import format_news_time, parse_bybit_announcements
+from source_adapters import API_ADAPTERS
+
+
+def _keep_raw_time(news_time):
+    return news_time
+
+
+def html_pipeline(html, config, backend):
+    """返回每个阶段的函数，后一阶段使用前一阶段的结果"""
+    def parse(_):
+        return parse_html(html, backend)
+
+    def extract(root):
+        items = root.select(config.selectors['list'])
+        return [news for news in (extract_news_data(item, config, _keep_raw_time) for item in items) if news]
+
+    def format_times(news_list):
+        return [{**news, "time": format_news_time(news["time"])} for news in news_list]
+
+    return [("parse", parse), ("extract", extract), ("format", format_times)]
+
+
+def json_pipeline(text, parse_response):
+    def decode(_):
+        return json.loads(text)
+
+    def extract(data):
+        return parse_response(data)
+
+    return [("decode", decode), ("extract", extract)]
+
+
+def run_pipeline(stages):
+    result = None
+    for _, stage in stages:
+        result = stage(result)
+    return result
+
+
+def measure(stages, repeat):
+    """
+    Returns:
+        dict: 各阶段平均耗时（毫秒）、总耗时、条数、每秒条数和峰值内存（KB）
+    """
+    timings = {name: 0.0 for name, _ in stages}
+    with contextlib.redirect_stdout(io.StringIO()):
+        news_list = run_pipeline(stages)
+        for _ in range(repeat):
+            result = None
+            for name, stage in stages:
+                start = time.perf_counter()
+                result = stage(result)
+                timings[name] += time.perf_counter() - start
+
+        # 单独运行一次统计峰值内存，避免 tracemalloc 影响计时
+        tracemalloc.start()
+        run_pipeline(stages)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    stage_ms = {name: seconds / repeat * 1000 for name, seconds in timings.items()}
+    total_ms = sum(stage_ms.values())
+    return {
+        "items": len(news_list),
+        "stages_ms": {name: round(ms, 3) for name, ms in stage_ms.items()},
+        "total_ms": round(total_ms, 3),
+        "items_per_second": round(len(news_list) / (total_ms / 1000), 1) if total_ms else None,
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+def build_cases(backend):
+    cases = {}
+    for name, config in EXCHANGE_CONFIGS.items():
+        html = load_html_fixture(name)
+        if html is not None:
+            cases[f"{name}/html"] = html_pipeline(html, config, backend)
+
+    parsers = {"Bybit": parse_bybit_announcements}
+    parsers.update({name: adapter.parse for name, adapter in API_ADAPTERS.items()})
+    for name, parse_response in parsers.items():
+        try:
+            with open(json_fixture_path(name), encoding="utf-8") as f:
+                cases[f"{name}/api"] = json_pipeline(f.read(), parse_response)
+        except FileNotFoundError:
+            continue
+    return cases
+
+
+def compare(results, baseline, tolerance, min_ms):
+    """返回比基准慢超过 tolerance（且绝对差值超过 min_ms，避免亚毫秒级的计时抖动）的抓取源"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        slower_ms = result["total_ms"] - base["total_ms"]
+        if slower_ms > base["total_ms"] * tolerance and slower_ms > min_ms:
+            regressions.append((key, base["total_ms"], result["total_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线抓取基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个抓取源重复执行的次数")
+    parser.add_argument("--backend", default=None, help="HTML 解析后端，默认使用 SCRAPER_HTML_PARSER")
+    parser.add_argument("--save", help="将结果保存为 JSON 文件")
+    parser.add_argument("--baseline", help="与之前保存的结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的变慢比例")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="变慢不超过该毫秒数时不视为退化")
+    args = parser.parse_args()
+
+    backend = resolve_backend(args.backend)
+    print(f"HTML 解析后端: {backend}\n")
+    print(f"{'抓取源':<16}{'条数':>6}{'阶段耗时(ms)':>40}{'总计(ms)':>10}{'条/秒':>10}{'峰值内存':>12}")
+
+    results = {}
+    for key, stages in build_cases(backend).items():
+        result = measure(stages, args.repeat)
+        results[key] = result
+        stages_text = "  ".join(f"{name} {ms:.2f}" for name, ms in result["stages_ms"].items())
+        print(f"{key:<16}{result['items']:>6}{stages_text:>40}{result['total_ms']:>10.2f}"
+              f"{result['items_per_second']:>10.0f}{result['peak_memory_kb']:>10.0f}KB")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"backend": backend, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_ms)
+        for key, before, after in regressions:
+            print(f"❌ {key} 变慢: {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"\n✅ 与基准相比没有超过 {args.tolerance:.0%} 的性能退化")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# bench_storage.py
+"""
+比较各新闻存储后端的写入和查询吞吐量
+
+对每个后端依次执行：分批写入新新闻、重复写入已存在的新闻（去重）、按交易所查询最新新闻、
+查询未推送新闻、标记已推送，输出每个环节每秒处理的条数（或查询次数）。
+写入前跳过 seen_cache，测量的是存储后端本身的去重开销。
+
+- sqlite: 临时目录中的 SQLite 文件
+- memory: MongoDB 不可用时使用的内存存储
+- mongo: MONGO_URI 指向的 MongoDB，使用单独的 crypto_news_bench 数据库，结束后删除；无法连接时跳过
+
+用法: python bench_storage.py [--count 5000] [--batch 50] [--queries 200] [--backends sqlite,memory,mongo]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from memory_store import MemoryStore
+from news_database import MONGO_URI, MongoNewsStorage, _prepare_documents, ensure_indexes
+from sqlite_storage import SqliteNewsStorage
+
+SOURCES = ["Binance", "OKX", "Bitget", "Bybit", "KuCoin", "Gate.io"]
+
+
+def make_documents(count):
+    news_list = [{
+        "title": f"Benchmark listing announcement #{index}",
+        "link": f"https://example.com/announcement/{index}",
+        "time": "2025-03-01 10:00",
+        "source": SOURCES[index % len(SOURCES)]
+    } for index in range(count)]
+    documents, _ = _prepare_documents(news_list)
+    return documents
+
+
+def open_sqlite(directory):
+    return SqliteNewsStorage(os.path.join(directory, "bench_news.db")), None
+
+
+def open_memory(directory):
+    return MongoNewsStorage(MemoryStore(max_documents=0, snapshot_path="")), None
+
+
+def open_mongo(directory):
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=3000)
+    client.admin.command('ping')
+    collection = client["crypto_news_bench"]["news"]
+    collection.drop()
+    ensure_indexes(collection)
+    return MongoNewsStorage(collection), lambda: client.drop_database("crypto_news_bench")
+
+
+BACKENDS = {"sqlite": open_sqlite, "memory": open_memory, "mongo": open_mongo}
+
+
+def per_second(count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else float("inf")
+
+
+def run(storage, documents, batch, queries):
+    """返回各环节每秒处理的条数 / 查询次数"""
+    batches = [documents[start:start + batch] for start in range(0, len(documents), batch)]
+    unique_ids = [unique_id for unique_id, _ in documents]
+    since = datetime.utcnow() - timedelta(hours=1)
+
+    def insert_all():
+        for items in batches:
+            storage.insert_new(items)
+
+    def query_latest():
+        for index in range(queries):
+            storage.find_latest(SOURCES[index % len(SOURCES)], 20)
+
+    def query_undelivered():
+        for _ in range(max(1, queries // 20)):
+            storage.find_undelivered(since)
+
+    def mark_all():
+        for start in range(0, len(unique_ids), batch):
+            storage.mark_delivered(unique_ids[start:start + batch], datetime.utcnow())
+
+    return {
+        "写入新新闻(条/秒)": per_second(len(documents), insert_all),
+        "重复写入(条/秒)": per_second(len(documents), insert_all),
+        "最新20条(次/秒)": per_second(queries, query_latest),
+        "未推送新闻(次/秒)": per_second(max(1, queries // 20), query_undelivered),
+        "标记已推送(条/秒)": per_second(len(unique_ids), mark_all),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="新闻存储后端基准测试")
+    parser.add_argument("--count", type=int, default=5000, help="写入的新闻数量")
+    parser.add_argument("--batch", type=int, default=50, help="每批写入的新闻数量（相当于一次抓取的结果）")
+    parser.add_argument("--queries", type=int, default=200, help="按交易所查询最新新闻的次数")
+    parser.add_argument("--backends", default="sqlite,memory,mongo", help="要测试的后端，逗号分隔")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.backends.split(","):
+            try:
+                storage, cleanup = BACKENDS[name](directory)
+            except Exception as e:
+                print(f"⚠️ 跳过 {name}: {e}")
+                continue
+            try:
+                results[name] = run(storage, make_documents(args.count), args.batch, args.queries)
+            finally:
+                if cleanup:
+                    cleanup()
+
+    if not results:
+        return
+    metrics = list(next(iter(results.values())))
+    print(f"\n{args.count} 条新闻，每批 {args.batch} 条\n")
+    print(f"{'后端':<10}" + "".join(f"{metric:>18}" for metric in metrics))
+    for name, result in results.items():
+        print(f"{name:<10}" + "".join(f"{result[metric]:>20,.0f}" for metric in metrics))
+
+
+if __name__ == "__main__":
+    main()
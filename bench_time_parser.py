@@ -0,0 +1,121 @@
+# bench_time_parser.py
+"""
+比较 time_parser 与原来逐个尝试 strptime 的时间格式化耗时
+
+样本为 fixtures/html 中各交易所页面快照里的时间文本（外加几种常见格式），
+分别测量原实现、time_parser 未命中缓存（每轮清空缓存）和命中缓存时每条的平均耗时，
+并检查两种实现对绝对时间的解析结果一致。
+
+用法: python bench_time_parser.py [--repeat 200]
+"""
+import argparse
+import contextlib
+import io
+import time
+from datetime import datetime, timedelta
+
+from exchange_scraper import EXCHANGE_CONFIGS, parse_news_html
+from fixtures import load_html_fixture
+from time_parser import _parse_text, format_news_time
+
+EXTRA_SAMPLES = ["2025-02-27", "Published on Feb 20, 2025", "2025-03-03 10:41", "Feb 26, 2025",
+                 "03/12/2025, 03:12:02", "1 hours 6 min 16 sec ago", "2 days ago", "3 minutes ago"]
+
+
+def legacy_format_news_time(news_time):
+    """原 news_scraper.format_news_time：按顺序尝试各格式"""
+    try:
+        if "ago" in news_time.lower():
+            now = datetime.now()
+            parts = news_time.lower().split()
+            if "day" in parts[1]:
+                result_time = now - timedelta(days=int(parts[0]))
+            elif "hour" in parts[1]:
+                minutes = int(parts[2]) if len(parts) > 4 and "min" in parts[3] else 0
+                result_time = now - timedelta(hours=int(parts[0]), minutes=minutes)
+            elif "minute" in parts[1] or "min" in parts[1]:
+                result_time = now - timedelta(minutes=int(parts[0]))
+            elif "second" in parts[1] or "sec" in parts[1]:
+                result_time = now - timedelta(seconds=int(parts[0]))
+            else:
+                return now.strftime("%Y-%m-%d %H:%M:%S UTC")
+            return result_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+    except (ValueError, IndexError):
+        pass
+    try:
+        if len(news_time) == 10:
+            return datetime.strptime(news_time, "%Y-%m-%d").strftime("%Y-%m-%d 00:00:00 UTC")
+    except ValueError:
+        pass
+    try:
+        if news_time.startswith("Published on"):
+            return datetime.strptime(news_time[13:].strip(), "%b %d, %Y").strftime("%Y-%m-%d 00:00:00 UTC")
+    except ValueError:
+        pass
+    try:
+        if len(news_time) > 10:
+            return datetime.strptime(news_time, "%Y-%m-%d %H:%M").strftime("%Y-%m-%d %H:%M:%S UTC")
+    except ValueError:
+        pass
+    try:
+        if len(news_time.split()) == 3:
+            return datetime.strptime(news_time, "%b %d, %Y").strftime("%Y-%m-%d 00:00:00 UTC")
+    except ValueError:
+        pass
+    try:
+        if '/' in news_time and ',' in news_time:
+            return datetime.strptime(news_time.strip(), "%m/%d/%Y, %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S UTC")
+    except ValueError:
+        pass
+    print(f"❌ 无法解析时间: {news_time}")
+    return None
+
+
+def collect_samples():
+    samples = list(EXTRA_SAMPLES)
+    for name, config in EXCHANGE_CONFIGS.items():
+        html = load_html_fixture(name)
+        if html is not None:
+            samples.extend(news["time"] for news in parse_news_html(html, config, format_time=lambda t: t))
+    return samples
+
+
+def time_per_item(func, samples, repeat, before_round=None):
+    """返回每条样本的平均耗时（微秒）"""
+    elapsed = 0.0
+    for _ in range(repeat):
+        if before_round:
+            before_round()
+        start = time.perf_counter()
+        for sample in samples:
+            func(sample)
+        elapsed += time.perf_counter() - start
+    return elapsed / repeat / len(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="时间解析基准测试")
+    parser.add_argument("--repeat", type=int, default=200, help="重复解析全部样本的次数")
+    args = parser.parse_args()
+
+    samples = collect_samples()
+    print(f"样本: {len(samples)} 条，{len(set(samples))} 种不同文本\n")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy = time_per_item(legacy_format_news_time, samples, args.repeat)
+    cold = time_per_item(format_news_time, samples, args.repeat, before_round=_parse_text.cache_clear)
+    warm = time_per_item(format_news_time, samples, args.repeat)
+
+    print(f"{'实现':<24}{'每条耗时(µs)':>14}{'加速比':>8}")
+    for label, micros in (("strptime 逐个尝试", legacy), ("time_parser 未命中缓存", cold), ("time_parser 命中缓存", warm)):
+        print(f"{label:<24}{micros:>14.2f}{legacy / micros:>7.1f}x")
+
+    # 相对时间按解析时的当前时间换算，只比较绝对时间
+    with contextlib.redirect_stdout(io.StringIO()):
+        mismatches = [s for s in samples if "ago" not in s and legacy_format_news_time(s) != format_news_time(s)]
+    for sample in sorted(set(mismatches)):
+        print(f"⚠️ 解析结果不一致: {sample!r}: {legacy_format_news_time(sample)} != {format_news_time(sample)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ from telegram import Update, Bot
 from telegram.ext import Application, CommandHandler, CallbackContext
 from datetime import datetime, timedelta
 import asyncio
+import hashlib
+from delivery_outbox import OutboxDrainer, create_outbox_store
+from telegram_delivery import TelegramDeliveryScheduler
 
 # 在文件顶部的日志设置部分
 # 设置日志
@@ -29,109 +32,194 @@ except ImportError:
     CHAT_IDS = CHAT_IDS_STR.split(',') if CHAT_IDS_STR else []
     logger.info(f"使用环境变量中的 TOKEN 和 CHAT_IDS: {CHAT_IDS}")
 
-# 尝试导入 news_collection 和 lark_bot
+# 尝试导入 news_database 和 lark_bot
 try:
-    from news_database import news_collection
+    from news_database import get_database
+    from news_repository import news_repository, run_blocking
+    # 数据库操作在数据库线程池中执行，不阻塞 Telegram 轮询
+    find_undelivered_news = news_repository.find_undelivered_news
+    mark_delivered = news_repository.mark_delivered
 except ImportError as e:
     logger.error(f"导入 news_database 模块失败: {e}")
-    # 创建一个备用的集合
-    class FallbackCollection:
-        def __init__(self):
-            self.data = []
-        def find(self, query=None):
-            return self.data
-    news_collection = FallbackCollection()
+    # 创建备用函数
+    async def find_undelivered_news():
+        return []
+    async def mark_delivered(unique_ids):
+        pass
+    def get_database():
+        return None
+    async def run_blocking(operation, func, *args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
 
 try:
-    from lark_bot import send_news_to_lark
+    from lark_bot import get_webhook_urls, send_to_webhook
 except ImportError as e:
     logger.error(f"导入 lark_bot 模块失败: {e}")
-    # 创建一个备用的发送函数
-    def send_news_to_lark(message):
+    # 创建备用函数，不推送到 Lark
+    def get_webhook_urls():
+        return []
+    async def send_to_webhook(url, message):
         logger.warning(f"Lark 发送消息失败，无法导入 lark_bot 模块")
+        return False
 
 # 启动 机器人 /start 命令
 async def start(update: Update, context: CallbackContext):
     # logger.info(f"Received /start command from {update.message.chat_id}")  # 日志输出
     await update.message.reply_text('Hello! I am your Crypto News Bot.')
 
-# 修改 send_latest_news 函数中的 MongoDB 查询
-# 修改 send_latest_news 函数，添加消息分割功能
-async def send_latest_news():
-    """
-    从数据库获取最新的新闻，并推送到 Telegram 频道 和 Lark
-    """
-    now = datetime.utcnow()
-    one_hour_ago = now - timedelta(hours=1)
+_delivery_scheduler = None
 
-    # 查询最近 1 小时的新闻
-    try:
-        # 正确使用 sort 方法，使用关键字参数
-        all_news = list(news_collection.find({"created_at": {"$gte": one_hour_ago}}).sort("created_at", -1))
-    except TypeError:
-        # 备用方法，适用于 FallbackCollection
-        logger.warning("使用备用方法获取新闻")
-        all_news = list(news_collection.find({"created_at": {"$gte": one_hour_ago}}))
-
-    if not all_news:
-        print("⚠️ 没有最新新闻，不发送消息")
-        logger.info("没有最新新闻，跳过发送")
-        return
 
-    # 构建消息
-    message_header = f"🔔 最新加密货币新闻 ({len(all_news)}条):\n\n"
-    
-    # 添加每条新闻
-    news_items = []
-    for news in all_news:
-        news_text = f"📌 {news.get('title', '无标题')}\n"
-        news_text += f"🔗 {news.get('link', '#')}\n"
-        news_text += f"📅 {news.get('time', '未知时间')}\n"
-        news_text += f"📰 来源: {news.get('source', '未知来源')}\n\n"
-        news_items.append(news_text)
+def get_delivery_scheduler():
+    """获取与当前 Bot 绑定的推送调度器，全局限速在多次推送之间共享"""
+    global _delivery_scheduler
+    if _delivery_scheduler is None or _delivery_scheduler.bot is not application.bot:
+        _delivery_scheduler = TelegramDeliveryScheduler(application.bot)
+    return _delivery_scheduler
+
+
+def format_news_item(news):
+    """将单条新闻格式化为推送文本"""
+    news_text = f"📌 {news.get('title', '无标题')}\n"
+    news_text += f"🔗 {news.get('link', '#')}\n"
+    news_text += f"📅 {news.get('time', '未知时间')}\n"
+    news_text += f"📰 来源: {news.get('source', '未知来源')}\n\n"
+    return news_text
+
+
+def build_telegram_messages(news_docs):
+    """
+    构建 Telegram 消息，每条消息最多不超过 4000 字符（留出一些余量）
+
+    Returns:
+        list: 消息文本列表
+    """
+    telegram_messages = []
+    current_message = f"🔔 最新加密货币新闻 ({len(news_docs)}条):\n\n"
     
-    # 发送到 Telegram
-    try:
-        # 分割消息，每条消息最多不超过 4000 字符（留出一些余量）
-        telegram_messages = []
-        current_message = message_header
-        
-        for item in news_items:
-            # 如果添加这条新闻后消息长度超过 4000 字符，则创建新消息
-            if len(current_message) + len(item) > 4000:
-                telegram_messages.append(current_message)
-                current_message = f"🔔 最新加密货币新闻 (续):\n\n{item}"
-            else:
-                current_message += item
-        
-        # 添加最后一条消息
-        if current_message:
+    for news in news_docs:
+        item = format_news_item(news)
+        # 如果添加这条新闻后消息长度超过 4000 字符，则创建新消息
+        if len(current_message) + len(item) > 4000:
             telegram_messages.append(current_message)
-        
-        # 发送所有消息
-        for chat_id in CHAT_IDS:
-            for msg in telegram_messages:
-                await application.bot.send_message(chat_id=chat_id, text=msg, disable_web_page_preview=True)
-        
-        print(f"✅ 成功推送 {len(all_news)} 条新闻到 Telegram，共 {len(telegram_messages)} 条消息")
-    except Exception as e:
-        print(f"❌ 发送新闻失败: {e}")
+            current_message = f"🔔 最新加密货币新闻 (续):\n\n{item}"
+        else:
+            current_message += item
     
-    # 发送到 Lark
+    # 添加最后一条消息
+    if current_message:
+        telegram_messages.append(current_message)
+    return telegram_messages
+
+
+async def send_to_telegram_chat(chat_id, news_docs):
+    """推送新闻到一个 Telegram 聊天，返回是否成功"""
+    telegram_messages = build_telegram_messages(news_docs)
+    report = (await get_delivery_scheduler().deliver([chat_id], telegram_messages))[0]
+    logger.info(f"聊天 {chat_id}: 发送 {report.sent} 条消息，重试 {report.retries} 次，耗时 {report.latency:.2f} 秒")
+    return report.ok
+
+
+async def send_to_lark_webhook(url, news_docs):
+    """推送新闻到一个 Lark Webhook，返回是否成功"""
+    lark_message = f"🔔 最新加密货币新闻 ({len(news_docs)}条):\n\n"
+    lark_message += "".join(format_news_item(news) for news in news_docs)
+    return await send_to_webhook(url, lark_message)
+
+
+def get_delivery_channels():
+    """
+    返回所有推送渠道：每个 Telegram 聊天、每个 Lark Webhook 各是一个渠道
+
+    Lark 渠道名称使用 Webhook 地址的哈希，避免在数据库中保存密钥
+
+    Returns:
+        dict: 渠道名称 -> 异步发送函数
+    """
+    channels = {}
+    for chat_id in CHAT_IDS:
+        channels[f"telegram:{chat_id}"] = lambda news_docs, chat_id=chat_id: send_to_telegram_chat(chat_id, news_docs)
+    for url in get_webhook_urls():
+        channel = f"lark:{hashlib.blake2b(url.encode('utf-8'), digest_size=4).hexdigest()}"
+        channels[channel] = lambda news_docs, url=url: send_to_lark_webhook(url, news_docs)
+    return channels
+
+
+_outbox_drainer = None
+_outbox_drainer_lock = asyncio.Lock()
+
+
+async def get_outbox_drainer():
+    """
+    获取进程级共享的推送队列
+
+    首次调用时在数据库线程池中创建队列存储（可能需要连接数据库），不阻塞事件循环
+    """
+    global _outbox_drainer
+    async with _outbox_drainer_lock:
+        if _outbox_drainer is None:
+            # MongoDB 可用时推送队列使用 delivery_outbox 集合
+            store = await run_blocking("outbox_connect", lambda: create_outbox_store(get_database()))
+            _outbox_drainer = OutboxDrainer(store, get_delivery_channels())
+    return _outbox_drainer
+
+
+def peek_outbox_drainer():
+    """返回已创建的推送队列，尚未创建时返回 None（不会连接数据库）"""
+    return _outbox_drainer
+
+
+async def send_news(news_docs):
+    """
+    将新闻加入持久化推送队列，并推送到 Telegram 频道 和 Lark
+
+    新闻先按渠道写入推送队列，然后才清除新闻的待推送标记；推送由队列负责，
+    只有推送成功后才从队列中移除，进程退出或推送失败时会在之后重新推送。
+    后台推送任务已启动时立即返回，否则在当前任务中推送一次。
+    
+    Args:
+        news_docs (list): 新闻文档，通常是 store_news_bulk 返回的 new_documents
+
+    Returns:
+        bool: 是否成功加入推送队列
+    """
+    if not news_docs:
+        logger.info("没有需要推送的新闻，跳过发送")
+        return False
+
+    drainer = await get_outbox_drainer()
     try:
-        # 构建 Lark 消息
-        lark_message = f"🔔 最新加密货币新闻 ({len(all_news)}条):\n\n"
-        for news in all_news:
-            lark_message += f"📌 {news.get('title', '无标题')}\n"
-            lark_message += f"🔗 {news.get('link', '#')}\n"
-            lark_message += f"📅 {news.get('time', '未知时间')}\n"
-            lark_message += f"📰 来源: {news.get('source', '未知来源')}\n\n"
-        
-        # 发送到 Lark
-        send_news_to_lark(lark_message)
-        print(f"✅ 成功推送 {len(all_news)} 条新闻到 Lark")
+        queued = await drainer.enqueue(news_docs)
     except Exception as e:
-        print(f"❌ 发送到 Lark 失败: {e}")
+        # 新闻仍保留待推送标记，下次启动时重新入队
+        print(f"❌ 新闻加入推送队列失败: {e}")
+        return False
+
+    await mark_delivered(news.get("unique_id") for news in news_docs if news.get("unique_id"))
+    print(f"✅ {len(news_docs)} 条新闻已加入 {len(drainer.channels)} 个渠道的推送队列（新增 {queued} 条记录）")
+
+    if not drainer.running:
+        delivered = await drainer.drain_once()
+        print(f"推送结果: {delivered}")
+    return True
+
+
+async def send_latest_news():
+    """
+    将已入库但尚未加入推送队列的新闻重新入队（例如进程在存储后、入队前退出），
+    并推送队列中所有待推送的新闻
+    """
+    pending_news = await find_undelivered_news()
+    if pending_news:
+        logger.info(f"发现 {len(pending_news)} 条未推送的新闻，重新加入推送队列")
+        await send_news(pending_news)
+        return
+
+    drainer = await get_outbox_drainer()
+    if drainer.running:
+        drainer.notify()
+    else:
+        await drainer.drain_once()
 
 # def main():
 #     """启动 Telegram 机器人"""
@@ -0,0 +1,210 @@
+# browser_pool.py
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+# 浏览器启动参数，适配 Railway 等小内存容器
+BROWSER_LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",  # 减少内存使用
+    "--disable-gpu",            # 禁用GPU加速
+    "--single-process"          # 使用单进程模式
+]
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+# 每个交易所的 BrowserContext 最多复用次数和最长存活时间（秒），超过后回收重建
+CONTEXT_MAX_USES = int(os.environ.get('BROWSER_CONTEXT_MAX_USES', '20'))
+CONTEXT_MAX_AGE = int(os.environ.get('BROWSER_CONTEXT_MAX_AGE_SECONDS', '3600'))
+
+
+class PooledContext:
+    """池中的一个 BrowserContext 及其使用情况"""
+
+    def __init__(self, context, options):
+        self.context = context
+        self.options = options
+        self.created_at = time.monotonic()
+        self.uses = 0
+        self.broken = False
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+
+class BrowserPool:
+    """
+    进程级共享的 Chromium 浏览器池
+
+    - Chromium 只启动一次，所有抓取任务共用
+    - 每个交易所使用独立的 BrowserContext（cookie、缓存互相隔离）
+    - BrowserContext 使用 N 次或超过存活时间后回收，浏览器崩溃时自动重启
+    """
+
+    def __init__(self, launch_args=None, max_uses=CONTEXT_MAX_USES, max_age=CONTEXT_MAX_AGE):
+        self.launch_args = launch_args or BROWSER_LAUNCH_ARGS
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._playwright = None
+        self._browser = None
+        self._loop = None
+        self._lock = None
+        self._contexts = {}
+        self.stats = {
+            "launches": 0,          # 浏览器启动次数
+            "context_creates": 0,   # 新建 BrowserContext 次数
+            "context_reuses": 0,    # 复用 BrowserContext 次数
+            "context_recycles": 0,  # 回收 BrowserContext 次数
+            "crashes": 0            # 浏览器或页面崩溃次数
+        }
+
+    def _reset_if_loop_changed(self):
+        """事件循环变化时（例如多次调用 asyncio.run），旧循环中的浏览器已不可用"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._playwright = None
+            self._browser = None
+            self._contexts = {}
+
+    async def _ensure_browser(self):
+        if self._browser and self._browser.is_connected():
+            return self._browser
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        logger.info("启动共享 Chromium 浏览器...")
+        self._browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=self.launch_args,
+            timeout=120000  # 浏览器启动超时时间2分钟
+        )
+        self._browser.on("disconnected", self._on_disconnected)
+        self._contexts = {}
+        self.stats["launches"] += 1
+        return self._browser
+
+    def _on_disconnected(self, browser):
+        if browser is not self._browser:
+            return
+        logger.warning("共享 Chromium 浏览器已断开，下次使用时将重新启动")
+        self.stats["crashes"] += 1
+        self._browser = None
+        self._contexts = {}
+
+    def _on_page_crash(self, name, pooled):
+        logger.warning(f"{name} 页面崩溃，BrowserContext 将被回收")
+        self.stats["crashes"] += 1
+        pooled.broken = True
+
+    async def _acquire_context(self, name, options):
+        self._reset_if_loop_changed()
+        async with self._lock:
+            browser = await self._ensure_browser()
+            pooled = self._contexts.get(name)
+            if pooled and (pooled.broken or pooled.options != options):
+                await self._discard_context(name, pooled)
+                pooled = None
+
+            if pooled is None:
+                context = await browser.new_context(**options)
+                pooled = PooledContext(context, options)
+                self._contexts[name] = pooled
+                self.stats["context_creates"] += 1
+            else:
+                self.stats["context_reuses"] += 1
+
+            pooled.uses += 1
+            return pooled
+
+    async def _release_context(self, name, pooled):
+        if self._contexts.get(name) is not pooled:
+            return
+        if pooled.broken or pooled.uses >= self.max_uses or pooled.age >= self.max_age:
+            await self._discard_context(name, pooled)
+
+    async def _discard_context(self, name, pooled):
+        if self._contexts.get(name) is pooled:
+            del self._contexts[name]
+        self.stats["context_recycles"] += 1
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"关闭 {name} 的 BrowserContext 失败: {e}")
+
+    @asynccontextmanager
+    async def page(self, name, user_agent=None, viewport=None):
+        """
+        从交易所对应的 BrowserContext 中打开一个新页面，退出时自动关闭页面
+
+        Args:
+            name (str): 交易所名称，同名任务共用一个 BrowserContext
+            user_agent (str): 自定义 User-Agent
+            viewport (dict): 页面视口大小，例如 {"width": 1920, "height": 1080}
+        """
+        options = {"user_agent": user_agent or DEFAULT_USER_AGENT}
+        if viewport:
+            options["viewport"] = viewport
+
+        pooled = await self._acquire_context(name, options)
+        try:
+            page = await pooled.context.new_page()
+        except Exception:
+            pooled.broken = True
+            await self._release_context(name, pooled)
+            raise
+        page.on("crash", lambda _: self._on_page_crash(name, pooled))
+
+        try:
+            yield page
+        finally:
+            try:
+                await page.close()
+            except Exception as e:
+                logger.debug(f"关闭 {name} 页面失败: {e}")
+            await self._release_context(name, pooled)
+
+    def get_stats(self):
+        """
+        获取浏览器池统计信息
+
+        Returns:
+            dict: 启动次数、复用次数以及每个 BrowserContext 的使用次数和存活时间
+        """
+        return {
+            **self.stats,
+            "browser_connected": bool(self._browser and self._browser.is_connected()),
+            "contexts": {
+                name: {"uses": pooled.uses, "age_seconds": round(pooled.age, 1)}
+                for name, pooled in self._contexts.items()
+            }
+        }
+
+    async def close(self):
+        """关闭所有 BrowserContext、浏览器和 Playwright"""
+        for name, pooled in list(self._contexts.items()):
+            await self._discard_context(name, pooled)
+        if self._browser:
+            browser, self._browser = self._browser, None
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器失败: {e}")
+        if self._playwright:
+            playwright, self._playwright = self._playwright, None
+            await playwright.stop()
+
+
+# 进程级共享实例
+browser_pool = BrowserPool()
@@ -0,0 +1,177 @@
+# change_detector.py
+import hashlib
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# 设置 SCRAPER_CHANGE_DETECTION=off 可关闭变化检测，每次都完整解析
+CHANGE_DETECTION_ENABLED = os.environ.get('SCRAPER_CHANGE_DETECTION', 'on').lower() not in ('off', 'false', '0')
+
+# 距离上次完整解析超过该时间（秒）后，即使内容未变化也强制完整解析一次
+CHANGE_DETECTION_MAX_AGE = int(os.environ.get('SCRAPER_CHANGE_MAX_AGE_SECONDS', '1800'))
+
+# get_json 在服务器返回 304 或响应内容与上次相同时返回该值
+NOT_MODIFIED = object()
+
+# 在页面中提取公告列表区域的文本和链接，只把这部分内容传回 Python 计算哈希
+LIST_REGION_SCRIPT = "els => els.map(e => (e.textContent || '') + '\\u001f' + (e.getAttribute('href') || '')).join('\\u001e')"
+
+
+def change_key(name, path):
+    """
+    变化检测的键：同一交易所的接口抓取（"api"）和浏览器抓取（"browser"）分别记录，
+    避免一种方式记录的哈希让另一种方式的结果被当作未变化而跳过
+    """
+    return f"{name}:{path}"
+
+
+class UnchangedNews(list):
+    """
+    公告列表与上次相同时抓取函数返回的空列表
+
+    调用方可以按普通空列表处理；调度器据此跳过备用抓取方式和存储
+    """
+
+
+def content_digest(content):
+    """计算内容哈希（bytes 或 str）"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class ChangeState:
+    """单个抓取源上次完整解析时的内容哈希和 HTTP 缓存校验信息"""
+
+    def __init__(self, digest=None, etag=None, last_modified=None):
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.parsed_at = time.monotonic()
+
+
+class ChangeDetector:
+    """
+    按抓取源记录公告列表的内容哈希，以及 HTTP 响应的 ETag / Last-Modified
+
+    check() 判断本次内容是否与上次相同；内容变化时先暂存新的哈希，
+    解析成功后调用 commit() 才生效，解析失败时下次仍会完整解析。
+    解析出的新闻存储失败时调用方需调用 forget_source()，否则这些新闻会在之后被当作未变化而跳过。
+
+    Args:
+        max_age (int): 距离上次完整解析超过该时间（秒）后不再跳过
+        enabled (bool): 是否启用变化检测
+    """
+
+    def __init__(self, max_age=CHANGE_DETECTION_MAX_AGE, enabled=CHANGE_DETECTION_ENABLED):
+        self.max_age = max_age
+        self.enabled = enabled
+        self._states = {}
+        self._pending = {}
+        self._stats = {}
+
+    def _count(self, key, field):
+        stats = self._stats.setdefault(key, {"unchanged": 0, "not_modified": 0, "changed": 0})
+        stats[field] += 1
+
+    def _fresh_state(self, key):
+        state = self._states.get(key)
+        if not self.enabled or state is None:
+            return None
+        if time.monotonic() - state.parsed_at > self.max_age:
+            return None
+        return state
+
+    def conditional_headers(self, key):
+        """
+        返回条件请求头（If-None-Match / If-Modified-Since）
+
+        Returns:
+            dict: 没有可用的校验信息时返回空字典
+        """
+        state = self._fresh_state(key)
+        headers = {}
+        if state and state.etag:
+            headers["If-None-Match"] = state.etag
+        if state and state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        return headers
+
+    def not_modified(self, key):
+        """记录服务器返回 304"""
+        self._count(key, "not_modified")
+        logger.info(f"{key} 返回 304，公告列表未变化")
+
+    def check(self, key, digest, etag=None, last_modified=None):
+        """
+        判断内容是否与上次完整解析时相同
+
+        Returns:
+            bool: 相同时返回 True；不同时暂存新的状态，等待 commit()
+        """
+        state = self._fresh_state(key)
+        if state and state.digest == digest:
+            self._count(key, "unchanged")
+            logger.info(f"{key} 公告列表未变化，跳过解析")
+            return True
+        self._count(key, "changed")
+        self._pending[key] = ChangeState(digest, etag, last_modified)
+        return False
+
+    def commit(self, key):
+        """解析成功后保存暂存的状态"""
+        state = self._pending.pop(key, None)
+        if state:
+            state.parsed_at = time.monotonic()
+            self._states[key] = state
+
+    def forget(self, key=None):
+        """清除抓取源的状态，下次强制完整解析"""
+        if key is None:
+            self._states.clear()
+            self._pending.clear()
+        else:
+            self._states.pop(key, None)
+            self._pending.pop(key, None)
+
+    def forget_source(self, name):
+        """清除一个交易所所有抓取方式的状态（例如新闻存储失败时），下次强制完整解析"""
+        for key in [key for key in {*self._states, *self._pending} if key == name or key.startswith(f"{name}:")]:
+            self.forget(key)
+
+    def stats(self):
+        """
+        Returns:
+            dict: 每个抓取源未变化、304 和变化的累计次数
+        """
+        return {key: dict(stats) for key, stats in self._stats.items()}
+
+
+change_detector = ChangeDetector()
+
+
+async def list_region_unchanged(page, config):
+    """
+    在页面中提取公告列表区域并计算哈希，判断与上次完整解析时是否相同
+
+    内容相同时调用方无需获取整个页面 HTML，也无需解析；
+    内容不同时解析成功后需调用 change_detector.commit(change_key(config.name, "browser"))
+
+    Args:
+        page: Playwright Page
+        config (NewsScraperConfig): 交易所配置，使用其中的 list 选择器
+
+    Returns:
+        bool: 列表是否未变化
+    """
+    if not change_detector.enabled:
+        return False
+    selector = config.selectors.get('list') or config.selectors['wait_for']
+    try:
+        region = await page.eval_on_selector_all(selector, LIST_REGION_SCRIPT)
+    except Exception as e:
+        logger.warning(f"{config.name} 提取列表区域失败: {e}")
+        return False
+    return change_detector.check(change_key(config.name, "browser"), content_digest(region))
@@ -15,6 +15,8 @@ MONGO_URI = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017')
 
 # Lark机器人
 LARK_WEBHOOK_URL = os.environ.get('LARK_WEBHOOK_URL', 'your_lark_webhook_url')
+# 需要同时推送到多个飞书群时，用逗号分隔多个 Webhook 地址
+LARK_WEBHOOK_URLS = os.environ.get('LARK_WEBHOOK_URLS', '')
 
 # 运行环境标识
 IS_PRODUCTION = os.environ.get('RAILWAY_ENVIRONMENT', 'local') != 'local'
\ No newline at end of file
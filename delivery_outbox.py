@@ -0,0 +1,421 @@
+# delivery_outbox.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from pymongo import UpdateOne
+
+from metrics import LatencyRegistry
+from news_repository import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# 每次从队列取出并推送的新闻条数、没有通知时的轮询间隔（秒）
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '50'))
+OUTBOX_POLL_INTERVAL = int(os.environ.get('OUTBOX_POLL_INTERVAL_SECONDS', '30'))
+
+# 推送失败后的重试间隔从 OUTBOX_RETRY_BASE_SECONDS 开始指数增长，最长 OUTBOX_RETRY_MAX_SECONDS
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', '10'))
+OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get('OUTBOX_RETRY_MAX_SECONDS', '900'))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '20'))
+
+# 已推送记录的保留天数，用于重复入队时去重
+OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', '7'))
+
+# MongoDB 不可用时使用的本地 SQLite 文件
+OUTBOX_SQLITE_PATH = os.environ.get('OUTBOX_SQLITE_PATH', 'outbox.db')
+
+# 队列中保存的新闻字段，推送时只需要这些字段
+PAYLOAD_FIELDS = ("unique_id", "title", "link", "time", "source")
+
+# 每个交易所从公告发布到推送成功的耗时（秒）
+PUBLISH_TO_DELIVERY_LATENCY = LatencyRegistry()
+
+STATUS_PENDING = "pending"
+STATUS_DELIVERED = "delivered"
+STATUS_FAILED = "failed"
+
+
+def build_entries(news_docs, channels, now=None):
+    """
+    为每条新闻、每个推送渠道生成一条队列记录
+
+    Args:
+        news_docs (list): 新闻文档
+        channels (list): 推送渠道名称
+        now (datetime): 入队时间
+
+    Returns:
+        list: 队列记录，_id 为 "渠道:unique_id"，重复入队时保持不变
+    """
+    now = now or datetime.utcnow()
+    entries = []
+    for channel in channels:
+        for position, news in enumerate(news_docs):
+            if not news.get("unique_id"):
+                continue
+            entries.append({
+                "_id": f"{channel}:{news['unique_id']}",
+                "channel": channel,
+                "unique_id": news["unique_id"],
+                "news": {field: news.get(field) for field in PAYLOAD_FIELDS},
+                "status": STATUS_PENDING,
+                "attempts": 0,
+                "created_at": now,
+                "position": position,
+                "next_attempt_at": now
+            })
+    return entries
+
+
+def record_delivery_latency(news_list, delivered_at):
+    """
+    记录每条新闻从发布到推送成功的耗时
+
+    只精确到日期的发布时间（00:00:00）无法反映真实延迟，不计入统计
+    """
+    for news in news_list:
+        news_time = news.get("time")
+        if not isinstance(news_time, str) or news_time.endswith("00:00:00 UTC"):
+            continue
+        try:
+            published_at = datetime.strptime(news_time, "%Y-%m-%d %H:%M:%S UTC")
+        except ValueError:
+            continue
+        latency = (delivered_at - published_at).total_seconds()
+        if latency >= 0:
+            PUBLISH_TO_DELIVERY_LATENCY.record(news.get("source") or "Unknown", latency)
+
+
+def retry_delay(attempts):
+    """第 attempts 次失败后的重试间隔（秒）"""
+    return min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS)
+
+
+class MongoOutboxStore:
+    """
+    基于 MongoDB 集合的推送队列
+
+    Args:
+        collection: pymongo Collection
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        # 索引在后台线程中创建，不阻塞首次读写
+        threading.Thread(target=self._ensure_indexes, name="outbox-indexes", daemon=True).start()
+
+    def _ensure_indexes(self):
+        try:
+            self.collection.create_index(
+                [("channel", 1), ("status", 1), ("next_attempt_at", 1)], name="channel_due_index"
+            )
+            # 已推送的记录在 expire_at 之后由 MongoDB 自动删除
+            self.collection.create_index([("expire_at", 1)], expireAfterSeconds=0, name="expire_at_ttl")
+            logger.info("✅ delivery_outbox 集合索引已就绪")
+        except Exception as e:
+            logger.error(f"创建 delivery_outbox 集合索引失败: {e}")
+
+    def enqueue(self, entries):
+        """写入队列，已存在的记录保持不变，返回新增数量"""
+        if not entries:
+            return 0
+        operations = [UpdateOne({"_id": entry["_id"]}, {"$setOnInsert": entry}, upsert=True) for entry in entries]
+        return self.collection.bulk_write(operations, ordered=False).upserted_count
+
+    def fetch_due(self, channel, now, limit):
+        query = {"channel": channel, "status": STATUS_PENDING, "next_attempt_at": {"$lte": now}}
+        return list(self.collection.find(query).sort([("created_at", 1), ("position", 1)]).limit(limit))
+
+    def mark_delivered(self, entry_ids, now):
+        self.collection.update_many(
+            {"_id": {"$in": entry_ids}},
+            {"$set": {"status": STATUS_DELIVERED, "delivered_at": now,
+                      "expire_at": now + timedelta(days=OUTBOX_RETENTION_DAYS)}}
+        )
+
+    def mark_failed(self, entries, error, now):
+        operations = []
+        for entry in entries:
+            attempts = entry.get("attempts", 0) + 1
+            update = {"attempts": attempts, "last_error": error,
+                      "next_attempt_at": now + timedelta(seconds=retry_delay(attempts))}
+            if attempts >= OUTBOX_MAX_ATTEMPTS:
+                update["status"] = STATUS_FAILED
+            operations.append(UpdateOne({"_id": entry["_id"]}, {"$set": update}))
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def pending_counts(self):
+        pipeline = [{"$match": {"status": STATUS_PENDING}}, {"$group": {"_id": "$channel", "count": {"$sum": 1}}}]
+        return {item["_id"]: item["count"] for item in self.collection.aggregate(pipeline)}
+
+
+def _to_timestamp(value):
+    """UTC datetime（datetime.utcnow() 返回的不带时区的时间）转换为 Unix 时间戳，与主机时区无关"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SqliteOutboxStore:
+    """
+    基于本地 SQLite 文件的推送队列，MongoDB 不可用时使用
+
+    各方法在数据库线程池中调用，连接允许跨线程使用，由锁保证同一时间只有一个线程访问
+
+    Args:
+        path (str): 数据库文件路径
+    """
+
+    def __init__(self, path=OUTBOX_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id TEXT PRIMARY KEY,
+                channel TEXT NOT NULL,
+                unique_id TEXT NOT NULL,
+                news TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                position INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                delivered_at REAL,
+                last_error TEXT
+            )
+        """)
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS channel_due_index ON outbox (channel, status, next_attempt_at)"
+        )
+        self.connection.commit()
+
+    def enqueue(self, entries):
+        if not entries:
+            return 0
+        with self._lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO outbox (id, channel, unique_id, news, status, attempts, created_at, position, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(entry["_id"], entry["channel"], entry["unique_id"], json.dumps(entry["news"], ensure_ascii=False),
+                  entry["status"], entry["attempts"], _to_timestamp(entry["created_at"]), entry["position"],
+                  _to_timestamp(entry["next_attempt_at"])) for entry in entries]
+            )
+            return self.connection.total_changes - before
+
+    def fetch_due(self, channel, now, limit):
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM outbox WHERE channel = ? AND status = ? AND next_attempt_at <= ? "
+                "ORDER BY created_at, position LIMIT ?",
+                (channel, STATUS_PENDING, _to_timestamp(now), limit)
+            ).fetchall()
+        return [{
+            "_id": row["id"],
+            "channel": row["channel"],
+            "unique_id": row["unique_id"],
+            "news": json.loads(row["news"]),
+            "attempts": row["attempts"]
+        } for row in rows]
+
+    def mark_delivered(self, entry_ids, now):
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "UPDATE outbox SET status = ?, delivered_at = ? WHERE id = ?",
+                [(STATUS_DELIVERED, _to_timestamp(now), entry_id) for entry_id in entry_ids]
+            )
+            # 清理超过保留期的已推送记录
+            expire_before = _to_timestamp(now - timedelta(days=OUTBOX_RETENTION_DAYS))
+            self.connection.execute(
+                "DELETE FROM outbox WHERE status = ? AND delivered_at < ?", (STATUS_DELIVERED, expire_before)
+            )
+
+    def mark_failed(self, entries, error, now):
+        rows = []
+        for entry in entries:
+            attempts = entry.get("attempts", 0) + 1
+            status = STATUS_FAILED if attempts >= OUTBOX_MAX_ATTEMPTS else STATUS_PENDING
+            next_attempt_at = now + timedelta(seconds=retry_delay(attempts))
+            rows.append((attempts, error, _to_timestamp(next_attempt_at), status, entry["_id"]))
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "UPDATE outbox SET attempts = ?, last_error = ?, next_attempt_at = ?, status = ? WHERE id = ?", rows
+            )
+
+    def pending_counts(self):
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT channel, COUNT(*) AS count FROM outbox WHERE status = ? GROUP BY channel", (STATUS_PENDING,)
+            ).fetchall()
+        return {row["channel"]: row["count"] for row in rows}
+
+
+def create_outbox_store(db=None):
+    """
+    创建推送队列：MongoDB 可用时使用 delivery_outbox 集合，否则使用本地 SQLite 文件
+
+    Args:
+        db: pymongo Database，为 None 时使用 SQLite
+    """
+    if db is not None:
+        try:
+            store = MongoOutboxStore(db["delivery_outbox"])
+            logger.info("推送队列使用 MongoDB 集合 delivery_outbox")
+            return store
+        except Exception as e:
+            logger.error(f"创建 MongoDB 推送队列失败: {e}，改用 SQLite")
+    logger.info(f"推送队列使用 SQLite 文件 {OUTBOX_SQLITE_PATH}")
+    return SqliteOutboxStore(OUTBOX_SQLITE_PATH)
+
+
+class OutboxDrainer:
+    """
+    按渠道从推送队列中取出新闻并推送，保证至少推送一次
+
+    队列的读写在数据库线程池中执行（见 news_repository.run_blocking），不阻塞事件循环
+
+    只有发送函数返回成功后才把记录标记为已推送，进程在推送过程中退出时，
+    重启后会重新推送这些新闻；推送失败的记录按指数退避重试，
+    超过 OUTBOX_MAX_ATTEMPTS 次后标记为失败不再重试。
+    每个渠道独立推送，一个渠道失败不影响其他渠道。
+
+    Args:
+        store: MongoOutboxStore 或 SqliteOutboxStore
+        senders (dict): 渠道名称 -> 异步发送函数，参数为新闻列表，返回是否成功
+        batch_size (int): 每次推送的最多新闻条数
+        poll_interval (int): 没有新消息通知时的轮询间隔（秒）
+    """
+
+    def __init__(self, store, senders, batch_size=OUTBOX_BATCH_SIZE, poll_interval=OUTBOX_POLL_INTERVAL):
+        self.store = store
+        self.senders = dict(senders)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.delivered = {channel: 0 for channel in self.senders}
+        self.failures = {channel: 0 for channel in self.senders}
+        self._locks = {channel: asyncio.Lock() for channel in self.senders}
+        self._wakeups = {channel: asyncio.Event() for channel in self.senders}
+        self._tasks = []
+
+    @property
+    def channels(self):
+        return list(self.senders)
+
+    @property
+    def running(self):
+        return any(not task.done() for task in self._tasks)
+
+    async def enqueue(self, news_docs):
+        """
+        将新闻加入所有渠道的推送队列
+
+        Returns:
+            int: 新增的队列记录数
+        """
+        count = await run_blocking("outbox_enqueue", self.store.enqueue, build_entries(news_docs, self.channels))
+        self.notify()
+        return count
+
+    def notify(self):
+        """唤醒所有渠道的后台推送任务"""
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+
+    async def drain_channel(self, channel):
+        """
+        推送一个渠道中所有到期的记录，遇到失败时停止，等待下次重试
+
+        Returns:
+            int: 本次成功推送的新闻条数
+        """
+        sender = self.senders[channel]
+        delivered = 0
+        async with self._locks[channel]:
+            while True:
+                entries = await run_blocking(
+                    "outbox_fetch_due", self.store.fetch_due, channel, datetime.utcnow(), self.batch_size
+                )
+                if not entries:
+                    return delivered
+                try:
+                    ok = await sender([entry["news"] for entry in entries])
+                    error = None if ok else "发送失败"
+                except Exception as e:
+                    ok, error = False, str(e)
+                if not ok:
+                    self.failures[channel] += 1
+                    await run_blocking("outbox_mark_failed", self.store.mark_failed, entries, error, datetime.utcnow())
+                    logger.warning(f"渠道 {channel} 推送 {len(entries)} 条新闻失败: {error}，稍后重试")
+                    return delivered
+                delivered_at = datetime.utcnow()
+                await run_blocking(
+                    "outbox_mark_delivered", self.store.mark_delivered, [entry["_id"] for entry in entries], delivered_at
+                )
+                record_delivery_latency([entry["news"] for entry in entries], delivered_at)
+                delivered += len(entries)
+                self.delivered[channel] += len(entries)
+                logger.info(f"渠道 {channel} 推送 {len(entries)} 条新闻成功")
+
+    async def drain_once(self):
+        """
+        并发推送所有渠道中到期的记录
+
+        Returns:
+            dict: 渠道名称 -> 成功推送的新闻条数
+        """
+        results = await asyncio.gather(*(self.drain_channel(channel) for channel in self.channels))
+        return dict(zip(self.channels, results))
+
+    async def _run_channel(self, channel):
+        wakeup = self._wakeups[channel]
+        while True:
+            wakeup.clear()
+            try:
+                await self.drain_channel(channel)
+            except Exception as e:
+                logger.error(f"渠道 {channel} 推送队列处理出错: {e}")
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """为每个渠道启动后台推送任务"""
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._run_channel(channel)) for channel in self.channels]
+        logger.info(f"推送队列已启动，渠道: {self.channels}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        """
+        Returns:
+            dict: 每个渠道的累计推送条数、失败次数和队列中待推送的数量
+        """
+        try:
+            pending = self.store.pending_counts()
+        except Exception as e:
+            logger.error(f"查询推送队列失败: {e}")
+            pending = {}
+        return {
+            channel: {
+                "delivered": self.delivered.get(channel, 0),
+                "failures": self.failures.get(channel, 0),
+                "pending": pending.get(channel, 0)
+            }
+            for channel in sorted(set(self.channels) | set(pending))
+        }
@@ -1,69 +1,55 @@
 # exchange_scraper.py
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-from datetime import datetime
+import os
+from datetime import datetime, timezone
+from functools import partial
+from browser_pool import browser_pool
+from request_interceptor import apply_request_policy
+from page_readiness import goto_and_wait_ready
+from change_detector import UnchangedNews, change_detector, change_key, list_region_unchanged
+from html_parser import parse_html
+from time_parser import format_news_time
+
+# 设置 SCRAPER_IN_PAGE_EXTRACT=on 时在页面中提取公告列表，不获取整个页面 HTML
+IN_PAGE_EXTRACT = os.environ.get('SCRAPER_IN_PAGE_EXTRACT', 'off').lower() in ('on', 'true', '1')
 
 class NewsScraperConfig:
-    def __init__(self, name, url, selectors, base_url=None, timeout=60000, custom_headers=None):
+    def __init__(self, name, url, selectors, base_url=None, timeout=60000, custom_headers=None, min_items=3):
         self.name = name
         self.url = url
         self.selectors = selectors
         self.base_url = base_url or url.split('/')[0] + '//' + url.split('/')[2]
         self.timeout = timeout
         self.custom_headers = custom_headers or {}
+        # 列表至少包含 min_items 项且连续两次轮询数量不变时视为页面就绪
+        self.min_items = min_items
 
 async def fetch_exchange_news(config: NewsScraperConfig):
     """统一的新闻抓取函数"""
     print(f"🔍 开始抓取 {config.name} 的新闻...")
     news_list = []
 
-    async with async_playwright() as p:
-        browser_options = {
-            "headless": True
-        }
-        
-        # Bybit 特殊配置
-        if config.name == "Bybit":
-            browser_options.update({
-                "headless": False,
-                "args": [
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-web-security",
-                    "--disable-cache"
-                ]
-            })
-
-        browser = await p.chromium.launch(**browser_options)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page = await context.new_page()
-
+    # 使用共享浏览器池，每个交易所使用独立的 BrowserContext
+    async with browser_pool.page(
+        config.name,
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    ) as page:
         try:
-            await page.goto(config.url, wait_until="domcontentloaded")
-            await page.wait_for_load_state("networkidle", timeout=config.timeout)
-            
-            if config.selectors.get('wait_for'):
-                await page.wait_for_selector(config.selectors['wait_for'], timeout=config.timeout)
-
-            html = await page.content()
-            soup = BeautifulSoup(html, "html.parser")
-
-            news_items = soup.select(config.selectors['list'])
-            
-            for item in news_items:
-                news_data = extract_news_data(item, config)
-                if news_data:
-                    news_list.append(news_data)
+            await apply_request_policy(page, config.name)
+            await goto_and_wait_ready(page, config)
+
+            # 公告列表与上次相同时无需获取和解析整个页面
+            if await list_region_unchanged(page, config):
+                return UnchangedNews()
+
+            news_list = await extract_page_news(page, config)
 
         except Exception as e:
             print(f"❌ {config.name} 抓取出错: {e}")
-        finally:
-            await browser.close()
+
+    if news_list:
+        change_detector.commit(change_key(config.name, "browser"))
 
     total_count = len(news_list)
     unique_news = {item["title"]: item for item in news_list}.values()
@@ -75,46 +61,120 @@ async def fetch_exchange_news(config: NewsScraperConfig):
 
     return list(unique_news)
 
-def extract_news_data(item, config):
-    """提取新闻数据"""
+def build_news_item(config, title, link, time, format_time=None):
+    """根据提取到的标题、链接和时间生成新闻，缺少标题或链接时返回 None"""
+    if not title or not link:
+        return None
+    if not link.startswith('http'):
+        link = config.base_url + link
+    format_time = format_time or format_news_time
+    return {
+        "title": title,
+        "link": link,
+        "time": format_time(time or "No date found"),
+        "source": config.name
+    }
+
+def extract_news_data(item, config, format_time=None):
+    """
+    提取新闻数据
+
+    Args:
+        item: html_parser 节点（列表项）
+        config (NewsScraperConfig): 交易所配置
+        format_time (callable): 时间格式化函数，默认使用 time_parser.format_news_time
+    """
     try:
         title_element = item.select_one(config.selectors['title']) if config.selectors.get('title') else item
-        title = title_element.get_text(strip=True) if title_element else None
+        title = title_element.text() if title_element else None
 
         link_element = item.select_one(config.selectors['link']) if config.selectors.get('link') else item
-        link = link_element.get('href') if link_element else None
-        if link and not link.startswith('http'):
-            link = config.base_url + link
-
-        time_element = item.select_one(config.selectors['time']) if config.selectors.get('time') else None
-        time = time_element.get_text(strip=True) if time_element else "No date found"
-
-        if title and link:
-            return {
-                "title": title,
-                "link": link,
-                "time": format_news_time(time),
-                "source": config.name
-            }
+        link = link_element.attr('href') if link_element else None
+
+        time_element = None
+        if config.selectors.get('time'):
+            # 部分交易所（如 Binance）的时间元素在列表项之外，取列表项之后紧邻的时间元素
+            # （多个列表项共用一个父元素时，父元素中的第一个时间元素属于第一个列表项）
+            time_element = item.select_one(config.selectors['time']) or item.find_next(config.selectors['time'])
+        time = time_element.text() if time_element else None
+
+        return build_news_item(config, title, link, time, format_time)
     except Exception as e:
         print(f"⚠️ 解析新闻项时出错: {e}")
     return None
 
-def format_news_time(news_time):
-    """统一处理新闻时间格式"""
-    try:
-        if len(news_time) == 10:  # 2025-02-27
-            return datetime.strptime(news_time, "%Y-%m-%d").strftime("%Y-%m-%d 00:00:00 UTC")
-        elif news_time.startswith("Published on"):
-            news_time = news_time[13:].strip()
-            return datetime.strptime(news_time, "%b %d, %Y").strftime("%Y-%m-%d 00:00:00 UTC")
-        elif len(news_time) > 10:  # 2025-03-03 10:41
-            return datetime.strptime(news_time, "%Y-%m-%d %H:%M").strftime("%Y-%m-%d %H:%M:%S UTC")
-        elif len(news_time.split()) == 3:  # Feb 26, 2025
-            return datetime.strptime(news_time, "%b %d, %Y").strftime("%Y-%m-%d 00:00:00 UTC")
-    except ValueError:
-        print(f"❌ 无法解析时间: {news_time}")
-    return None
+def parse_news_html(html, config, backend=None, format_time=None, fetched_at=None):
+    """
+    从页面 HTML 中解析新闻列表
+
+    Args:
+        html (str): 页面 HTML
+        config (NewsScraperConfig): 交易所配置
+        backend (str): HTML 解析后端，默认使用 SCRAPER_HTML_PARSER
+        format_time (callable): 时间格式化函数，默认使用 format_news_time
+        fetched_at (datetime): 获取页面的时间，相对时间（如 "2 days ago"）以此为基准
+
+    Returns:
+        list: 新闻列表（未去重）
+    """
+    format_time = format_time or partial(format_news_time, now=fetched_at or datetime.now(timezone.utc))
+    root = parse_html(html, backend)
+    news_list = []
+    for item in root.select(config.selectors['list']):
+        news_data = extract_news_data(item, config, format_time)
+        if news_data:
+            news_list.append(news_data)
+    return news_list
+
+# 在页面中按 list / title / link / time 选择器提取每个列表项的标题、链接和时间，规则与 extract_news_data 相同
+IN_PAGE_EXTRACT_SCRIPT = """
+(items, selectors) => {
+    // 页面中所有时间元素按文档顺序排列，列表项内没有时间元素时取其后第一个时间元素
+    const times = selectors.time ? Array.from(document.querySelectorAll(selectors.time)) : [];
+    return items.map(item => {
+        const pick = (selector) => selector ? item.querySelector(selector) : item;
+        const title = pick(selectors.title);
+        const link = pick(selectors.link);
+        let time = null;
+        if (selectors.time) {
+            time = item.querySelector(selectors.time)
+                || times.find(element => item.compareDocumentPosition(element) & Node.DOCUMENT_POSITION_FOLLOWING)
+                || null;
+        }
+        return {
+            title: title ? title.textContent.trim() : null,
+            link: link ? link.getAttribute('href') : null,
+            time: time ? time.textContent.trim() : null
+        };
+    });
+}
+"""
+
+async def extract_page_news(page, config, format_time=None):
+    """
+    从已就绪的页面中提取新闻列表
+
+    默认获取整个页面 HTML 后在 Python 中解析；开启 SCRAPER_IN_PAGE_EXTRACT 时在页面中直接提取
+    每个列表项的标题、链接和时间，整个页面 HTML 不再传回 Python
+
+    Returns:
+        list: 新闻列表（未去重）
+    """
+    fetched_at = datetime.now(timezone.utc)
+    if not IN_PAGE_EXTRACT:
+        html = await page.content()
+        return parse_news_html(html, config, format_time=format_time, fetched_at=fetched_at)
+
+    format_time = format_time or partial(format_news_time, now=fetched_at)
+
+    selectors = {key: config.selectors.get(key) for key in ("title", "link", "time")}
+    rows = await page.eval_on_selector_all(config.selectors['list'], IN_PAGE_EXTRACT_SCRIPT, selectors)
+    news_list = []
+    for row in rows:
+        news_data = build_news_item(config, row.get("title"), row.get("link"), row.get("time"), format_time)
+        if news_data:
+            news_list.append(news_data)
+    return news_list
 
 # 交易所配置
 EXCHANGE_CONFIGS = {
@@ -125,8 +185,9 @@ EXCHANGE_CONFIGS = {
             "list": "div.bn-flex a.text-PrimaryText",
             "title": "h3.typography-body1-1",
             "time": "div.typography-caption1",
-            "wait_for": "div.bn-flex"
-        }
+            "wait_for": "div.bn-flex.flex-col.py-6"
+        },
+        timeout=120000
     ),
     "OKX": NewsScraperConfig(
         name="OKX",
@@ -134,6 +195,7 @@ EXCHANGE_CONFIGS = {
         selectors={
             "list": "li.index_articleItem__d-8iK",
             "title": "div.index_title__iTmos",
+            "link": "a[href]",
             "time": "span[data-testid='DateDisplay']",
             "wait_for": "li.index_articleItem__d-8iK"
         },
@@ -145,6 +207,7 @@ EXCHANGE_CONFIGS = {
         selectors={
             "list": "section.ArticleList_item_pair__vmMrx",
             "title": "span.ArticleList_item_title__u3fLL",
+            "link": "span.ArticleList_item_title__u3fLL a[href]",
             "time": "div.ArticleList_item_date__nEqio",
             "wait_for": "section.ArticleList_item_pair__vmMrx"
         },
@@ -166,9 +229,9 @@ EXCHANGE_CONFIGS = {
         url="https://www.kucoin.com/announcement/new-listings",
         selectors={
             "wait_for": "ul.kux-e8uvvx",
-            "items": "ul.kux-e8uvvx > li",
-            "title": "span",
-            "link": "a",
+            "list": "ul.kux-e8uvvx > li",
+            "title": "a[href] span",
+            "link": "a[href]",
             "time": "p.kux-q65diy"
         }
     ),
@@ -176,21 +239,25 @@ EXCHANGE_CONFIGS = {
         name="Gate.io",
         url="https://www.gate.io/announcements/newlisted",
         selectors={
-            "wait_for": "div.article-list-box",
-            "items": "div.article-list-item",
-            "title": "span.overflow-ellipsis.article-list-item-title-con",
-            "link": "a",
-            "time": "span.article-list-info-timer"
-        }
+            "wait_for": "div.flex.flex-col.gap-6.sm\\:gap-8",
+            "list": "div.flex.flex-col.gap-6.sm\\:gap-8 a",
+            "title": "p.font-medium.text-subtitle.line-clamp-2",
+            "time": "div.flex.gap-5.text-body-s.text-t3 div.flex.items-center.gap-1 span"
+        },
+        timeout=120000
     )
 }
 
 async def main():
     """主函数"""
-    for exchange_name, config in EXCHANGE_CONFIGS.items():
-        print(f"\n开始抓取 {exchange_name} 新闻:")
-        news = await fetch_exchange_news(config)
-        print(f"✅ {exchange_name} 抓取完成\n")
+    try:
+        for exchange_name, config in EXCHANGE_CONFIGS.items():
+            print(f"\n开始抓取 {exchange_name} 新闻:")
+            news = await fetch_exchange_news(config)
+            print(f"✅ {exchange_name} 抓取完成\n")
+        print(f"浏览器池统计: {browser_pool.get_stats()}")
+    finally:
+        await browser_pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,41 @@
+# fixtures/__init__.py
+"""
+离线快照：各交易所公告页 HTML（html/）和公告接口 JSON 响应（json/）
+
+快照由 generate_fixtures 生成，或由 record_fixtures 从线上录制
+"""
+import gzip
+import json
+import os
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _file_name(name):
+    return name.lower().replace('.', '_')
+
+
+def html_fixture_path(name):
+    return os.path.join(FIXTURE_DIR, "html", f"{_file_name(name)}.html.gz")
+
+
+def json_fixture_path(name):
+    return os.path.join(FIXTURE_DIR, "json", f"{_file_name(name)}.json")
+
+
+def load_html_fixture(name):
+    """读取交易所公告页快照，不存在时返回 None"""
+    path = html_fixture_path(name)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_json_fixture(name):
+    """读取交易所公告接口的响应快照，不存在时返回 None"""
+    path = json_fixture_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
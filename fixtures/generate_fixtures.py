@@ -0,0 +1,238 @@
+# fixtures/generate_fixtures.py
+"""
+生成离线快照：各交易所公告页 HTML（fixtures/html/<交易所>.html.gz）
+和公告接口 JSON 响应（fixtures/json/<交易所>.json）
+
+HTML 中公告列表部分的 DOM 结构与 exchange_scraper.EXCHANGE_CONFIGS 中的选择器一致，
+其余部分模拟单页应用的页面体积（导航、页脚、内联脚本和 __NEXT_DATA__ 等）；
+JSON 与 Bybit 公告 API 以及 source_adapters 中各接口的响应结构一致。
+内容由固定随机种子生成，每次运行结果相同。可以用 record_fixtures 录制线上页面替换。
+
+用法: python -m fixtures.generate_fixtures
+"""
+import gzip
+import json
+import os
+import random
+
+from fixtures import html_fixture_path, json_fixture_path
+
+ITEM_COUNT = 20
+
+# 快照中公告的发布时间范围（毫秒时间戳，2025 年）
+TIMESTAMP_RANGE = (1735689600000, 1767225599000)
+
+COINS = ["ALPHA", "BETA", "GAMMA", "DELTA", "OMEGA", "SIGMA", "ZETA", "THETA", "KAPPA", "LAMBDA",
+         "NOVA", "ORBIT", "PIXEL", "QUARK", "RIVET", "SOLAR", "TIDAL", "ULTRA", "VIVID", "WAVE"]
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def coin(rng, index):
+    return f"{COINS[index % len(COINS)]}{rng.randint(1, 99)}"
+
+
+def spa_shell(rng, name, body, nav_links=400, filler_blocks=1500, data_kb=300):
+    """用导航、页脚、内联脚本和 JSON 数据包裹公告列表，模拟单页应用的完整页面"""
+    nav = "".join(
+        f'<li class="nav-item nav-item-{i % 7}"><a class="nav-link" href="/{name.lower()}/nav/{i}">'
+        f'<svg class="icon" viewBox="0 0 24 24"><path d="M{i % 24} 0L24 {i % 12}Z"></path></svg>'
+        f'<span class="nav-text">Menu {i}</span></a></li>'
+        for i in range(nav_links)
+    )
+    filler = "".join(
+        f'<div class="css-{rng.randrange(16 ** 6):06x} layout-block"><div class="inner"><span class="label">'
+        f'Block {i}</span><p class="desc">{"Lorem ipsum dolor sit amet " * (i % 4 + 1)}</p></div></div>'
+        for i in range(filler_blocks)
+    )
+    records = []
+    while len(json.dumps(records)) < data_kb * 1024:
+        records.append({"id": rng.randrange(10 ** 12), "title": f"Cached item {len(records)}",
+                        "tags": [f"tag{rng.randint(0, 50)}" for _ in range(5)], "score": rng.random()})
+    next_data = json.dumps({"props": {"pageProps": {"records": records}}})
+    scripts = "".join(
+        f'<script>window.__chunk_{i}=function(){{return {rng.randrange(10 ** 9)};}};</script>' for i in range(200)
+    )
+    return (
+        f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{name} Announcements</title>'
+        f'<style>{".c{color:red}" * 2000}</style></head><body>'
+        f'<header><nav><ul class="nav-list">{nav}</ul></nav></header>'
+        f'<main><div class="page-container">{body}</div><div class="recommendations">{filler}</div></main>'
+        f'<footer><ul>{nav[: len(nav) // 2]}</ul></footer>'
+        f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script>{scripts}</body></html>'
+    )
+
+
+def binance_page(rng):
+    items = "".join(
+        f'<div class="bn-flex flex-col gap-2"><a class="text-PrimaryText" href="/en/support/announcement/{rng.randrange(16 ** 32):032x}">'
+        f'<h3 class="typography-body1-1">Binance Will List {coin(rng, i)} ({coin(rng, i)}) with Seed Tag Applied</h3></a>'
+        f'<div class="typography-caption1">2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</div></div>'
+        for i in range(ITEM_COUNT)
+    )
+    return spa_shell(rng, "Binance", f'<div class="bn-flex flex-col py-6">{items}</div>')
+
+
+def okx_page(rng):
+    items = "".join(
+        f'<li class="index_articleItem__d-8iK"><a href="/help/okx-to-list-{coin(rng, i).lower()}">'
+        f'<div class="index_title__iTmos">OKX to list {coin(rng, i)} for spot trading</div></a>'
+        f'<span data-testid="DateDisplay">Published on {MONTHS[rng.randint(0, 11)]} {rng.randint(1, 28)}, 2025</span></li>'
+        for i in range(ITEM_COUNT)
+    )
+    return spa_shell(rng, "OKX", f'<ul class="index_articleList__x">{items}</ul>')
+
+
+def bitget_page(rng):
+    items = "".join(
+        f'<section class="ArticleList_item_pair__vmMrx"><span class="ArticleList_item_title__u3fLL">'
+        f'<a href="/support/articles/{rng.randrange(10 ** 13)}">{coin(rng, i)} (TICKER) will be listed on Bitget</a></span>'
+        f'<div class="ArticleList_item_date__nEqio">2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} '
+        f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}</div></section>'
+        for i in range(ITEM_COUNT)
+    )
+    return spa_shell(rng, "Bitget", f'<div class="ArticleList_list">{items}</div>')
+
+
+def kucoin_page(rng):
+    items = "".join(
+        f'<li><a href="/announcement/en-{coin(rng, i).lower()}-gets-listed"><span>{coin(rng, i)} Gets Listed on KuCoin!</span></a>'
+        f'<p class="kux-q65diy">{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2025, '
+        f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}</p></li>'
+        for i in range(ITEM_COUNT)
+    )
+    return spa_shell(rng, "KuCoin", f'<ul class="kux-e8uvvx">{items}</ul>')
+
+
+def gate_page(rng):
+    items = "".join(
+        f'<a href="/announcements/article/{rng.randrange(10 ** 5)}">'
+        f'<p class="font-medium text-subtitle line-clamp-2">Gate.io Will List {coin(rng, i)} ({coin(rng, i)})</p>'
+        f'<div class="flex gap-5 text-body-s text-t3"><div class="flex items-center gap-1">'
+        f'<span>{rng.randint(1, 23)} hours {rng.randint(1, 59)} min {rng.randint(1, 59)} sec ago</span></div></div></a>'
+        for i in range(ITEM_COUNT)
+    )
+    return spa_shell(rng, "Gate.io", f'<div class="flex flex-col gap-6 sm:gap-8">{items}</div>')
+
+
+def timestamp(rng):
+    return rng.randint(*TIMESTAMP_RANGE)
+
+
+def bybit_response(rng):
+    """Bybit /v5/announcements/index 的响应"""
+    items = []
+    for i in range(ITEM_COUNT):
+        published = timestamp(rng)
+        items.append({
+            "title": f"New Listing: {coin(rng, i)}USDT Perpetual Contract, with up to 50x leverage",
+            "description": f"Bybit will launch {coin(rng, i)}USDT Perpetual Contract for trading.",
+            "type": {"title": "New Listings", "key": "new_crypto"},
+            "tags": ["Derivatives", "Spot Listings"],
+            "url": f"https://announcements.bybit.com/en-US/article/new-listing-{coin(rng, i).lower()}-blt{rng.randrange(16 ** 16):016x}/",
+            "dateTimestamp": published,
+            "startDateTimestamp": published,
+            "endDateTimestamp": published,
+            "publishTime": published
+        })
+    return {"retCode": 0, "retMsg": "OK", "result": {"total": 1000, "list": items}, "retExtInfo": {}, "time": TIMESTAMP_RANGE[1]}
+
+
+def binance_response(rng):
+    """Binance bapi/composite/v1/public/cms/article/list/query 的响应"""
+    articles = [{
+        "id": rng.randrange(10 ** 6),
+        "code": f"{rng.randrange(16 ** 32):032x}",
+        "title": f"Binance Will List {coin(rng, i)} ({coin(rng, i)}) with Seed Tag Applied",
+        "type": 1,
+        "releaseDate": timestamp(rng)
+    } for i in range(ITEM_COUNT)]
+    return {"code": "000000", "message": None, "messageDetail": None, "success": True,
+            "data": {"catalogs": [{"catalogId": 48, "catalogName": "New Cryptocurrency Listing",
+                                   "articles": articles, "total": 1500}]}}
+
+
+def okx_response(rng):
+    """OKX /api/v5/support/announcements 的响应"""
+    details = [{
+        "annType": "announcements-new-listings",
+        "pTime": str(timestamp(rng)),
+        "title": f"OKX to list {coin(rng, i)} for spot trading",
+        "url": f"https://www.okx.com/help/okx-to-list-{coin(rng, i).lower()}"
+    } for i in range(ITEM_COUNT)]
+    return {"code": "0", "msg": "", "data": [{"details": details, "totalPage": "50"}]}
+
+
+def bitget_response(rng):
+    """Bitget /api/v2/public/annoucements 的响应"""
+    items = [{
+        "annId": str(rng.randrange(10 ** 13)),
+        "annTitle": f"{coin(rng, i)} (TICKER) will be listed on Bitget",
+        "annDesc": "Bitget will list the token in the Innovation and Meme Zone.",
+        "cTime": str(timestamp(rng)),
+        "language": "en_US",
+        "annUrl": f"https://www.bitget.com/support/articles/{rng.randrange(10 ** 13)}"
+    } for i in range(ITEM_COUNT)]
+    return {"code": "00000", "msg": "success", "requestTime": TIMESTAMP_RANGE[1], "data": items}
+
+
+def kucoin_response(rng):
+    """KuCoin /api/v3/announcements 的响应"""
+    items = [{
+        "annId": rng.randrange(10 ** 6),
+        "annTitle": f"{coin(rng, i)} Gets Listed on KuCoin!",
+        "annType": ["latest-announcements", "new-listings"],
+        "annDesc": f"{coin(rng, i)} Gets Listed on KuCoin!",
+        "cTime": timestamp(rng),
+        "language": "en_US",
+        "annUrl": f"https://www.kucoin.com/announcement/{coin(rng, i).lower()}-gets-listed"
+    } for i in range(ITEM_COUNT)]
+    return {"code": "200000", "data": {"totalNum": 1000, "items": items, "currentPage": 1,
+                                       "pageSize": ITEM_COUNT, "totalPage": 50}}
+
+
+PAGES = {
+    "Binance": binance_page,
+    "OKX": okx_page,
+    "Bitget": bitget_page,
+    "KuCoin": kucoin_page,
+    "Gate.io": gate_page
+}
+
+RESPONSES = {
+    "Bybit": bybit_response,
+    "Binance": binance_response,
+    "OKX": okx_response,
+    "Bitget": bitget_response,
+    "KuCoin": kucoin_response
+}
+
+
+def write_html_fixture(name, html):
+    path = html_fixture_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # mtime=0 保证重复生成时文件内容不变
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(html.encode("utf-8"))
+    return path
+
+
+def write_json_fixture(name, data):
+    path = json_fixture_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def main():
+    for name, build in PAGES.items():
+        html = build(random.Random(name))
+        print(f"{name}: {len(html) / 1024:.0f} KB -> {write_html_fixture(name, html)}")
+    for name, build in RESPONSES.items():
+        data = build(random.Random(f"{name}-api"))
+        print(f"{name} API -> {write_json_fixture(name, data)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# fixtures/record_fixtures.py
+"""
+从线上录制离线快照，覆盖 fixtures/html 和 fixtures/json 中的同名文件
+
+- 浏览器抓取源：打开公告页，等待列表就绪后保存整个页面 HTML
+- Bybit 和 source_adapters 中的接口：保存原始 JSON 响应
+
+用法: python -m fixtures.record_fixtures [交易所名称 ...]
+"""
+import asyncio
+import sys
+
+from browser_pool import browser_pool
+from exchange_scraper import EXCHANGE_CONFIGS
+from fixtures.generate_fixtures import PAGES, RESPONSES, write_html_fixture, write_json_fixture
+from http_client import close_http_session, get_json
+from news_scraper import BYBIT_API_URLS
+from page_readiness import goto_and_wait_ready
+from request_interceptor import apply_request_policy
+from source_adapters import API_ADAPTERS
+
+BYBIT_PARAMS = {"locale": "en-US", "type": "new_crypto", "page": 1, "limit": 20}
+
+
+async def record_page(name):
+    config = EXCHANGE_CONFIGS[name]
+    async with browser_pool.page(name, viewport={"width": 1920, "height": 1080}) as page:
+        await apply_request_policy(page, name)
+        await goto_and_wait_ready(page, config)
+        html = await page.content()
+    print(f"{name}: {len(html) / 1024:.0f} KB -> {write_html_fixture(name, html)}")
+
+
+async def record_response(name):
+    if name == "Bybit":
+        data = await get_json(BYBIT_API_URLS[0], params=BYBIT_PARAMS)
+    else:
+        adapter = API_ADAPTERS[name]
+        data = await get_json(adapter.url, params=adapter.params)
+    print(f"{name} API -> {write_json_fixture(name, data)}")
+
+
+async def main(names):
+    try:
+        for name in PAGES:
+            if not names or name in names:
+                try:
+                    await record_page(name)
+                except Exception as e:
+                    print(f"❌ 录制 {name} 页面失败: {e}")
+        for name in RESPONSES:
+            if not names or name in names:
+                try:
+                    await record_response(name)
+                except Exception as e:
+                    print(f"❌ 录制 {name} 接口失败: {e}")
+    finally:
+        await browser_pool.close()
+        await close_http_session()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
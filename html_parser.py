@@ -0,0 +1,144 @@
+# html_parser.py
+import logging
+import os
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# HTML 解析后端：selectolax、lxml（BeautifulSoup + lxml 解析器）、html.parser（BeautifulSoup 内置解析器），
+# auto 表示按以上顺序选择第一个已安装的后端
+HTML_PARSER_BACKEND = os.environ.get('SCRAPER_HTML_PARSER', 'auto')
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+
+def available_backends():
+    """返回已安装的解析后端，按速度从快到慢排列"""
+    backends = []
+    if SELECTOLAX_AVAILABLE:
+        backends.append("selectolax")
+    if LXML_AVAILABLE:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+
+def resolve_backend(backend=None):
+    """
+    确定实际使用的解析后端，指定的后端未安装时使用最快的可用后端
+
+    Args:
+        backend (str): 后端名称，默认使用 SCRAPER_HTML_PARSER
+    """
+    backend = backend or HTML_PARSER_BACKEND
+    available = available_backends()
+    if backend in available:
+        return backend
+    if backend not in ("auto", *BACKENDS):
+        logger.warning(f"未知的 HTML 解析后端 {backend}，改用 {available[0]}")
+    elif backend != "auto":
+        logger.warning(f"HTML 解析后端 {backend} 未安装，改用 {available[0]}")
+    return available[0]
+
+
+class Bs4Node:
+    """BeautifulSoup 节点"""
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    def select(self, selector):
+        return [Bs4Node(tag) for tag in self._tag.select(selector)]
+
+    def select_one(self, selector):
+        tag = self._tag.select_one(selector)
+        return Bs4Node(tag) if tag is not None else None
+
+    def text(self):
+        return self._tag.get_text().strip()
+
+    def attr(self, name):
+        return self._tag.get(name)
+
+    @property
+    def parent(self):
+        return Bs4Node(self._tag.parent) if self._tag.parent is not None else None
+
+    def find_next(self, selector):
+        for element in self._tag.next_elements:
+            if isinstance(element, Tag) and soupsieve.match(selector, element):
+                return Bs4Node(element)
+        return None
+
+
+class SelectolaxNode:
+    """selectolax（lexbor）节点"""
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, selector):
+        return [SelectolaxNode(node) for node in self._node.css(selector)]
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        return SelectolaxNode(node) if node is not None else None
+
+    def text(self):
+        return self._node.text().strip()
+
+    def attr(self, name):
+        return self._node.attributes.get(name)
+
+    @property
+    def parent(self):
+        return SelectolaxNode(self._node.parent) if self._node.parent is not None else None
+
+    def find_next(self, selector):
+        node = self._node
+        while node is not None:
+            # 按文档顺序遍历：先子节点，再后面的兄弟节点，最后回到父节点的下一个兄弟节点
+            if node.child is not None:
+                node = node.child
+            else:
+                while node is not None and node.next is None:
+                    node = node.parent
+                node = node.next if node is not None else None
+            if node is not None and node.is_element_node and node.css_matches(selector):
+                return SelectolaxNode(node)
+        return None
+
+
+def parse_html(html, backend=None):
+    """
+    解析 HTML，返回支持 CSS 选择器的根节点
+
+    所有后端的节点都提供 select()、select_one()、text()、attr()、parent 和 find_next()；
+    find_next() 返回文档顺序中位于该节点之后（包括其子节点）第一个匹配选择器的元素，
+    与 BeautifulSoup 的 find_next 相同
+
+    Args:
+        html (str): 页面 HTML
+        backend (str): 解析后端，默认使用 SCRAPER_HTML_PARSER
+
+    Returns:
+        Bs4Node 或 SelectolaxNode
+    """
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        return SelectolaxNode(LexborHTMLParser(html).root)
+    return Bs4Node(BeautifulSoup(html, backend))
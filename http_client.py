@@ -0,0 +1,170 @@
+# http_client.py
+import asyncio
+import json
+import logging
+import os
+
+import aiohttp
+
+from change_detector import NOT_MODIFIED, change_detector, content_digest
+
+logger = logging.getLogger(__name__)
+
+# 默认请求超时（秒）
+HTTP_TOTAL_TIMEOUT = int(os.environ.get('HTTP_TOTAL_TIMEOUT_SECONDS', '20'))
+HTTP_CONNECT_TIMEOUT = int(os.environ.get('HTTP_CONNECT_TIMEOUT_SECONDS', '10'))
+
+# 连接池配置：总连接数、单个主机连接数、DNS 缓存时间和 keep-alive 时间
+HTTP_POOL_LIMIT = 50
+HTTP_POOL_LIMIT_PER_HOST = 10
+HTTP_DNS_CACHE_TTL = 300
+HTTP_KEEPALIVE_TIMEOUT = 60
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Accept": "application/json"
+}
+
+_session = None
+_session_loop = None
+
+
+async def get_http_session():
+    """
+    获取进程级共享的 aiohttp.ClientSession
+
+    所有 HTTP 请求共用同一个连接池（keep-alive、DNS 缓存），
+    事件循环变化或会话关闭后自动重建
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TOTAL_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_http_session():
+    """关闭共享的 ClientSession"""
+    global _session, _session_loop
+    if _session and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+async def get_json(url, params=None, headers=None, timeout=None, change_key=None):
+    """
+    发送 GET 请求并解析 JSON 响应
+
+    指定 change_key 时发送条件请求（If-None-Match / If-Modified-Since），
+    服务器返回 304 或响应内容与上次完整解析时相同时不解析 JSON，直接返回 NOT_MODIFIED；
+    调用方解析成功后需调用 change_detector.commit(change_key)
+
+    Args:
+        url (str): 请求地址
+        params (dict): 查询参数
+        headers (dict): 额外的请求头
+        timeout (int): 总超时时间（秒），默认使用会话超时
+        change_key (str): 变化检测的键，见 change_detector.change_key
+
+    Returns:
+        dict: 解析后的 JSON 数据，或 NOT_MODIFIED
+
+    Raises:
+        aiohttp.ClientResponseError: 响应状态码不是 2xx 时抛出
+    """
+    session = await get_http_session()
+    request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+    if change_key:
+        headers = {**(headers or {}), **change_detector.conditional_headers(change_key)}
+    async with session.get(url, params=params, headers=headers, timeout=request_timeout) as response:
+        if change_key and response.status == 304:
+            change_detector.not_modified(change_key)
+            return NOT_MODIFIED
+        response.raise_for_status()
+        body = await response.read()
+        if change_key and change_detector.check(
+            change_key, content_digest(body),
+            etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified")
+        ):
+            return NOT_MODIFIED
+        return json.loads(body)
+
+
+async def post_json(url, payload, headers=None, timeout=None):
+    """
+    发送 JSON 格式的 POST 请求并解析 JSON 响应
+
+    Args:
+        url (str): 请求地址
+        payload (dict): 请求体
+        headers (dict): 额外的请求头
+        timeout (int): 总超时时间（秒），默认使用会话超时
+
+    Returns:
+        dict: 解析后的 JSON 数据
+
+    Raises:
+        aiohttp.ClientResponseError: 响应状态码不是 2xx 时抛出
+    """
+    session = await get_http_session()
+    request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+    async with session.post(url, json=payload, headers=headers, timeout=request_timeout) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+
+async def hedged_get_json(urls, params=None, headers=None, hedge_delay=2.0, timeout=None, change_key=None):
+    """
+    对多个等价地址发送对冲请求，返回最先成功的响应
+
+    先请求第一个地址，如果在 hedge_delay 秒内没有返回或请求失败，
+    立即并行请求下一个地址，最先成功的结果胜出，其余请求被取消
+
+    Args:
+        urls (list): 等价的请求地址列表（主地址在前）
+        params (dict): 查询参数
+        headers (dict): 额外的请求头
+        hedge_delay (float): 发起下一个请求前等待的秒数
+        timeout (int): 单个请求的总超时时间（秒）
+        change_key (str): 变化检测的键，见 get_json
+
+    Returns:
+        tuple: (成功的地址, JSON 数据或 NOT_MODIFIED)
+
+    Raises:
+        Exception: 所有地址都失败时，抛出最后一个错误
+    """
+    async def request(url):
+        return url, await get_json(url, params=params, headers=headers, timeout=timeout, change_key=change_key)
+
+    pending = set()
+    remaining = list(urls)
+    last_error = None
+    try:
+        while remaining or pending:
+            if remaining:
+                pending.add(asyncio.create_task(request(remaining.pop(0))))
+            # 还有备用地址时只等待 hedge_delay 秒，否则等待任意请求完成
+            wait_timeout = hedge_delay if remaining else None
+            done, pending = await asyncio.wait(pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+                logger.warning(f"请求失败: {type(last_error).__name__}: {last_error}")
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_error or RuntimeError("没有可用的请求地址")
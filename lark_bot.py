@@ -1,9 +1,13 @@
 # lark_bot.py
-import requests
+import asyncio
 import json
 import logging
 import os
 
+import aiohttp
+
+from http_client import post_json
+
 # 设置日志
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                     level=logging.INFO)
@@ -19,34 +23,162 @@ except ImportError:
     LARK_WEBHOOK_URL = os.environ.get('LARK_WEBHOOK_URL')
     logger.info(f"使用环境变量中的 LARK_WEBHOOK_URL")
 
-def send_news_to_lark(message):
+# 多个 Webhook 地址用逗号分隔，例如同时推送到多个飞书群
+try:
+    from config import LARK_WEBHOOK_URLS
+except ImportError:
+    LARK_WEBHOOK_URLS = os.environ.get('LARK_WEBHOOK_URLS', '')
+
+# 单次请求超时（秒）、最多重试次数
+LARK_TIMEOUT = int(os.environ.get('LARK_TIMEOUT_SECONDS', '10'))
+LARK_MAX_RETRIES = int(os.environ.get('LARK_MAX_RETRIES', '3'))
+
+# 飞书自定义机器人请求体不能超过 20 KB，单条消息正文按 JSON 编码后的长度限制在此以内
+LARK_MAX_MESSAGE_BYTES = int(os.environ.get('LARK_MAX_MESSAGE_BYTES', '18000'))
+
+# 飞书返回的限流错误码
+LARK_RATE_LIMIT_CODES = {11232}
+
+
+class LarkError(Exception):
+    """飞书接口返回错误"""
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def get_webhook_urls():
+    """返回所有配置的 Webhook 地址（去重，保持顺序）"""
+    urls = []
+    candidates = [LARK_WEBHOOK_URL]
+    if isinstance(LARK_WEBHOOK_URLS, str):
+        candidates += LARK_WEBHOOK_URLS.split(',')
+    else:
+        candidates += list(LARK_WEBHOOK_URLS)
+    for url in candidates:
+        url = (url or '').strip()
+        if url.startswith('http') and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _encoded_size(text):
+    # 请求体中的正文会被 JSON 转义（中文和 emoji 转为 \\uXXXX），按转义后的长度计算
+    return len(json.dumps(text))
+
+
+def split_message(message, max_bytes=LARK_MAX_MESSAGE_BYTES):
     """
-    发送消息到 Lark 机器人
+    按行将消息拆分为多段，每段 JSON 编码后不超过 max_bytes
+
+    超长的单行按字符截断
+
+    Returns:
+        list: 消息段列表
     """
-    if not LARK_WEBHOOK_URL:
-        logger.warning("未配置 LARK_WEBHOOK_URL，跳过发送")
-        return
-    
-    try:
-        # 构建 Lark 消息
-        payload = {
-            "msg_type": "text",
-            "content": {
-                "text": message
-            }
+    chunks = []
+    current = ''
+    for line in message.splitlines(keepends=True):
+        if _encoded_size(current + line) <= max_bytes:
+            current += line
+            continue
+        if current:
+            chunks.append(current)
+            current = ''
+        while _encoded_size(line) > max_bytes:
+            # 二分查找不超过限制的最长前缀
+            low, high = 1, len(line)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if _encoded_size(line[:middle]) <= max_bytes:
+                    low = middle
+                else:
+                    high = middle - 1
+            chunks.append(line[:low])
+            line = line[low:]
+        current = line
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+async def _post_text(url, text):
+    payload = {
+        "msg_type": "text",
+        "content": {
+            "text": text
         }
-        
-        # 发送请求
-        response = requests.post(
-            LARK_WEBHOOK_URL,
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload)
-        )
-        
-        # 检查响应
-        if response.status_code == 200:
-            logger.info("成功发送消息到 Lark")
-        else:
-            logger.error(f"发送消息到 Lark 失败: {response.status_code} {response.text}")
+    }
+    try:
+        data = await post_json(url, payload, timeout=LARK_TIMEOUT)
+    except aiohttp.ClientResponseError as e:
+        raise LarkError(f"HTTP {e.status} {e.message}", retryable=e.status == 429 or e.status >= 500)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise LarkError(f"{type(e).__name__}: {e}", retryable=True)
+
+    # 新版接口返回 code，旧版接口返回 StatusCode
+    code = data.get("code", data.get("StatusCode", 0))
+    if code != 0:
+        raise LarkError(f"code={code}, msg={data.get('msg') or data.get('StatusMessage')}",
+                        retryable=code in LARK_RATE_LIMIT_CODES)
+
+
+async def _send_chunk(url, text):
+    attempt = 0
+    while True:
+        try:
+            await _post_text(url, text)
+            return
+        except LarkError as e:
+            if not e.retryable or attempt >= LARK_MAX_RETRIES:
+                raise
+            attempt += 1
+            wait = 2 ** attempt
+            logger.warning(f"发送消息到 Lark 失败: {e}，{wait} 秒后重试")
+            await asyncio.sleep(wait)
+
+
+async def _send_to_webhook(url, chunks):
+    try:
+        for chunk in chunks:
+            await _send_chunk(url, chunk)
+        logger.info(f"成功发送 {len(chunks)} 段消息到 Lark")
+        return True
     except Exception as e:
-        logger.error(f"发送消息到 Lark 出错: {e}")
\ No newline at end of file
+        logger.error(f"发送消息到 Lark 出错: {e}")
+        return False
+
+
+async def send_to_webhook(url, message):
+    """
+    发送消息到单个 Webhook 地址，超长消息拆分后按顺序发送
+
+    Returns:
+        bool: 所有消息段都发送成功时返回 True
+    """
+    chunks = split_message(message)
+    if not chunks:
+        return True
+    return await _send_to_webhook(url, chunks)
+
+
+async def send_news_to_lark(message):
+    """
+    发送消息到 Lark 机器人
+
+    超长消息按大小限制拆分后按顺序发送，多个 Webhook 地址并行发送
+
+    Returns:
+        bool: 所有 Webhook 都发送成功时返回 True
+    """
+    urls = get_webhook_urls()
+    if not urls:
+        logger.warning("未配置 LARK_WEBHOOK_URL，跳过发送")
+        return False
+
+    chunks = split_message(message)
+    if not chunks:
+        return True
+    results = await asyncio.gather(*(_send_to_webhook(url, chunks) for url in urls))
+    return all(results)
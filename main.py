@@ -54,10 +54,13 @@ async def main():
         logger.info(f"🌍 当前在【{environment_name}】中运行程序")
         
         # 导入必要的模块
-        from news_database import news_collection
-        from bot import send_latest_news, start_bot
+        from news_repository import news_repository
+        from bot import get_outbox_drainer, send_latest_news, start_bot
         from task_scheduler import start_scheduler
         
+        # 在后台连接数据库，Telegram Bot 无需等待数据库即可开始轮询
+        connect_task = asyncio.create_task(news_repository.connect())
+        
         # 启动 Telegram Bot
         polling_task = await start_bot()
         logger.info("Telegram Bot 已启动")
@@ -76,28 +79,22 @@ async def main():
                 if not key.startswith('PATH') and not key.startswith('LD_'):
                     logger.info(f"  {key}: {value}")
         
-        # 启动定时任务调度器
-        scheduler = start_scheduler()
-        logger.info("定时任务调度器已启动")
-        
-        # 立即执行一次抓取任务
-        logger.info("开始执行首次抓取任务...")
+        # 在数据库线程池中执行启动维护，不阻塞 Telegram 轮询：
+        # 将旧格式的 unique_id 改写为哈希格式，避免已存储的新闻被当作新新闻重复推送；
+        # 为旧文档补充 published_at；预加载最近已存储新闻的标识，之后的重复新闻无需查询数据库
+        await connect_task
+        await news_repository.prepare()
         
-        # 导入 scraper_main
-        from news_scraper import main as scraper_main
-        news_list = await scraper_main()
-        logger.info(f"首次抓取完成，获取到 {len(news_list)} 条新闻")
+        # MongoDB 不可用时在后台等待其恢复，恢复后写回内存存储中的新闻
+        reconnect_task = asyncio.create_task(news_repository.run_reconnector())
         
-        # 从 news_database 导入 store_news
-        from news_database import store_news
-        new_count = store_news(news_list)
+        # 启动推送队列的后台任务，并补发上次进程退出前未推送的新闻
+        (await get_outbox_drainer()).start()
+        await send_latest_news()
         
-        # 只有当有新内容时才发送
-        if new_count > 0:
-            logger.info(f"发现 {new_count} 条新新闻，准备推送...")
-            await send_latest_news()
-        else:
-            logger.info("无新内容，跳过推送")
+        # 启动定时任务调度器，每个交易所的抓取任务立即执行一次，之后按各自的间隔轮询
+        scheduler = start_scheduler()
+        logger.info("定时任务调度器已启动")
         
         # 保持程序运行
         while True:
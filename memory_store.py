@@ -0,0 +1,363 @@
+# memory_store.py
+import atexit
+import bisect
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# 最多保留的文档数量和最长保留时间（按 created_at），超出后淘汰最早入库的文档
+MEMORY_STORE_MAX_DOCUMENTS = int(os.environ.get('MEMORY_STORE_MAX_DOCUMENTS', '50000'))
+MEMORY_STORE_MAX_AGE_HOURS = int(os.environ.get('MEMORY_STORE_MAX_AGE_HOURS', '168'))
+
+# 快照文件路径，为空时不保存快照；有修改时每隔 MEMORY_STORE_SNAPSHOT_INTERVAL_SECONDS 秒保存一次
+MEMORY_STORE_SNAPSHOT_PATH = os.environ.get('MEMORY_STORE_SNAPSHOT_PATH', '')
+MEMORY_STORE_SNAPSHOT_INTERVAL = int(os.environ.get('MEMORY_STORE_SNAPSHOT_INTERVAL_SECONDS', '300'))
+
+
+def _sort_key(value):
+    # None 和缺失字段排在最前（与 MongoDB 一致），不同类型的值不会互相比较
+    return (value is not None, value if value is not None else 0)
+
+
+def _matches_condition(value, condition):
+    if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+        return value == condition
+    for operator, operand in condition.items():
+        if operator == "$in":
+            ok = value in operand
+        elif operator == "$ne":
+            ok = value != operand
+        elif operator == "$exists":
+            ok = (value is not None) == bool(operand)
+        elif value is None:
+            ok = False
+        elif operator == "$gte":
+            ok = value >= operand
+        elif operator == "$gt":
+            ok = value > operand
+        elif operator == "$lte":
+            ok = value <= operand
+        elif operator == "$lt":
+            ok = value < operand
+        else:
+            raise ValueError(f"不支持的查询操作符: {operator}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(document, query):
+    """判断文档是否满足查询条件（支持等值、$in、$ne、$exists、$gt/$gte/$lt/$lte）"""
+    return all(_matches_condition(document.get(field), condition) for field, condition in (query or {}).items())
+
+
+def _project(document, projection):
+    if not projection:
+        return dict(document)
+    included = [field for field, flag in projection.items() if flag and field != "_id"]
+    if not included:
+        return {key: value for key, value in document.items() if projection.get(key, 1)}
+    result = {field: document[field] for field in included if field in document}
+    if projection.get("_id", 1) and "_id" in document:
+        result["_id"] = document["_id"]
+    return result
+
+
+class UpdateResult:
+    def __init__(self, matched_count=0, modified_count=0, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class MemoryCursor:
+    """find() 返回的游标，支持 sort() 和 limit()，迭代时才执行查询"""
+
+    def __init__(self, store, query, projection):
+        self._store = store
+        self._query = query or {}
+        self._projection = projection
+        self._sort = []
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=1):
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    def __iter__(self):
+        documents = self._store._execute(self._query, self._sort, self._limit)
+        return iter([_project(document, self._projection) for document in documents])
+
+
+class MemoryStore:
+    """
+    MongoDB 不可用时使用的内存存储，提供 news_database 用到的集合接口
+
+    - unique_id 哈希索引：find_one / update_one 按 unique_id 查询为 O(1)
+    - created_at 有序索引：按入库时间范围查询和排序无需扫描全部文档
+    - find() 支持常用的查询操作符以及 sort() / limit()
+    - 超过 max_documents 或 max_age 时淘汰最早入库的文档
+    - 配置 snapshot_path 时定期把文档保存到磁盘，重启后从快照恢复
+
+    所有方法都持有锁，可以在数据库线程池中并发调用
+
+    Args:
+        max_documents (int): 最多保留的文档数量
+        max_age (timedelta): 文档按 created_at 最长保留时间
+        snapshot_path (str): 快照文件路径，为空时不保存
+        snapshot_interval (int): 有修改时保存快照的最短间隔（秒）
+    """
+
+    def __init__(self, max_documents=MEMORY_STORE_MAX_DOCUMENTS, max_age=timedelta(hours=MEMORY_STORE_MAX_AGE_HOURS),
+                 snapshot_path=MEMORY_STORE_SNAPSHOT_PATH, snapshot_interval=MEMORY_STORE_SNAPSHOT_INTERVAL):
+        self.max_documents = max_documents
+        self.max_age = max_age
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.RLock()
+        self._documents = {}          # _id -> 文档
+        self._by_unique_id = {}       # unique_id -> _id
+        self._by_created_at = []      # [(created_at, _id)]，按入库时间排序
+        self._ids = itertools.count(1)
+        self._dirty = False
+        self._last_snapshot = time.monotonic()
+        self.evicted = 0
+        self.snapshots = 0
+        if snapshot_path:
+            self.load_snapshot()
+            atexit.register(self.snapshot)
+
+    def __len__(self):
+        return len(self._documents)
+
+    @property
+    def data(self):
+        """所有文档，按入库时间排序"""
+        with self._lock:
+            return [self._documents[_id] for _, _id in self._by_created_at]
+
+    # ---------- 索引维护 ----------
+
+    def _index(self, document):
+        _id = document["_id"]
+        self._documents[_id] = document
+        if document.get("unique_id") is not None:
+            self._by_unique_id[document["unique_id"]] = _id
+        bisect.insort(self._by_created_at, (_sort_key(document.get("created_at")), _id))
+
+    def _unindex(self, document):
+        _id = document["_id"]
+        self._documents.pop(_id, None)
+        if self._by_unique_id.get(document.get("unique_id")) == _id:
+            del self._by_unique_id[document["unique_id"]]
+        entry = (_sort_key(document.get("created_at")), _id)
+        position = bisect.bisect_left(self._by_created_at, entry)
+        if position < len(self._by_created_at) and self._by_created_at[position] == entry:
+            del self._by_created_at[position]
+
+    def _insert(self, document):
+        document.setdefault("_id", next(self._ids))
+        self._index(document)
+        self._dirty = True
+        self._evict()
+        return document["_id"]
+
+    def _evict(self):
+        """按数量和入库时间淘汰最早的文档"""
+        count = 0
+        oldest_allowed = datetime.utcnow() - self.max_age if self.max_age else None
+        excess = len(self._by_created_at) - self.max_documents if self.max_documents else 0
+        for created_at, _id in self._by_created_at:
+            expired = oldest_allowed is not None and created_at[0] and created_at[1] < oldest_allowed
+            if count >= excess and not expired:
+                break
+            count += 1
+        if not count:
+            return
+        for _, _id in self._by_created_at[:count]:
+            document = self._documents.pop(_id)
+            if self._by_unique_id.get(document.get("unique_id")) == _id:
+                del self._by_unique_id[document["unique_id"]]
+        del self._by_created_at[:count]
+        self.evicted += count
+
+    # ---------- 查询 ----------
+
+    def _candidates(self, query):
+        """根据查询条件选择索引，返回候选文档"""
+        unique_id = query.get("unique_id")
+        if unique_id is not None and not isinstance(unique_id, dict):
+            _id = self._by_unique_id.get(unique_id)
+            return [self._documents[_id]] if _id is not None else []
+        if isinstance(unique_id, dict) and set(unique_id) == {"$in"}:
+            ids = (self._by_unique_id.get(value) for value in unique_id["$in"])
+            return [self._documents[_id] for _id in dict.fromkeys(ids) if _id is not None]
+
+        created_at = query.get("created_at")
+        if isinstance(created_at, dict) and ("$gte" in created_at or "$gt" in created_at):
+            lower = created_at.get("$gte", created_at.get("$gt"))
+            start = bisect.bisect_left(self._by_created_at, (_sort_key(lower), 0))
+            return [self._documents[_id] for _, _id in self._by_created_at[start:]]
+        return [self._documents[_id] for _, _id in self._by_created_at]
+
+    def _execute(self, query, sort, limit):
+        with self._lock:
+            documents = [document for document in self._candidates(query) if matches(document, query)]
+        # 多个排序字段时按从后往前的顺序依次稳定排序
+        for field, direction in reversed(sort):
+            documents.sort(key=lambda document: _sort_key(document.get(field)), reverse=direction < 0)
+        return documents[:limit] if limit else documents
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self, query, projection)
+
+    def find_one(self, query=None, projection=None):
+        for document in self.find(query, projection).limit(1):
+            return document
+        return None
+
+    def count_documents(self, query=None):
+        with self._lock:
+            return sum(1 for document in self._candidates(query or {}) if matches(document, query))
+
+    # ---------- 写入 ----------
+
+    def insert_one(self, document):
+        with self._lock:
+            _id = self._insert(dict(document))
+            self._maybe_snapshot()
+            return UpdateResult(upserted_id=_id)
+
+    def _apply_update(self, document, update):
+        changes = update.get("$set", {})
+        reindex = any(field in changes for field in ("unique_id", "created_at"))
+        if reindex:
+            self._unindex(document)
+        document.update(changes)
+        if reindex:
+            self._index(document)
+        self._dirty = True
+
+    def update_one(self, filter_query, update_query, upsert=False):
+        with self._lock:
+            for document in self._candidates(filter_query):
+                if matches(document, filter_query):
+                    self._apply_update(document, update_query)
+                    self._maybe_snapshot()
+                    return UpdateResult(matched_count=1, modified_count=1)
+            if not upsert:
+                return UpdateResult()
+            document = {field: value for field, value in filter_query.items() if not isinstance(value, dict)}
+            document.update(update_query.get("$setOnInsert", {}))
+            document.update(update_query.get("$set", {}))
+            _id = self._insert(document)
+            self._maybe_snapshot()
+            return UpdateResult(upserted_id=_id)
+
+    def update_many(self, filter_query, update_query):
+        with self._lock:
+            documents = [document for document in self._candidates(filter_query) if matches(document, filter_query)]
+            for document in documents:
+                self._apply_update(document, update_query)
+            self._maybe_snapshot()
+            return UpdateResult(matched_count=len(documents), modified_count=len(documents))
+
+    def delete_many(self, filter_query):
+        with self._lock:
+            documents = [document for document in self._candidates(filter_query) if matches(document, filter_query)]
+            for document in documents:
+                self._unindex(document)
+            self._dirty = self._dirty or bool(documents)
+            return UpdateResult(matched_count=len(documents))
+
+    def clear(self):
+        """删除所有文档（已写回 MongoDB 后调用），配置了快照时同时清空快照"""
+        with self._lock:
+            self._documents.clear()
+            self._by_unique_id.clear()
+            self._by_created_at.clear()
+            self._dirty = True
+        self.snapshot()
+
+    def create_index(self, *args, **kwargs):
+        # unique_id 和 created_at 索引始终存在
+        pass
+
+    # ---------- 快照 ----------
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, datetime):
+            return {"$date": value.isoformat()}
+        raise TypeError(f"无法保存类型 {type(value).__name__}")
+
+    @staticmethod
+    def _decode(item):
+        if set(item) == {"$date"}:
+            return datetime.fromisoformat(item["$date"])
+        return item
+
+    def _maybe_snapshot(self):
+        if self.snapshot_path and self._dirty and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self):
+        """把所有文档写入快照文件（先写临时文件再替换，写入中途退出不会损坏旧快照）"""
+        if not self.snapshot_path:
+            return False
+        with self._lock:
+            documents = self.data
+            temp_path = f"{self.snapshot_path}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    for document in documents:
+                        f.write(json.dumps(document, ensure_ascii=False, default=self._encode) + "\n")
+                os.replace(temp_path, self.snapshot_path)
+            except (OSError, TypeError) as e:
+                logger.error(f"保存内存存储快照失败: {e}")
+                return False
+            self._dirty = False
+            self._last_snapshot = time.monotonic()
+            self.snapshots += 1
+        logger.info(f"内存存储快照已保存: {len(documents)} 条文档 -> {self.snapshot_path}")
+        return True
+
+    def load_snapshot(self):
+        """从快照文件恢复文档，返回恢复的数量"""
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                documents = [json.loads(line, object_hook=self._decode) for line in f if line.strip()]
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.error(f"读取内存存储快照失败: {e}")
+            return 0
+        with self._lock:
+            for document in documents:
+                self._insert(document)
+            last_id = max((document["_id"] for document in documents if isinstance(document["_id"], int)), default=0)
+            self._ids = itertools.count(last_id + 1)
+            self._dirty = False
+        logger.info(f"已从快照恢复 {len(self)} 条文档: {self.snapshot_path}")
+        return len(self)
+
+    def stats(self):
+        """
+        Returns:
+            dict: 文档数量、淘汰数量和快照次数
+        """
+        with self._lock:
+            return {"documents": len(self._documents), "evicted": self.evicted, "snapshots": self.snapshots}
@@ -0,0 +1,72 @@
+# metrics.py
+from collections import deque
+
+
+class LatencyStats:
+    """
+    耗时统计：累计次数、最小/最大/平均值，以及最近样本的分位数
+
+    Args:
+        window (int): 计算分位数时保留的最近样本数量
+    """
+
+    def __init__(self, window=200):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+        self._recent = deque(maxlen=window)
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def percentile(self, p):
+        """返回最近样本的第 p 百分位数（0-100），没有样本时返回 None"""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        """
+        Returns:
+            dict: 统计摘要，时间单位为秒
+        """
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "last": round(self.last, 3),
+            "avg": round(self.total / self.count, 3),
+            "min": round(self.min, 3),
+            "max": round(self.max, 3),
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3)
+        }
+
+
+class LatencyRegistry:
+    """按名称（交易所、聊天、操作等）分组的 LatencyStats 集合"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._stats = {}
+
+    def get(self, name):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = LatencyStats(self.window)
+        return stats
+
+    def record(self, name, seconds):
+        self.get(name).record(seconds)
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self._stats.items()}
@@ -0,0 +1,497 @@
+# mock_exchange_server.py
+"""
+本地模拟交易所服务器，用于离线压测完整流程（抓取 → 存储 → 推送）
+
+- /pages/<交易所>：返回 fixtures/html 中的公告页快照
+- /v5/announcements/index：Bybit 格式的公告接口
+- /api/<交易所>：Binance、OKX、Bitget、KuCoin 公告接口格式
+- /webhook/<名称>：飞书 Webhook 格式的推送接口
+- /_stats：请求统计；POST /_faults：运行时修改故障注入参数
+
+每个 ?source= 对应一个独立的抓取源，每隔 --new-every 秒出现一条新公告；
+所有接口都支持注入延迟、5xx 错误和 429 限流，接口响应带 ETag，支持 304。
+
+设置 SCRAPER_MOCK_EXCHANGE_URL 后，EXCHANGE_CONFIGS、Bybit 和各公告接口的地址都指向模拟服务器。
+
+用法:
+    python mock_exchange_server.py serve --port 8765 --latency-ms 200 --error-rate 0.05
+    python mock_exchange_server.py loadtest --sources 300 --rounds 3 --channels 2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import random
+import tempfile
+import time
+from urllib.parse import quote
+
+from aiohttp import web
+
+from change_detector import change_detector, content_digest
+from exchange_scraper import EXCHANGE_CONFIGS, NewsScraperConfig, fetch_exchange_news
+from fixtures import load_html_fixture
+from metrics import LatencyRegistry, LatencyStats
+from source_adapters import (API_ADAPTERS, ApiAdapter, parse_binance_api, parse_bitget_api, parse_kucoin_api,
+                             parse_okx_api)
+
+logger = logging.getLogger(__name__)
+
+MOCK_SERVER_HOST = os.environ.get('MOCK_EXCHANGE_HOST', '127.0.0.1')
+MOCK_SERVER_PORT = int(os.environ.get('MOCK_EXCHANGE_PORT', '8765'))
+
+# 第一条模拟公告的发布时间（毫秒时间戳），之后每条间隔一分钟
+ANNOUNCEMENT_EPOCH_MS = 1767225600000
+
+ITEM_COUNT = 20
+
+
+def mock_announcements(source, sequence, count=ITEM_COUNT):
+    """返回抓取源最新的 count 条公告，sequence 为最新一条的序号"""
+    return [{
+        "id": f"{content_digest(source)[:8]}{index:08d}",
+        "title": f"{source} Will List MOCK{index} (M{index})",
+        "url": f"https://mock.exchange/{quote(source)}/announcement/{index}",
+        "published": ANNOUNCEMENT_EPOCH_MS + index * 60000
+    } for index in range(sequence, max(sequence - count, 0), -1)]
+
+
+def bybit_body(items):
+    return {"retCode": 0, "retMsg": "OK", "result": {"total": len(items), "list": [{
+        "title": item["title"], "description": item["title"], "url": item["url"],
+        "dateTimestamp": item["published"], "publishTime": item["published"]
+    } for item in items]}, "retExtInfo": {}}
+
+
+def binance_body(items):
+    articles = [{"code": item["id"], "title": item["title"], "releaseDate": item["published"]} for item in items]
+    return {"code": "000000", "data": {"catalogs": [{"catalogId": 48, "articles": articles}]}}
+
+
+def okx_body(items):
+    details = [{"title": item["title"], "url": item["url"], "pTime": str(item["published"])} for item in items]
+    return {"code": "0", "msg": "", "data": [{"details": details}]}
+
+
+def bitget_body(items):
+    data = [{"annTitle": item["title"], "annUrl": item["url"], "cTime": str(item["published"])} for item in items]
+    return {"code": "00000", "msg": "success", "data": data}
+
+
+def kucoin_body(items):
+    data = [{"annTitle": item["title"], "annUrl": item["url"], "cTime": item["published"]} for item in items]
+    return {"code": "200000", "data": {"items": data}}
+
+
+# 各接口格式：响应体构建函数和 source_adapters 中对应的解析函数
+API_STYLES = {
+    "Bybit": (bybit_body, None),
+    "Binance": (binance_body, parse_binance_api),
+    "OKX": (okx_body, parse_okx_api),
+    "Bitget": (bitget_body, parse_bitget_api),
+    "KuCoin": (kucoin_body, parse_kucoin_api)
+}
+
+
+class FaultInjector:
+    """
+    按比例向响应中注入延迟、5xx 错误和 429 限流
+
+    Args:
+        latency_ms (float): 每个请求的固定延迟（毫秒）
+        jitter_ms (float): 在固定延迟上附加的随机延迟上限（毫秒）
+        error_rate (float): 返回 503 的比例
+        rate_limit_rate (float): 返回 429 的比例
+        retry_after (int): 429 响应的 Retry-After（秒）
+        seed (int): 随机种子，便于复现
+    """
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit_rate=0.0, retry_after=1, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+
+    def update(self, settings):
+        for key in ("latency_ms", "jitter_ms", "error_rate", "rate_limit_rate", "retry_after"):
+            if key in settings:
+                setattr(self, key, type(getattr(self, key))(settings[key]))
+
+    def settings(self):
+        return {key: getattr(self, key) for key in ("latency_ms", "jitter_ms", "error_rate", "rate_limit_rate", "retry_after")}
+
+    async def apply(self):
+        """
+        等待注入的延迟，按比例返回错误响应
+
+        Returns:
+            web.Response: 需要返回错误时的响应，否则返回 None
+        """
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return web.json_response({"code": 429, "msg": "Too Many Requests"}, status=429,
+                                     headers={"Retry-After": str(self.retry_after)})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return web.json_response({"code": 503, "msg": "Service Unavailable"}, status=503)
+        return None
+
+
+class MockExchangeServer:
+    """
+    模拟交易所服务器
+
+    Args:
+        faults (FaultInjector): 故障注入参数
+        new_every (float): 每个抓取源每隔多少秒出现一条新公告，0 表示公告不变
+    """
+
+    def __init__(self, faults=None, new_every=0):
+        self.faults = faults or FaultInjector()
+        self.new_every = new_every
+        self.counts = {}
+        self._pages = {}
+        self._started_at = time.monotonic()
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.add_routes([
+            web.get("/v5/announcements/index", self.handle_bybit),
+            web.get("/api/{style}", self.handle_api),
+            web.get("/pages/{name}", self.handle_page),
+            web.post("/webhook/{name}", self.handle_webhook),
+            web.get("/_stats", self.handle_stats),
+            web.post("/_faults", self.handle_faults)
+        ])
+
+    def _count(self, field):
+        self.counts[field] = self.counts.get(field, 0) + 1
+
+    def sequence(self):
+        """当前最新公告的序号"""
+        if not self.new_every:
+            return ITEM_COUNT
+        return ITEM_COUNT + int((time.monotonic() - self._started_at) / self.new_every)
+
+    async def _inject(self, route):
+        self._count(route)
+        response = await self.faults.apply()
+        if response is not None:
+            self._count(f"status_{response.status}")
+        return response
+
+    def _json_with_etag(self, request, body):
+        text = web.json_response(body).text
+        etag = f'"{content_digest(text)}"'
+        if request.headers.get("If-None-Match") == etag:
+            self._count("status_304")
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=text, content_type="application/json", headers={"ETag": etag})
+
+    async def handle_bybit(self, request):
+        return await self._api_response(request, "Bybit")
+
+    async def handle_api(self, request):
+        style = request.match_info["style"]
+        if style not in API_STYLES:
+            raise web.HTTPNotFound()
+        return await self._api_response(request, style)
+
+    async def _api_response(self, request, style):
+        error = await self._inject(f"api_{style}")
+        if error is not None:
+            return error
+        source = request.query.get("source", style)
+        build_body = API_STYLES[style][0]
+        return self._json_with_etag(request, build_body(mock_announcements(source, self.sequence())))
+
+    async def handle_page(self, request):
+        name = request.match_info["name"]
+        error = await self._inject("page")
+        if error is not None:
+            return error
+        if name not in self._pages:
+            self._pages[name] = load_html_fixture(name)
+        if self._pages[name] is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=self._pages[name], content_type="text/html")
+
+    async def handle_webhook(self, request):
+        await request.read()
+        error = await self._inject("webhook")
+        if error is not None:
+            return error
+        return web.json_response({"code": 0, "msg": "success", "data": {}})
+
+    async def handle_stats(self, request):
+        return web.json_response({"counts": self.counts, "faults": self.faults.settings(), "sequence": self.sequence()})
+
+    async def handle_faults(self, request):
+        self.faults.update(await request.json())
+        logger.info(f"故障注入参数已更新: {self.faults.settings()}")
+        return web.json_response(self.faults.settings())
+
+    async def start(self, host=MOCK_SERVER_HOST, port=MOCK_SERVER_PORT):
+        """
+        启动服务器
+
+        Returns:
+            str: 服务器地址，例如 http://127.0.0.1:8765
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self._started_at = time.monotonic()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def point_sources_at(base_url, bybit_urls=None):
+    """
+    将 EXCHANGE_CONFIGS、各公告接口和 Bybit 接口的地址改为模拟服务器
+
+    Args:
+        base_url (str): 模拟服务器地址
+        bybit_urls (list): news_scraper.BYBIT_API_URLS，原地修改
+    """
+    base_url = base_url.rstrip("/")
+    for name, config in EXCHANGE_CONFIGS.items():
+        config.url = f"{base_url}/pages/{quote(name)}"
+        config.base_url = base_url
+    for name, adapter in API_ADAPTERS.items():
+        adapter.url = f"{base_url}/api/{name}"
+    if bybit_urls is not None:
+        bybit_urls[:] = [f"{base_url}/v5/announcements/index"]
+    logger.warning(f"⚠️ 所有抓取源已指向模拟交易所服务器 {base_url}")
+
+
+def build_load_sources(base_url, count, browser_count=0):
+    """
+    构建压测用的抓取源：count 个接口抓取源轮流使用各接口格式，browser_count 个浏览器抓取源使用页面快照
+
+    Returns:
+        list: ScrapeSource 列表
+    """
+    from news_scraper import parse_bybit_announcements
+    from scrape_orchestrator import ScrapeSource
+
+    sources = []
+    styles = list(API_STYLES)
+    for index in range(count):
+        style = styles[index % len(styles)]
+        name = f"Mock{style}-{index:04d}"
+        parse = API_STYLES[style][1] or parse_bybit_announcements
+        url = f"{base_url}/v5/announcements/index" if style == "Bybit" else f"{base_url}/api/{style}"
+        adapter = ApiAdapter(
+            name, url, {"source": name},
+            lambda data, parse=parse, name=name: [{**news, "source": name} for news in parse(data)]
+        )
+        sources.append(ScrapeSource(name, adapter.fetch, kind="api"))
+
+    templates = [name for name in EXCHANGE_CONFIGS if load_html_fixture(name) is not None]
+    for index in range(browser_count if templates else 0):
+        template = EXCHANGE_CONFIGS[templates[index % len(templates)]]
+        config = NewsScraperConfig(
+            f"MockPage-{index:04d}", f"{base_url}/pages/{quote(template.name)}",
+            template.selectors, base_url=base_url, timeout=template.timeout
+        )
+        sources.append(ScrapeSource(config.name, lambda config=config: fetch_exchange_news(config), kind="browser"))
+    return sources
+
+
+async def monitor_loop_lag(stats, interval=0.05):
+    """记录事件循环的调度延迟，同步阻塞（如数据库写入）会使延迟升高"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stats.record(max(0.0, loop.time() - start - interval))
+
+
+async def run_load_test(sources=100, rounds=3, interval=5.0, channels=2, browser_sources=0,
+                        faults=None, drain_timeout=60, verbose=False):
+    """
+    启动模拟服务器，按轮次执行完整流程：并发抓取所有抓取源 → 存储 → 推送队列推送到模拟 Webhook
+
+    新闻和推送队列都写入临时目录中的 SQLite 文件，不会写入配置的数据库，
+    避免模拟新闻在之后被 send_latest_news 当作未推送新闻推送到真实的聊天
+
+    Returns:
+        dict: 各环节耗时统计、事件循环延迟、吞吐量和服务器请求统计
+    """
+    server = MockExchangeServer(faults, new_every=interval)
+    base_url = await server.start(port=0)
+
+    import news_scraper
+    from bot import send_to_lark_webhook
+    from browser_pool import browser_pool
+    from delivery_outbox import OutboxDrainer, SqliteOutboxStore
+    from http_client import close_http_session
+    from news_repository import NewsRepository
+    from scrape_orchestrator import ScrapeOrchestrator
+    from sqlite_storage import SqliteNewsStorage
+
+    if not verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    point_sources_at(base_url, news_scraper.BYBIT_API_URLS)
+
+    stages = LatencyRegistry(window=10000)
+    loop_lag = LatencyStats(window=10000)
+    totals = {"scraped": 0, "new": 0, "errors": 0, "unchanged": 0}
+
+    def make_sender(url):
+        async def send(news_docs):
+            start = time.perf_counter()
+            try:
+                return await send_to_lark_webhook(url, news_docs)
+            finally:
+                stages.record("deliver", time.perf_counter() - start)
+        return send
+
+    state_dir = tempfile.mkdtemp(prefix="mock_loadtest_")
+    repository = NewsRepository(SqliteNewsStorage(os.path.join(state_dir, "news.db")))
+    outbox_path = os.path.join(state_dir, "outbox.db")
+    senders = {f"lark:mock{index}": make_sender(f"{base_url}/webhook/{index}") for index in range(channels)}
+    drainer = OutboxDrainer(SqliteOutboxStore(outbox_path), senders, poll_interval=1)
+    orchestrator = ScrapeOrchestrator(build_load_sources(base_url, sources, browser_sources))
+    lag_task = asyncio.create_task(monitor_loop_lag(loop_lag))
+    drainer.start()
+    round_durations = []
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    try:
+        with output:
+            for round_index in range(rounds):
+                if round_index:
+                    await asyncio.sleep(interval)
+                round_start = time.perf_counter()
+                async for outcome in orchestrator.stream():
+                    stages.record("scrape", outcome.duration)
+                    totals["scraped"] += len(outcome.news)
+                    totals["errors"] += 0 if outcome.ok else 1
+                    totals["unchanged"] += 1 if outcome.unchanged else 0
+                    if not outcome.news:
+                        continue
+                    start = time.perf_counter()
+                    result = await repository.store_news_bulk(outcome.news)
+                    if not result.ok:
+                        change_detector.forget_source(outcome.name)
+                    new_documents = result.new_documents
+                    stages.record("store", time.perf_counter() - start)
+                    if new_documents:
+                        totals["new"] += len(new_documents)
+                        start = time.perf_counter()
+                        await drainer.enqueue(new_documents)
+                        # 与 bot.send_news 一致：加入推送队列后清除待推送标记
+                        await repository.mark_delivered(news["unique_id"] for news in new_documents)
+                        stages.record("enqueue", time.perf_counter() - start)
+                round_durations.append(time.perf_counter() - round_start)
+
+            # 等待推送队列清空
+            drain_start = time.perf_counter()
+            while any(stats["pending"] for stats in drainer.stats().values()):
+                if time.perf_counter() - drain_start > drain_timeout:
+                    break
+                await asyncio.sleep(0.2)
+            drain_seconds = time.perf_counter() - drain_start
+    finally:
+        lag_task.cancel()
+        await drainer.stop()
+        await close_http_session()
+        await browser_pool.close()
+        await server.stop()
+
+    stage_summary = stages.summary()
+    stage_totals = {name: stages.get(name).total for name in stage_summary}
+    busiest = max(stage_totals, key=stage_totals.get) if stage_totals else None
+    return {
+        "sources": len(orchestrator.sources),
+        "rounds": round_durations,
+        "drain_seconds": drain_seconds,
+        "totals": totals,
+        "delivered": sum(stats["delivered"] for stats in drainer.stats().values()),
+        "stages": stage_summary,
+        "stage_totals": stage_totals,
+        "busiest_stage": busiest,
+        "loop_lag": loop_lag.summary(),
+        "database": repository.stats(),
+        "server": dict(server.counts)
+    }
+
+
+def print_report(report):
+    print(f"\n=== 压测结果：{report['sources']} 个抓取源，{len(report['rounds'])} 轮 ===")
+    for index, seconds in enumerate(report["rounds"], 1):
+        print(f"第 {index} 轮耗时 {seconds:.2f} 秒")
+    totals = report["totals"]
+    wall = sum(report["rounds"])
+    print(f"抓取 {totals['scraped']} 条（{totals['scraped'] / wall:.0f} 条/秒），新增 {totals['new']} 条，"
+          f"推送 {report['delivered']} 条，失败 {totals['errors']} 次，未变化 {totals['unchanged']} 次")
+    print(f"推送队列清空耗时 {report['drain_seconds']:.2f} 秒\n")
+    for name, summary in report["stages"].items():
+        print(f"{name:<8} 累计 {report['stage_totals'][name]:>8.2f} 秒  {summary}")
+    print(f"事件循环延迟: {report['loop_lag']}")
+    for operation, summary in report["database"]["latency"].items():
+        print(f"数据库 {operation}: {summary}，排队 {report['database']['queue_wait'].get(operation)}")
+    print(f"服务器请求统计: {report['server']}")
+    if report["busiest_stage"]:
+        print(f"\n累计耗时最多的环节: {report['busiest_stage']}")
+
+
+async def serve(args, faults):
+    server = MockExchangeServer(faults, new_every=args.new_every)
+    base_url = await server.start(args.host, args.port)
+    print(f"模拟交易所服务器已启动: {base_url}")
+    print(f"设置 SCRAPER_MOCK_EXCHANGE_URL={base_url} 让抓取源指向该服务器，"
+          f"飞书 Webhook 可使用 {base_url}/webhook/<名称>")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟交易所服务器")
+    parser.add_argument("command", choices=["serve", "loadtest"])
+    parser.add_argument("--host", default=MOCK_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=MOCK_SERVER_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个请求的固定延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="附加的随机延迟上限")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的比例")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--new-every", type=float, default=60, help="serve：每个抓取源每隔多少秒出现一条新公告")
+    parser.add_argument("--sources", type=int, default=100, help="loadtest：接口抓取源数量")
+    parser.add_argument("--browser-sources", type=int, default=0, help="loadtest：浏览器抓取源数量（需要 Playwright）")
+    parser.add_argument("--rounds", type=int, default=3, help="loadtest：抓取轮数")
+    parser.add_argument("--interval", type=float, default=5, help="loadtest：每轮间隔（秒），同时也是新公告出现的间隔")
+    parser.add_argument("--channels", type=int, default=2, help="loadtest：模拟推送渠道数量")
+    parser.add_argument("--verbose", action="store_true", help="loadtest：输出抓取过程中的日志")
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, seed=args.seed)
+    if args.command == "serve":
+        asyncio.run(serve(args, faults))
+    else:
+        report = asyncio.run(run_load_test(
+            args.sources, args.rounds, args.interval, args.channels, args.browser_sources, faults,
+            verbose=args.verbose
+        ))
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
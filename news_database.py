@@ -1,9 +1,18 @@
 # news_database.py
+import hashlib
 import os
-from pymongo import MongoClient
+import sys
+import threading
+import time
+import unicodedata
+from pymongo import DeleteOne, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from memory_store import MEMORY_STORE_SNAPSHOT_PATH, MemoryStore
+from seen_cache import SeenIdCache
+from time_parser import parse_news_time
 
 # 加载.env文件中的环境变量
 load_dotenv()
@@ -39,134 +48,733 @@ except ImportError:
         logger.error("MongoDB URI 格式不正确，使用默认本地连接")
         MONGO_URI = 'mongodb://localhost:27017'
 
-# 连接到MongoDB
-try:
-    # 检查运行环境
-    is_railway = os.environ.get('RAILWAY_ENVIRONMENT') is not None
-    environment_name = "Railway环境" if is_railway else "本地环境"
-    logger.info(f"🌍 当前在【{environment_name}】中连接数据库")
-    
+# 新闻存储后端：mongo（默认，MongoDB 不可用时使用内存存储）或 sqlite（本地文件，见 sqlite_storage.py）
+NEWS_STORAGE_BACKEND = os.environ.get('NEWS_STORAGE_BACKEND', 'mongo').lower()
+
+# 已废弃的索引：title 全文长度索引没有任何查询使用
+LEGACY_INDEXES = ["title_index_non_unique"]
+
+
+def ensure_indexes(collection):
+    """
+    创建 news 集合的索引
+
+    - unique_id_index: 定长哈希 unique_id 的唯一索引，用于去重
+    - created_at_index: 按入库时间范围查询并倒序排序（推送最新新闻）
+    - source_published_at_index: 按交易所和发布时间查询（每个交易所最新 N 条、按发布时间范围查询）
+    """
+    collection.create_index([("unique_id", 1)], unique=True, sparse=True, name="unique_id_index")
+    collection.create_index([("created_at", -1)], name="created_at_index")
+    collection.create_index([("source", 1), ("published_at", -1)], name="source_published_at_index")
+
+    existing = collection.index_information()
+    for name in LEGACY_INDEXES:
+        if name in existing:
+            collection.drop_index(name)
+            logger.info(f"已删除废弃索引: {name}")
+
+
+# 数据库连接在首次访问时建立（见 connect），导入本模块不会访问网络
+client = None
+db = None
+_collection = None
+_connect_lock = threading.Lock()
+
+# 切换回 MongoDB 后尚未完成写回的内存存储
+_write_back_store = None
+
+# MongoDB 恢复后每次 bulk_write 写回的新闻数量；重连尝试、切换和写回统计
+WRITE_BACK_BATCH_SIZE = int(os.environ.get('MEMORY_STORE_WRITE_BACK_BATCH_SIZE', '500'))
+WRITE_BACK_STATS = {"attempts": 0, "reconnects": 0, "flushed": 0, "flush_seconds": 0.0}
+
+# 连接完成（成功连接 MongoDB 或改用内存存储）后置位；索引在后台创建，完成后置位
+database_ready = threading.Event()
+indexes_ready = threading.Event()
+
+
+def _ensure_indexes_in_background(collection):
+    try:
+        ensure_indexes(collection)
+        logger.info("✅ news 集合索引已就绪")
+    except Exception as e:
+        logger.error(f"创建 news 集合索引失败: {e}")
+    finally:
+        indexes_ready.set()
+
+
+def _open_mongo():
+    """连接 MongoDB 并测试连接，返回 (client, db)"""
     # 添加连接超时设置和重试逻辑
-    client = MongoClient(MONGO_URI, 
-                        serverSelectionTimeoutMS=5000,
-                        retryWrites=True,
-                        connectTimeoutMS=30000,
-                        socketTimeoutMS=45000)
-    
+    mongo_client = MongoClient(MONGO_URI,
+                               serverSelectionTimeoutMS=5000,
+                               retryWrites=True,
+                               connectTimeoutMS=30000,
+                               socketTimeoutMS=45000)
+
     # 测试连接
-    client.admin.command('ping')
-    
+    mongo_client.admin.command('ping')
+
     # 使用固定的数据库名称，不再根据环境区分
-    db = client["crypto_news"]
-    
-    # 创建集合
-    news_collection = db["news"]
-    
-    # 创建索引以确保新闻的唯一性
-    news_collection.create_index([("unique_id", 1)], unique=True, sparse=True, name="unique_id_index")
-    news_collection.create_index([("title", 1)], name="title_index_non_unique")
-    
-    logger.info(f"✅ 成功连接到 MongoDB Atlas")
-except Exception as e:
-    logger.error(f"❌ MongoDB 连接失败: {e}")
-    logger.exception("MongoDB 连接详细错误")
-    
-    # 创建一个备用的内存存储，以防数据库连接失败
-    class FallbackCollection:
-        def __init__(self):
-            self.data = []
-            
-        def insert_one(self, document):
-            self.data.append(document)
-            return True
-            
-        def find(self, query=None):
-            # 简单实现查询功能
-            if not query:
-                return self.data
-            
-            # 处理时间查询
-            if query.get("created_at", {}).get("$gte"):
-                min_time = query["created_at"]["$gte"]
-                return [doc for doc in self.data if doc.get("created_at", datetime.min) >= min_time]
-            
-            return self.data
-            
-        def create_index(self, *args, **kwargs):
-            pass
-        
-        def sort(self, field_name=None, direction=None):
-            """
-            模拟 MongoDB 的 sort 方法
-            """
-            # 简单实现，不做实际排序
-            return self
-        
-        def find_one(self, query):
-            """
-            模拟 MongoDB 的 find_one 方法
-            """
-            for doc in self.data:
-                match = True
-                for key, value in query.items():
-                    if key not in doc or doc[key] != value:
-                        match = False
-                        break
-                if match:
-                    return doc
-            return None
-        
-        def update_one(self, filter_query, update_query, upsert=False):
-            """
-            模拟 MongoDB 的 update_one 方法，支持 upsert 操作
-            
-            Args:
-                filter_query (dict): 查询条件
-                update_query (dict): 更新操作
-                upsert (bool): 如果为 True，当文档不存在时插入新文档
-            
-            Returns:
-                UpdateResult: 包含 upserted_id 属性的模拟更新结果对象
-            """
-            # 查找匹配的文档
-            existing_doc = None
-            for doc in self.data:
-                match = True
-                for key, value in filter_query.items():
-                    if key not in doc or doc[key] != value:
-                        match = False
-                        break
-                if match:
-                    existing_doc = doc
-                    break
-            
-            # 如果找到文档，更新它
-            if existing_doc:
-                if "$set" in update_query:
-                    for key, value in update_query["$set"].items():
-                        existing_doc[key] = value
-                return type('UpdateResult', (), {'upserted_id': None})()
-            
-            # 如果没找到文档且 upsert=True，创建新文档
-            elif upsert:
-                new_doc = {}
-                # 添加查询条件到新文档
-                new_doc.update(filter_query)
-                # 添加更新内容
-                if "$set" in update_query:
-                    new_doc.update(update_query["$set"])
-                self.data.append(new_doc)
-                return type('UpdateResult', (), {'upserted_id': id(new_doc)})()
-            
-            # 如果没找到文档且 upsert=False，返回无更新结果
-            return type('UpdateResult', (), {'upserted_id': None})()
-    
-    news_collection = FallbackCollection()
-    logger.warning("⚠️ 使用内存存储作为备用")
+    return mongo_client, mongo_client["crypto_news"]
+
+
+def connect():
+    """
+    连接 MongoDB（只执行一次，并发调用时等待同一次连接），失败时改用内存存储
+
+    索引在后台线程中创建，不阻塞首次读写；改用内存存储后由 reconnect 在 MongoDB 恢复时切换回来
+
+    Returns:
+        news 集合（pymongo Collection 或 MemoryStore）
+    """
+    global client, db, _collection, _write_back_store
+    if _collection is not None:
+        return _collection
+    with _connect_lock:
+        if _collection is not None:
+            return _collection
+        try:
+            # 检查运行环境
+            is_railway = os.environ.get('RAILWAY_ENVIRONMENT') is not None
+            environment_name = "Railway环境" if is_railway else "本地环境"
+            logger.info(f"🌍 当前在【{environment_name}】中连接数据库")
+
+            client, db = _open_mongo()
+            collection = db["news"]
+
+            # 创建索引以确保新闻的唯一性
+            threading.Thread(target=_ensure_indexes_in_background, args=(collection,),
+                             name="mongo-indexes", daemon=True).start()
+
+            # 上次运行时 MongoDB 不可用、保存在快照中的新闻，由 reconnect 写回
+            if MEMORY_STORE_SNAPSHOT_PATH and os.path.exists(MEMORY_STORE_SNAPSHOT_PATH):
+                store = MemoryStore()
+                if len(store):
+                    _write_back_store = store
+
+            logger.info(f"✅ 成功连接到 MongoDB Atlas")
+        except Exception as e:
+            logger.error(f"❌ MongoDB 连接失败: {e}")
+            logger.exception("MongoDB 连接详细错误")
+            collection = MemoryStore()
+            db = None
+            indexes_ready.set()
+            logger.warning("⚠️ 使用内存存储作为备用")
+        _collection = collection
+        database_ready.set()
+        return collection
+
+
+def _write_back_operations(documents):
+    """
+    把内存存储中的文档转换为按 unique_id 幂等写入的操作
+
+    已存在的新闻保持不变（$setOnInsert）；内存存储中已推送的新闻同时标记为已推送，避免重启后补发
+    """
+    operations = []
+    for document in documents:
+        unique_id = document.get("unique_id")
+        if not unique_id:
+            continue
+        fields = {key: value for key, value in document.items()
+                  if key not in ("_id", "pending_delivery", "delivered_at")}
+        update = {"$setOnInsert": fields}
+        if document.get("pending_delivery") is False:
+            update["$set"] = {"pending_delivery": False, "delivered_at": document.get("delivered_at")}
+        elif "pending_delivery" in document:
+            fields["pending_delivery"] = True
+        operations.append(UpdateOne({"unique_id": unique_id}, update, upsert=True))
+    return operations
+
+
+def write_back(store, collection, batch_size=WRITE_BACK_BATCH_SIZE):
+    """
+    把内存存储中的所有新闻分批写回 MongoDB，重复执行不会产生重复文档
+
+    写回统计只计入 MongoDB 实际新增（upserted）或修改（modified）的文档，
+    重复写回时已存在且未变化的文档不会被重复计数
+
+    Args:
+        store (MemoryStore): 内存存储
+        collection: MongoDB news 集合
+        batch_size (int): 每次 bulk_write 的操作数量
+
+    Returns:
+        int: MongoDB 新增或修改的文档数量
+    """
+    operations = _write_back_operations(store.data)
+    started = time.perf_counter()
+    written = 0
+    try:
+        for start in range(0, len(operations), batch_size):
+            try:
+                result = collection.bulk_write(operations[start:start + batch_size], ordered=False)
+                written += result.upserted_count + result.modified_count
+            except BulkWriteError as e:
+                written += e.details.get("nUpserted", 0) + e.details.get("nModified", 0)
+                # 并发写入同一 unique_id 导致的唯一索引冲突说明文档已存在，其他错误需要重试
+                errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+                if errors:
+                    raise
+    finally:
+        # 中途失败时已写入的文档也计入统计，重试时它们已存在，不会再次计数
+        elapsed = time.perf_counter() - started
+        WRITE_BACK_STATS["flushed"] += written
+        WRITE_BACK_STATS["flush_seconds"] += elapsed
+    rate = written / elapsed if elapsed else 0
+    logger.info(f"已将内存存储中的 {written} 条新闻写回 MongoDB（共检查 {len(operations)} 条），"
+                f"耗时 {elapsed:.2f} 秒（{rate:.0f} 条/秒）")
+    return written
+
+
+def needs_reconnect():
+    """是否正在使用内存存储，或仍有内存存储中的新闻未写回 MongoDB"""
+    return isinstance(_collection, MemoryStore) or _write_back_store is not None
+
+
+def reconnect():
+    """
+    MongoDB 恢复后把内存存储中的新闻写回，并切换回 MongoDB
+
+    先写回再切换，切换后再写回一次：切换前已取得内存存储的写入可能仍在进行，
+    写回按 unique_id 幂等，重复写入不会产生重复文档。写回失败时保留内存存储，下次调用时重试
+
+    Returns:
+        bool: 本次调用是否从内存存储切换回了 MongoDB（已在使用 MongoDB、只是重试写回时为 False）
+    """
+    global client, db, _collection, _write_back_store
+    switched = False
+    if isinstance(_collection, MemoryStore):
+        WRITE_BACK_STATS["attempts"] += 1
+        try:
+            new_client, new_db = _open_mongo()
+            collection = new_db["news"]
+            write_back(_collection, collection)
+        except Exception as e:
+            logger.warning(f"MongoDB 仍不可用，继续使用内存存储: {e}")
+            return False
+        with _connect_lock:
+            _write_back_store = _collection
+            client, db, _collection = new_client, new_db, collection
+        threading.Thread(target=_ensure_indexes_in_background, args=(collection,),
+                         name="mongo-indexes", daemon=True).start()
+        WRITE_BACK_STATS["reconnects"] += 1
+        switched = True
+        logger.info("✅ MongoDB 已恢复，已切换回 MongoDB")
+
+    store = _write_back_store
+    if store is not None:
+        try:
+            write_back(store, _collection)
+        except Exception as e:
+            logger.error(f"写回内存存储中的新闻失败，稍后重试: {e}")
+            return switched
+        store.clear()
+        _write_back_store = None
+    return switched
+
+
+def write_back_stats():
+    """
+    Returns:
+        dict: 内存存储中等待写回的新闻数量、重连次数、写回数量和写回速度（条/秒）
+    """
+    store = _write_back_store or (_collection if isinstance(_collection, MemoryStore) else None)
+    seconds = WRITE_BACK_STATS["flush_seconds"]
+    return {
+        "buffered": len(store) if store is not None else 0,
+        "attempts": WRITE_BACK_STATS["attempts"],
+        "reconnects": WRITE_BACK_STATS["reconnects"],
+        "flushed": WRITE_BACK_STATS["flushed"],
+        "flush_rate": round(WRITE_BACK_STATS["flushed"] / seconds, 1) if seconds else None
+    }
+
+
+def get_database():
+    """返回 pymongo Database，MongoDB 不可用或使用 SQLite 存储时返回 None（首次调用时建立连接）"""
+    if NEWS_STORAGE_BACKEND == "sqlite":
+        return None
+    connect()
+    return db
+
+
+def is_database_ready():
+    """数据库连接是否已完成（成功连接或已改用内存存储）"""
+    return database_ready.is_set()
+
+
+def memory_store_stats():
+    """MongoDB 不可用、正在使用内存存储时返回其统计信息，否则返回 None"""
+    if isinstance(_collection, MemoryStore):
+        return _collection.stats()
+    return None
+
+
+class LazyCollection:
+    """news 集合的代理，首次访问任何属性时才连接数据库"""
+
+    def __getattr__(self, name):
+        return getattr(connect(), name)
+
+
+news_collection = LazyCollection()
+
+# 最近已存储新闻的 unique_id 缓存，命中时无需访问数据库
+SEEN_CACHE_MAX_SIZE = int(os.environ.get('SEEN_CACHE_MAX_SIZE', '20000'))
+SEEN_CACHE_TTL_HOURS = int(os.environ.get('SEEN_CACHE_TTL_HOURS', '168'))
+SEEN_CACHE_WARM_DAYS = int(os.environ.get('SEEN_CACHE_WARM_DAYS', '30'))
+seen_cache = SeenIdCache(maxsize=SEEN_CACHE_MAX_SIZE, ttl=SEEN_CACHE_TTL_HOURS * 3600)
+
+# 启动时补发多少小时内未推送的新闻
+DELIVERY_RECOVERY_HOURS = int(os.environ.get('DELIVERY_RECOVERY_HOURS', '24'))
+
+
+def warm_seen_cache(days=SEEN_CACHE_WARM_DAYS):
+    """
+    启动时从数据库加载最近几天新闻的 unique_id 到缓存
+
+    Args:
+        days (int): 加载最近多少天的新闻
+
+    Returns:
+        int: 加载的 unique_id 数量
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    try:
+        unique_ids = get_storage().recent_unique_ids(since)
+    except Exception as e:
+        logger.error(f"预加载已存储新闻标识失败: {e}")
+        return 0
+
+    seen_cache.add_many(unique_ids)
+    logger.info(f"已预加载最近 {days} 天的 {len(unique_ids)} 条新闻标识到缓存")
+    return len(unique_ids)
+
+def _normalize_text(text):
+    """统一 Unicode 形式并合并连续空白"""
+    return " ".join(unicodedata.normalize("NFKC", str(text)).split())
+
+
+def make_unique_id(source, title):
+    """
+    根据来源和标题生成定长的新闻唯一标识
+
+    对规范化后的来源（忽略大小写）和标题计算 16 字节 BLAKE2b 摘要，
+    返回 32 位十六进制字符串，索引体积不再随标题长度增长
+
+    Args:
+        source (str): 新闻来源
+        title (str): 新闻标题
+
+    Returns:
+        str: 32 位十六进制字符串
+    """
+    key = f"{_normalize_text(source).casefold()}\x1f{_normalize_text(title)}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def migrate_unique_ids(batch_size=500):
+    """
+    将旧格式的 unique_id（"来源_标题" 原始字符串）改写为哈希格式
+
+    按入库时间从早到晚处理，规范化后重复的新闻只保留最早的一条。可重复执行，
+    已是哈希格式的文档不会被修改
+
+    Args:
+        batch_size (int): 每次 bulk_write 的操作数量
+
+    Returns:
+        dict: 改写数量和删除的重复数量
+    """
+    if NEWS_STORAGE_BACKEND == "sqlite":
+        return {"updated": 0, "deleted": 0}
+    if not hasattr(news_collection, "bulk_write"):
+        logger.info("当前使用内存存储，无需迁移 unique_id")
+        return {"updated": 0, "deleted": 0}
+
+    documents = news_collection.find(
+        {}, {"_id": 1, "unique_id": 1, "source": 1, "title": 1}
+    ).sort("created_at", 1)
+
+    seen_ids = set()
+    operations = []
+    updated = deleted = 0
+    for doc in documents:
+        if not doc.get("title"):
+            continue
+        new_id = make_unique_id(doc.get("source") or "Unknown", doc["title"])
+        if new_id in seen_ids:
+            operations.append(DeleteOne({"_id": doc["_id"]}))
+            deleted += 1
+        elif doc.get("unique_id") != new_id:
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"unique_id": new_id}}))
+            updated += 1
+        seen_ids.add(new_id)
+
+    # 先删除重复文档，避免改写时触发唯一索引冲突
+    operations.sort(key=lambda op: not isinstance(op, DeleteOne))
+    for start in range(0, len(operations), batch_size):
+        news_collection.bulk_write(operations[start:start + batch_size], ordered=True)
+
+    if updated or deleted:
+        logger.info(f"✅ unique_id 迁移完成：改写 {updated} 条，删除重复 {deleted} 条")
+    return {"updated": updated, "deleted": deleted}
+
+
+def to_published_at(news_time, fallback):
+    """
+    将新闻的时间字符串转换为 published_at（UTC，与 created_at 一样不带时区信息存储）
+
+    Args:
+        news_time (str): 新闻的 time 字段
+        fallback (datetime): 无法解析时使用的时间，通常为入库时间
+
+    Returns:
+        datetime: 发布时间
+    """
+    parsed = parse_news_time(news_time) if isinstance(news_time, str) else None
+    if parsed is None:
+        return fallback
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def backfill_published_at(batch_size=500):
+    """
+    为没有 published_at 的旧文档按 time 字段补充发布时间，可重复执行
+
+    Args:
+        batch_size (int): 每次 bulk_write 的操作数量
+
+    Returns:
+        int: 补充的文档数量
+    """
+    if NEWS_STORAGE_BACKEND == "sqlite":
+        return 0
+    if not hasattr(news_collection, "bulk_write"):
+        logger.info("当前使用内存存储，无需补充 published_at")
+        return 0
+
+    documents = news_collection.find(
+        {"published_at": {"$exists": False}}, {"_id": 1, "time": 1, "created_at": 1}
+    )
+    operations = []
+    updated = 0
+    for doc in documents:
+        published_at = to_published_at(doc.get("time"), doc.get("created_at") or datetime.utcnow())
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"published_at": published_at}}))
+        if len(operations) >= batch_size:
+            updated += news_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += news_collection.bulk_write(operations, ordered=False).modified_count
+
+    if updated:
+        logger.info(f"✅ published_at 补充完成：更新 {updated} 条")
+    return updated
+
+
+class StoreResult:
+    """
+    存储结果
+
+    Attributes:
+        new_count (int): 新增的新闻数量
+        new_ids (list): 新增新闻的 unique_id
+        skip_count (int): 已存在或在本批次中重复而跳过的新闻数量
+        new_documents (list): 新增的新闻文档，可直接交给推送流程
+        error (str): 部分或全部新闻存储失败时的错误信息
+    """
+
+    def __init__(self, new_count=0, new_ids=None, skip_count=0, new_documents=None, error=None):
+        self.new_count = new_count
+        self.new_ids = new_ids or []
+        self.skip_count = skip_count
+        self.new_documents = new_documents or []
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _prepare_documents(news_list):
+    """
+    校验新闻字段、生成唯一标识，并去掉本批次中重复的新闻
+
+    Returns:
+        tuple: ([(unique_id, document), ...], 本批次中重复的数量)
+    """
+    documents = []
+    processed_ids = set()
+    skip_count = 0
+    now = datetime.utcnow()
+
+    for news in news_list:
+        # 确保必要字段存在
+        if 'title' not in news or not news['title']:
+            logger.warning(f"跳过无标题新闻: {news}")
+            continue
+
+        if 'source' not in news or not news['source']:
+            news['source'] = "Unknown"
+
+        # 生成唯一标识 - 只使用标题和来源，不使用时间
+        # 这样即使时间不同，相同标题和来源的新闻也会被视为重复
+        unique_id = make_unique_id(news['source'], news['title'])
+
+        # 检查是否在当前批次中已处理过
+        if unique_id in processed_ids:
+            skip_count += 1
+            continue
+        processed_ids.add(unique_id)
+
+        documents.append((unique_id, {
+            **news,
+            "unique_id": unique_id,  # 添加唯一标识
+            "created_at": now,
+            "source": news.get("source", "Unknown"),
+            "time": news.get("time", now.isoformat()),
+            # 发布时间（BSON 日期），无法解析 time 时使用入库时间
+            "published_at": to_published_at(news.get("time"), now),
+            "last_updated": now,
+            # 推送成功后清除，进程在存储和推送之间退出时据此补发
+            "pending_delivery": True
+        }))
+
+    return documents, skip_count
+
+
+class MongoNewsStorage:
+    """
+    基于 MongoDB news 集合的新闻存储（MongoDB 不可用时集合为 MemoryStore）
+
+    Args:
+        collection: pymongo Collection 或 MemoryStore，默认为首次访问时才连接的 news_collection
+    """
+
+    def __init__(self, collection=None):
+        self.collection = collection if collection is not None else news_collection
+
+    def insert_new(self, documents):
+        """
+        插入不存在的新闻，已存在的新闻保持不变
+
+        Args:
+            documents (list): [(unique_id, document), ...]
+
+        Returns:
+            tuple: (新插入新闻的 unique_id, 写入成功即已在数据库中的 unique_id)
+        """
+        if hasattr(self.collection, "bulk_write"):
+            return self._bulk_insert_new(documents)
+        return self._insert_new_one_by_one(documents)
+
+    def _bulk_insert_new(self, documents):
+        """使用一次无序 bulk_write 插入不存在的新闻（$setOnInsert）"""
+        operations = [
+            UpdateOne({"unique_id": unique_id}, {"$setOnInsert": document}, upsert=True)
+            for unique_id, document in documents
+        ]
+        failed_indexes = set()
+        try:
+            upserted_indexes = self.collection.bulk_write(operations, ordered=False).upserted_ids.keys()
+        except BulkWriteError as e:
+            # 无序写入时其他操作仍会执行，例如并发写入导致的唯一索引冲突只影响对应的新闻
+            failed_indexes = {error["index"] for error in e.details.get("writeErrors", [])}
+            logger.error(f"批量存储部分失败: {len(failed_indexes)} 条出错")
+            upserted_indexes = [item["index"] for item in e.details.get("upserted", [])]
+
+        # 写入成功的新闻（新增的和已存在的）都已在数据库中
+        stored_ids = [unique_id for index, (unique_id, _) in enumerate(documents) if index not in failed_indexes]
+        return [documents[index][0] for index in sorted(upserted_indexes)], stored_ids
+
+    def _insert_new_one_by_one(self, documents):
+        """逐条检查并插入新闻，用于不支持 bulk_write 的内存存储（按 unique_id 哈希索引查询）"""
+        new_ids = []
+        stored_ids = []
+        for unique_id, document in documents:
+            try:
+                if not self.collection.find_one({"unique_id": unique_id}):
+                    result = self.collection.update_one({"unique_id": unique_id}, {"$set": document}, upsert=True)
+                    if result.upserted_id:
+                        new_ids.append(unique_id)
+                stored_ids.append(unique_id)
+            except Exception as e:
+                logger.error(f"存储新闻时出错: {e}")
+                logger.exception("详细错误信息")
+        return new_ids, stored_ids
+
+    def mark_delivered(self, unique_ids, delivered_at):
+        self.collection.update_many(
+            {"unique_id": {"$in": unique_ids}},
+            {"$set": {"pending_delivery": False, "delivered_at": delivered_at}}
+        )
+
+    def find_undelivered(self, since):
+        query = {"pending_delivery": True, "created_at": {"$gte": since}}
+        return list(self.collection.find(query).sort("created_at", -1))
+
+    def find_latest(self, source, limit):
+        return list(self.collection.find({"source": source}).sort("published_at", -1).limit(limit))
+
+    def find_published_between(self, start, end, source=None):
+        query = {"published_at": {"$gte": start, "$lt": end}}
+        if source:
+            query["source"] = source
+        return list(self.collection.find(query).sort("published_at", -1))
+
+    def recent_unique_ids(self, since):
+        documents = self.collection.find({"created_at": {"$gte": since}}, {"unique_id": 1, "_id": 0})
+        return [doc["unique_id"] for doc in documents if doc.get("unique_id")]
+
+
+mongo_storage = MongoNewsStorage()
+_sqlite_storage = None
+
+
+def get_storage():
+    """
+    返回配置的新闻存储后端（首次调用时建立连接）
+
+    NEWS_STORAGE_BACKEND=sqlite 时使用本地 SQLite 文件，否则使用 MongoDB（不可用时为内存存储）
+    """
+    global _sqlite_storage
+    if NEWS_STORAGE_BACKEND != "sqlite":
+        connect()
+        return mongo_storage
+    if _sqlite_storage is None:
+        with _connect_lock:
+            if _sqlite_storage is None:
+                from sqlite_storage import SqliteNewsStorage
+                _sqlite_storage = SqliteNewsStorage()
+                indexes_ready.set()
+                database_ready.set()
+    return _sqlite_storage
+
+
+def store_news_bulk(news_list, storage=None):
+    """
+    批量存储新闻，一次数据库往返完成去重和插入
+
+    Args:
+        news_list (list): 新闻列表
+        storage: 新闻存储后端，默认为 get_storage() 返回的配置后端
+
+    Returns:
+        StoreResult: 新增数量、新增新闻的 unique_id 和跳过数量
+    """
+    if not news_list:
+        logger.info("⚠️ 没有新的新闻需要存储")
+        return StoreResult()
+
+    documents, skip_count = _prepare_documents(news_list)
+
+    # 缓存中已有的新闻一定已经存储过，直接跳过
+    unseen = [(unique_id, document) for unique_id, document in documents if not seen_cache.contains(unique_id)]
+    skip_count += len(documents) - len(unseen)
+    documents = unseen
+    if not documents:
+        logger.info(f"✅ 存储完成：无新增新闻，跳过 {skip_count} 条已存在新闻")
+        return StoreResult(skip_count=skip_count)
+
+    try:
+        new_ids, stored_ids = (storage or get_storage()).insert_new(documents)
+    except Exception as e:
+        logger.error(f"存储新闻时出错: {e}")
+        logger.exception("详细错误信息")
+        return StoreResult(skip_count=skip_count, error=str(e))
+    seen_cache.add_many(stored_ids)
+    failed_count = len(documents) - len(stored_ids)
+
+    skip_count += len(documents) - len(new_ids)
+
+    # 输出统计信息
+    if new_ids:
+        logger.info(f"✅ 存储完成：新增 {len(new_ids)} 条新闻，跳过 {skip_count} 条已存在新闻")
+    else:
+        logger.info(f"✅ 存储完成：无新增新闻，跳过 {skip_count} 条已存在新闻")
+    new_id_set = set(new_ids)
+    new_documents = [document for unique_id, document in documents if unique_id in new_id_set]
+    return StoreResult(new_count=len(new_ids), new_ids=new_ids, skip_count=skip_count,
+                       new_documents=new_documents,
+                       error=f"{failed_count} 条新闻存储失败" if failed_count else None)
+
+
+def mark_delivered(unique_ids, storage=None):
+    """
+    标记新闻已推送
+
+    Args:
+        unique_ids (list): 已推送新闻的 unique_id
+        storage: 新闻存储后端，默认为配置的后端
+    """
+    unique_ids = list(unique_ids)
+    if not unique_ids:
+        return
+    try:
+        (storage or get_storage()).mark_delivered(unique_ids, datetime.utcnow())
+    except Exception as e:
+        logger.error(f"标记新闻已推送失败: {e}")
+
+
+def find_undelivered_news(hours=DELIVERY_RECOVERY_HOURS, storage=None):
+    """
+    查询最近入库但尚未推送的新闻（例如进程在存储后、推送前退出）
+
+    Args:
+        hours (int): 只补发最近多少小时内入库的新闻
+        storage: 新闻存储后端，默认为配置的后端
+
+    Returns:
+        list: 按入库时间从新到旧排列的新闻文档
+    """
+    since = datetime.utcnow() - timedelta(hours=hours)
+    try:
+        return (storage or get_storage()).find_undelivered(since)
+    except Exception as e:
+        logger.error(f"查询未推送新闻失败: {e}")
+        return []
+
+
+def find_latest_news(source, limit=20, storage=None):
+    """
+    查询一个交易所按发布时间最新的新闻（使用 source_published_at_index）
+
+    Args:
+        source (str): 交易所名称
+        limit (int): 最多返回的条数
+        storage: 新闻存储后端，默认为配置的后端
+
+    Returns:
+        list: 按发布时间从新到旧排列的新闻文档
+    """
+    try:
+        return (storage or get_storage()).find_latest(source, limit)
+    except Exception as e:
+        logger.error(f"查询 {source} 最新新闻失败: {e}")
+        return []
+
+
+def find_news_published_between(start, end, source=None, storage=None):
+    """
+    查询发布时间在 [start, end) 范围内的新闻
+
+    Args:
+        start (datetime): 开始时间（UTC）
+        end (datetime): 结束时间（UTC）
+        source (str): 只查询该交易所，默认查询所有交易所
+        storage: 新闻存储后端，默认为配置的后端
+
+    Returns:
+        list: 按发布时间从新到旧排列的新闻文档
+    """
+    try:
+        return (storage or get_storage()).find_published_between(start, end, source)
+    except Exception as e:
+        logger.error(f"按发布时间查询新闻失败: {e}")
+        return []
+
 
-# 插入新闻到数据库
-# 修改第一处：将详细的跳过日志改为计数统计
-# 在store_news函数开头添加计数变量
 def store_news(news_list):
     """
     将新闻数据存入 MongoDB, 避免重复存储, 并返回新增条数
@@ -177,80 +785,14 @@ def store_news(news_list):
     Returns:
         int: 新增的新闻数量
     """
-    if not news_list:
-        logger.info("⚠️ 没有新的新闻需要存储")
-        return 0
-    
-    # 记录已处理的新闻标识，用于本次批量处理中的去重
-    processed_ids = set()
-    new_count = 0
-    skip_count = 0  # 新增：记录跳过的新闻数量
-    
-    for news in news_list:
-        try:
-            # 确保必要字段存在
-            if 'title' not in news or not news['title']:
-                logger.warning(f"跳过无标题新闻: {news}")
-                continue
-                
-            if 'source' not in news or not news['source']:
-                news['source'] = "Unknown"
-                
-            # 生成唯一标识 - 只使用标题和来源，不使用时间
-            # 这样即使时间不同，相同标题和来源的新闻也会被视为重复
-            unique_id = f"{news['source']}_{news['title']}"
-            
-            # 检查是否在当前批次中已处理过
-            if unique_id in processed_ids:
-                logger.debug(f"当前批次中已处理过此新闻，跳过")
-                skip_count += 1
-                continue
-            
-            # 添加到已处理集合
-            processed_ids.add(unique_id)
-            
-            # 先检查数据库中是否已存在
-            existing_news = news_collection.find_one({
-                "unique_id": unique_id
-            })
-            
-            if existing_news:
-                # 修改：不再输出每条新闻的标题，只增加计数
-                skip_count += 1
-                continue
-                
-            # 使用 update_one 配合 upsert=True
-            result = news_collection.update_one(
-                {
-                    "unique_id": unique_id
-                },
-                {
-                    "$set": {
-                        **news,
-                        "unique_id": unique_id,  # 添加唯一标识
-                        "created_at": datetime.utcnow(),
-                        "source": news.get("source", "Unknown"),
-                        "time": news.get("time", datetime.utcnow().isoformat()),
-                        "last_updated": datetime.utcnow()
-                    }
-                },
-                upsert=True
-            )
-            
-            # 如果是新插入的文档，增加计数
-            if result.upserted_id:
-                new_count += 1
-                # 修改：不再输出每条新闻的标题，只增加计数
-                # logger.info(f"新增新闻: {news['title']}")
-                
-        except Exception as e:
-            logger.error(f"存储新闻时出错: {e}")
-            logger.exception("详细错误信息")
-            continue
+    return store_news_bulk(news_list).new_count
+
 
-    # 在循环结束后输出统计信息
-    if new_count > 0:
-        logger.info(f"✅ 存储完成：新增 {new_count} 条新闻，跳过 {skip_count} 条已存在新闻")
+if __name__ == "__main__":
+    # 用法: python news_database.py migrate-ids | backfill-published-at
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate-ids":
+        print(migrate_unique_ids())
+    elif len(sys.argv) > 1 and sys.argv[1] == "backfill-published-at":
+        print(backfill_published_at())
     else:
-        logger.info(f"✅ 存储完成：无新增新闻，跳过 {skip_count} 条已存在新闻")
-    return new_count
\ No newline at end of file
+        print("用法: python news_database.py migrate-ids | backfill-published-at")
@@ -0,0 +1,165 @@
+# news_repository.py
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import news_database
+from metrics import LatencyRegistry
+
+logger = logging.getLogger(__name__)
+
+# 使用内存存储时检查 MongoDB 是否恢复的间隔（秒）
+MONGO_RECONNECT_INTERVAL = int(os.environ.get('MONGO_RECONNECT_INTERVAL_SECONDS', '60'))
+
+# 数据库线程池大小，即同时进行的数据库操作数量上限，超出的操作排队等待
+DB_EXECUTOR_WORKERS = int(os.environ.get('DB_EXECUTOR_WORKERS', '4'))
+
+# 每种数据库操作的总耗时（含排队）、在线程池中的排队时间，以及失败次数
+DB_OPERATION_LATENCY = LatencyRegistry()
+DB_QUEUE_WAIT = LatencyRegistry()
+DB_OPERATION_ERRORS = {}
+
+_executor = None
+
+
+def get_db_executor():
+    """获取进程级共享的数据库线程池"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+    return _executor
+
+
+async def run_blocking(operation, func, *args, **kwargs):
+    """
+    在数据库线程池中执行同步的数据库操作，不阻塞事件循环
+
+    数据库响应慢时只有等待该操作的任务变慢，Telegram 轮询和其他抓取任务不受影响
+
+    Args:
+        operation (str): 操作名称，用于耗时统计
+        func (callable): 同步函数（pymongo / sqlite3 调用）
+
+    Returns:
+        func 的返回值
+    """
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+
+    def call():
+        DB_QUEUE_WAIT.record(operation, time.perf_counter() - submitted)
+        return func(*args, **kwargs)
+
+    try:
+        return await loop.run_in_executor(get_db_executor(), call)
+    except Exception:
+        DB_OPERATION_ERRORS[operation] = DB_OPERATION_ERRORS.get(operation, 0) + 1
+        raise
+    finally:
+        DB_OPERATION_LATENCY.record(operation, time.perf_counter() - submitted)
+
+
+class NewsRepository:
+    """
+    新闻集合的异步访问接口
+
+    与 news_database 中的同名函数一一对应，在数据库线程池中执行，
+    供抓取存储（task_scheduler）和推送（bot）在事件循环中调用
+
+    Args:
+        storage: 新闻存储后端（MongoNewsStorage / SqliteNewsStorage），默认使用配置的后端；
+            压测等场景可传入独立的存储，避免写入正式数据库
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage
+
+    async def connect(self):
+        """在数据库线程池中建立数据库连接（只执行一次），返回配置的新闻存储后端"""
+        return await run_blocking("connect", news_database.get_storage)
+
+    @property
+    def ready(self):
+        """数据库连接是否已完成（成功连接或已改用内存存储）"""
+        return news_database.is_database_ready()
+
+    async def wait_until_ready(self, timeout=None):
+        """
+        等待数据库连接完成，不阻塞事件循环
+
+        Returns:
+            bool: 超时前连接是否已完成
+        """
+        try:
+            await asyncio.wait_for(self.connect(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def run_reconnector(self, interval=MONGO_RECONNECT_INTERVAL):
+        """
+        后台任务：使用内存存储时定期检查 MongoDB 是否恢复，恢复后写回内存中的新闻并切换回 MongoDB
+
+        切换回 MongoDB 后执行一次启动时的维护操作（启动时使用内存存储，这些操作没有在 MongoDB 上执行）
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if not news_database.needs_reconnect():
+                continue
+            try:
+                switched = await run_blocking("reconnect", news_database.reconnect)
+                if switched:
+                    await self.prepare()
+            except Exception as e:
+                logger.error(f"重连 MongoDB 出错: {e}")
+
+    async def store_news_bulk(self, news_list):
+        """批量存储新闻，返回 StoreResult"""
+        return await run_blocking("store_news_bulk", news_database.store_news_bulk, news_list, self.storage)
+
+    async def mark_delivered(self, unique_ids):
+        """标记新闻已推送"""
+        await run_blocking("mark_delivered", news_database.mark_delivered, list(unique_ids), self.storage)
+
+    async def find_undelivered_news(self, hours=None):
+        """查询最近入库但尚未推送的新闻"""
+        hours = news_database.DELIVERY_RECOVERY_HOURS if hours is None else hours
+        return await run_blocking("find_undelivered_news", news_database.find_undelivered_news, hours, self.storage)
+
+    async def find_latest_news(self, source, limit=20):
+        """查询一个交易所按发布时间最新的新闻"""
+        return await run_blocking("find_latest_news", news_database.find_latest_news, source, limit, self.storage)
+
+    async def find_news_published_between(self, start, end, source=None):
+        """查询发布时间在 [start, end) 范围内的新闻"""
+        return await run_blocking(
+            "find_news_published_between", news_database.find_news_published_between, start, end, source, self.storage
+        )
+
+    async def prepare(self):
+        """启动时执行的维护操作：迁移 unique_id、补充 published_at、预加载已存储新闻的标识"""
+        await run_blocking("migrate_unique_ids", news_database.migrate_unique_ids)
+        await run_blocking("backfill_published_at", news_database.backfill_published_at)
+        await run_blocking("warm_seen_cache", news_database.warm_seen_cache)
+
+    @staticmethod
+    def stats():
+        """
+        Returns:
+            dict: 每种数据库操作的耗时分布（秒）、排队时间和失败次数
+        """
+        return {
+            "backend": news_database.NEWS_STORAGE_BACKEND,
+            "ready": news_database.is_database_ready(),
+            "indexes_ready": news_database.indexes_ready.is_set(),
+            "memory_store": news_database.memory_store_stats(),
+            "write_back": news_database.write_back_stats(),
+            "latency": DB_OPERATION_LATENCY.summary(),
+            "queue_wait": DB_QUEUE_WAIT.summary(),
+            "errors": dict(DB_OPERATION_ERRORS)
+        }
+
+
+news_repository = NewsRepository()
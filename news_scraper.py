@@ -1,110 +1,62 @@
 # news_scraper.py
 import aiohttp
 import asyncio
-import requests  # 添加 requests 库导入
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-from datetime import datetime, timedelta
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
 import logging
 from utils import async_timeout
+from browser_pool import browser_pool
+from request_interceptor import apply_request_policy
+from page_readiness import goto_and_wait_ready
+from exchange_scraper import EXCHANGE_CONFIGS, extract_page_news
+from http_client import close_http_session, hedged_get_json
+from source_adapters import get_api_adapter
+from scrape_orchestrator import ScrapeOrchestrator, ScrapeSource
+from change_detector import NOT_MODIFIED, UnchangedNews, change_detector, change_key, list_region_unchanged
+from time_parser import format_news_time
 
 logger = logging.getLogger(__name__)
 
 # Binance新闻抓取示例
 @async_timeout(300)  # 5分钟超时
 async def fetch_binance_news():
-    url = "https://www.binance.com/en/support/announcement/c-48"
+    config = EXCHANGE_CONFIGS["Binance"]
     news_list = []  # 将 news_list 移到函数开始处
-    skipped_count = 0  # 新增：记录跳过的新闻数量
-    async with async_playwright() as p:
-        # 在fetch_binance_news等函数中修改浏览器启动配置
-        browser = await p.chromium.launch(
-            headless=True,
-            # executable_path=os.environ.get('PLAYWRIGHT_CHROMIUM_PATH', ''),  # 允许自定义路径
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",  # 减少内存使用
-                "--disable-gpu",            # 禁用GPU加速
-                "--single-process"          # 使用单进程模式
-            ]
-        )
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080}
-        )
-        page = await context.new_page()
-        
+    # 使用共享浏览器池，避免每次抓取都冷启动 Chromium
+    async with browser_pool.page(
+        "Binance",
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+        viewport={"width": 1920, "height": 1080}
+    ) as page:
         try:
             print("正在加载 Binance 页面...")
             
-            # 设置请求拦截
-            await page.route("**/*", lambda route: route.continue_())
-            
-            # 增加加载超时时间，等待验证码加载
-            await page.goto(url, wait_until="networkidle", timeout=120000)
-            print("页面初步加载完成")
+            # 拦截图片、字体、统计和第三方脚本等无关请求
+            await apply_request_policy(page, "Binance")
             
-            # 等待页面加载完成
-            await page.wait_for_timeout(5000)
+            # 列表项数量稳定后立即开始解析，不等待 networkidle
+            await goto_and_wait_ready(page, config)
             
-            # 使用更精确的选择器
-            selector = "div.bn-flex.flex-col.py-6"
-            print(f"等待选择器: {selector}")
-            await page.wait_for_selector(selector, timeout=60000)
+            # 公告列表与上次相同时无需获取和解析整个页面
+            if await list_region_unchanged(page, config):
+                return UnchangedNews()
             
-            html = await page.content()
-            soup = BeautifulSoup(html, "html.parser")
-            print("🔍 开始抓取 Binance 的新闻...")
-            print(html[:100])  # 只打印HTML的前1000个字符
+            # 按 EXCHANGE_CONFIGS 中的选择器解析列表（解析后端见 html_parser.py）
+            news_list = await extract_page_news(page, config)
+            print(f"🔍 Binance 解析到 {len(news_list)} 条新闻")
 
-            # 更新选择器
-            news_items = soup.select("div.bn-flex a.text-PrimaryText")
-            print(f"找到 {len(news_items)} 个新闻项")
-            
-            # news_items = soup.select("div.items-center")
-            # news_items = soup.select("div.flex-col.items-center a.text-primaryText")
-            # news_items = soup.select("div.bn-flex a.text-primaryText")
-            # news_list = []
-            
-            for item in news_items:
-                title = None  # 初始化 title 为空
-                # h3_items = item.find_all("h3", class_=["typography-body1-1", "typography-body3"])
-                h3_items = item.find("h3", class_="typography-body1-1")
-                title = h3_items.text.strip() if h3_items else None
-                # title = h3_items[0].text.strip() if h3_items else None
-                # if h3_items:
-                #      title = h3_items[0].text.strip()
-                
-                link = "https://www.binance.com" + item["href"] if item.get("href") else None
-            
-                # 获取时间信息，使用提供的选择器
-                time_tag = item.find_next("div", class_="typography-caption1")  # 查找紧邻的时间元素
-                time = time_tag.text.strip() if time_tag else "No date found"
-            
-                 # 只在链接存在时添加到新闻列表
-                if title and link and time:
-                    news_list.append({
-                        "title": title, 
-                        "link": link, 
-                        "time": format_news_time(time),
-                        "source": "Binance"
-                    })
-                else:
-                    # print(f"⚠️ 跳过无效新闻项: {item}")
-                    skipped_count += 1  # 只增加计数，不打印详细信息
-
-            # 关闭浏览器
-            await browser.close()
         except Exception as e:
             print(f"Binance 抓取出错: {e}")
             print(f"\n错误详细信息:")
             print(f"错误类型: {type(e).__name__}")
             print(f"错误信息: {str(e)}")
-        finally:
-            await browser.close()
         
+    # 解析成功后才记录公告列表的哈希，解析失败时下次仍会完整解析
+    if news_list:
+        change_detector.commit(change_key(config.name, "browser"))
+
     # 将统计信息移到 async with 块外面，与函数的缩进级别相同
     total_count = len(news_list)
     unique_news = {item["title"]: item for item in news_list}.values()
@@ -112,7 +64,7 @@ async def fetch_binance_news():
     
     print("\n=== 抓取统计 ===")
     print(f"📌 总共抓取 {total_count} 条新闻")
-    print(f"🔍 去重后剩余 {filtered_count} 条新闻，跳过 {skipped_count} 条无效项\n")
+    print(f"🔍 去重后剩余 {filtered_count} 条新闻\n")
     
     # print("\n=== 抓取结果 ===\n")
     # for item in unique_news:
@@ -125,67 +77,32 @@ async def fetch_binance_news():
 # OKX新闻抓取示例
 @async_timeout(300)  # 5分钟超时
 async def fetch_okx_news():
-    url = "https://www.okx.com/help/section/announcements-new-listings"
+    config = EXCHANGE_CONFIGS["OKX"]
     news_list = []
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page = await context.new_page()
-        
+    async with browser_pool.page(
+        "OKX",
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    ) as page:
         try:
             print("正在加载 OKX 页面...")
-            # 增加超时时间到 120 秒
-            await page.goto(url, wait_until="domcontentloaded", timeout=120000)
-            await page.wait_for_load_state("networkidle", timeout=60000)
-            await page.wait_for_selector("li.index_articleItem__d-8iK", timeout=60000)
+            await apply_request_policy(page, "OKX")
+            await goto_and_wait_ready(page, config)
             
-            # 获取页面 HTML
-            html = await page.content()
-            soup = BeautifulSoup(html, "html.parser")
-            print("🔍 开始抓取 OKX 的新闻...")
-            print(html[:100])  # 只打印HTML的前1000个字符
-            # 获取所有新闻项
-            news_items = soup.select("li.index_articleItem__d-8iK")
-            print(f"抓取到 {len(news_items)} 条新闻")
-            news_list = []
+            # 公告列表与上次相同时无需获取和解析整个页面
+            if await list_region_unchanged(page, config):
+                return UnchangedNews()
             
-            for item in news_items:
-                title = None  # 初始化 title 为空
-                title_tag = item.find("div", class_="index_title__iTmos")
-                title = title_tag.text.strip() if title_tag else None
-
-                link_tag = item.find("a", href=True)
-                link = link_tag["href"] if link_tag else None
-
-                # 获取时间信息
-                time_tag = item.find("span", {"data-testid": "DateDisplay"})  # 根据 data-testid 属性获取时间
-                time = time_tag.text.strip() if time_tag else "No date found"
-
-                # 打印新闻的时间格式
-                # print(f"抓取到的时间: {time}")
-                
-                # 只在链接存在时添加到新闻列表
-                if title and link and time:
-                    full_link = "https://www.okx.com" + link if not link.startswith("http") else link
-                    # news_list.append({"title": title, "link": full_link, "time": time})
-                    news_list.append({
-                          "title": title, 
-                          "link": full_link, 
-                          "time": format_news_time(time),
-                          "source": "OKX"
-                        })
-                else:
-                    print(f"⚠️ 跳过无效新闻项: {item}")
-
-            await browser.close()
+            # 按 EXCHANGE_CONFIGS 中的选择器解析列表（解析后端见 html_parser.py）
+            news_list = await extract_page_news(page, config)
+            print(f"🔍 OKX 解析到 {len(news_list)} 条新闻")
 
         except Exception as e:
             print(f"OKX 抓取出错: {e}")
-        finally:
-            await browser.close()
+
+    # 解析成功后才记录公告列表的哈希，解析失败时下次仍会完整解析
+    if news_list:
+        change_detector.commit(change_key(config.name, "browser"))
 
     # 统计信息
     total_count = len(news_list)
@@ -205,67 +122,33 @@ async def fetch_okx_news():
 # Bitget新闻抓取
 @async_timeout(300)  # 5分钟超时
 async def fetch_bitget_news():
-    url = "https://www.bitget.com/support/categories/11865590960081"
+    config = EXCHANGE_CONFIGS["Bitget"]
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page = await context.new_page()
-
-        # 尝试跳过防爬虫检查
-        await page.goto(url, wait_until="domcontentloaded")
+    async with browser_pool.page(
+        "Bitget",
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    ) as page:
+        await apply_request_policy(page, "Bitget")
 
         # 等待 Spot 和 Futures 区域加载
         try:
-            await page.wait_for_selector("section.ArticleList_item_pair__vmMrx", timeout=90000)  # 增加超时
+            await goto_and_wait_ready(page, config)
         except Exception as e:
             print(f"错误：{e}")
             html = await page.content()
             print(html[:1000])  # 输出HTML的前1000个字符以帮助调试
 
-        # 获取页面 HTML
-        html = await page.content()
-        soup = BeautifulSoup(html, "html.parser")
-        # 打印部分 HTML 内容来调试
-        print("🔍 开始抓取 Bitget 的新闻...")
-        print(html[:100])  # 只打印HTML的前1000个字符
-
-        # 获取 Spot 和 Futures 上币信息
-        spot_items = soup.select('section.ArticleList_item_pair__vmMrx')
-        news_list = []
-
-        # 处理 Spot 类型的新闻
-        for item in spot_items:
-            title = None
-            link = None
-            time = "No date found"
-            
-            # 获取标题和链接
-            title_tag = item.find("span", class_="ArticleList_item_title__u3fLL")
-            if title_tag:
-                title = title_tag.get_text(strip=True)
-                link_tag = title_tag.find("a", href=True)
-                if link_tag:
-                    link = "https://www.bitget.com" + link_tag["href"] if not link_tag["href"].startswith("http") else link_tag["href"]
-            
-            # 获取时间
-            time_tag = item.find("div", class_="ArticleList_item_date__nEqio")
-            if time_tag:
-                time = time_tag.get_text(strip=True)
-
-            # 只在有有效标题、链接和时间时添加到列表
-            if title and link:
-                # news_list.append({"title": title, "link": link, "time": time})
-                news_list.append({
-                      "title": title, 
-                      "link": link, 
-                      "time": format_news_time(time),
-                      "source": "Bitget"
-                    })
-
-        await browser.close()
+        # 公告列表与上次相同时无需获取和解析整个页面
+        if await list_region_unchanged(page, config):
+            return UnchangedNews()
+
+        # 按 EXCHANGE_CONFIGS 中的选择器解析列表（解析后端见 html_parser.py）
+        news_list = await extract_page_news(page, config)
+        print(f"🔍 Bitget 解析到 {len(news_list)} 条新闻")
+
+    # 解析成功后才记录公告列表的哈希，解析失败时下次仍会完整解析
+    if news_list:
+        change_detector.commit(change_key(config.name, "browser"))
 
     # 统计信息
     total_count = len(news_list)
@@ -373,18 +256,78 @@ async def fetch_bitget_news():
 
 #     return list(unique_news)
 
+# Bybit 公告 API 官方端点，bytick 为备用域名
+BYBIT_API_URLS = [
+    "https://api.bybit.com/v5/announcements/index",
+    "https://api.bytick.com/v5/announcements/index"
+]
+
+# 设置 SCRAPER_MOCK_EXCHANGE_URL 时所有抓取源改为请求本地模拟交易所服务器（见 mock_exchange_server.py）
+MOCK_EXCHANGE_URL = os.environ.get('SCRAPER_MOCK_EXCHANGE_URL')
+if MOCK_EXCHANGE_URL:
+    from mock_exchange_server import point_sources_at
+    point_sources_at(MOCK_EXCHANGE_URL, BYBIT_API_URLS)
+
+# 主端点在该时间（秒）内未响应时，并行请求备用端点
+BYBIT_HEDGE_DELAY = 3.0
+
+
+def parse_bybit_announcements(data):
+    """
+    解析 Bybit 公告 API 的响应
+
+    Args:
+        data (dict): API 返回的 JSON 数据
+
+    Returns:
+        list: 新闻列表
+    """
+    news_list = []
+
+    # 检查 API 响应结构 (根据官方文档)
+    if data.get("retCode") != 0 or "result" not in data:
+        error_msg = data.get("retMsg", "未知错误")
+        print(f"API 响应错误: {error_msg}")
+        print(f"完整响应: {data}")
+        return news_list
+
+    announcements = data["result"].get("list", [])
+    print(f"获取到 {len(announcements)} 条公告")
+
+    for item in announcements:
+        title = item.get("title")
+        publish_time = item.get("publishTime")
+
+        if not title:
+            continue
+
+        # 处理时间，API 返回的是毫秒级时间戳
+        formatted_time = None
+        if publish_time:
+            try:
+                dt = datetime.fromtimestamp(int(publish_time) / 1000, tz=timezone.utc)
+                formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+            except Exception as e:
+                print(f"时间格式化错误: {e}, 原始时间: {publish_time}")
+                formatted_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+        news_list.append({
+            "title": title,
+            "link": item.get("url"),
+            "time": formatted_time,
+            "description": item.get("description", ""),
+            "source": "Bybit"
+        })
+
+    return news_list
+
+
 # 使用 Bybit 官方 API 获取新闻
 @async_timeout(300)  # 5分钟超时
 async def fetch_bybit_news():
     print("开始通过 Bybit 官方 API 抓取新闻...")
     news_list = []
     
-    # 导入 requests 库
-    import requests
-    
-    # Bybit 公告 API 官方端点
-    url = "https://api.bybit.com/v5/announcements/index"
-    
     # 请求参数 (根据官方文档)
     params = {
         "locale": "en-US",  # 使用英文，更稳定
@@ -393,111 +336,24 @@ async def fetch_bybit_news():
         "limit": 20  # 获取最新的20条公告
     }
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-        "Accept": "application/json"
-    }
-    
     try:
-        print(f"正在请求 Bybit API: {url}")
-        
-        # 使用同步请求，设置较长的超时时间
-        response = requests.get(url, params=params, headers=headers, timeout=60)
-        
-        print(f"API 响应状态码: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            # 检查 API 响应结构 (根据官方文档)
-            if data.get("retCode") == 0 and "result" in data:
-                result = data["result"]
-                announcements = result.get("list", [])
-                print(f"获取到 {len(announcements)} 条公告")
-                
-                for item in announcements:
-                    title = item.get("title")
-                    url = item.get("url")
-                    publish_time = item.get("publishTime")
-                    description = item.get("description", "")
-                    
-                    if title:
-                        # 处理时间
-                        formatted_time = None
-                        if publish_time:
-                            try:
-                                # API 返回的时间通常是毫秒级时间戳
-                                dt = datetime.fromtimestamp(int(publish_time) / 1000)
-                                formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-                            except Exception as e:
-                                print(f"时间格式化错误: {e}, 原始时间: {publish_time}")
-                                formatted_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-                        
-                        news_list.append({
-                            "title": title,
-                            "link": url,
-                            "time": formatted_time,
-                            "description": description,
-                            "source": "Bybit"
-                        })
-                        # print(f"✅ 成功抓取: {title} | 时间: {formatted_time}")
-            else:
-                error_msg = data.get("retMsg", "未知错误")
-                print(f"API 响应错误: {error_msg}")
-                print(f"完整响应: {data}")
-        else:
-            print(f"API 请求失败，状态码: {response.status_code}")
-            print(response.text)
-    except requests.exceptions.Timeout:
-        print("API 请求超时，尝试备用端点...")
-        # 尝试备用端点
-        backup_url = "https://api.bytick.com/v5/announcements/index"
-        try:
-            response = requests.get(backup_url, params=params, headers=headers, timeout=60)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("retCode") == 0 and "result" in data:
-                    result = data["result"]
-                    announcements = result.get("list", [])
-                    print(f"备用 API 获取到 {len(announcements)} 条公告")
-                    
-                    for item in announcements:
-                        title = item.get("title")
-                        url = item.get("url")
-                        publish_time = item.get("publishTime")
-                        description = item.get("description", "")
-                        
-                        if title:
-                            # 处理时间
-                            formatted_time = None
-                            if publish_time:
-                                try:
-                                    dt = datetime.fromtimestamp(int(publish_time) / 1000)
-                                    formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-                                except Exception as e:
-                                    print(f"时间格式化错误: {e}, 原始时间: {publish_time}")
-                                    formatted_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-                            
-                            news_list.append({
-                                "title": title,
-                                "link": url,
-                                "time": formatted_time,
-                                "description": description,
-                                "source": "Bybit"
-                            })
-                            print(f"✅ 成功抓取: {title} | 时间: {formatted_time}")
-                else:
-                    print(f"备用 API 响应错误: {data.get('retMsg', '未知错误')}")
-            else:
-                print(f"备用 API 请求失败，状态码: {response.status_code}")
-        except Exception as e:
-            print(f"备用 API 抓取出错: {e}")
+        # 使用共享的 aiohttp 会话异步请求，主端点响应慢时并行请求备用端点
+        url, data = await hedged_get_json(BYBIT_API_URLS, params=params, hedge_delay=BYBIT_HEDGE_DELAY,
+                                          change_key=change_key("Bybit", "api"))
+        print(f"Bybit API 响应来自: {url}")
+        if data is NOT_MODIFIED:
+            return UnchangedNews()
+        news_list = parse_bybit_announcements(data)
     except Exception as e:
         print(f"Bybit API 抓取出错: {e}")
         print(f"\n错误详细信息:")
         print(f"错误类型: {type(e).__name__}")
         print(f"错误信息: {str(e)}")
     
+    # 解析成功后才记录公告列表的哈希，解析失败时下次仍会完整解析
+    if news_list:
+        change_detector.commit(change_key("Bybit", "api"))
+
     # 统计信息
     total_count = len(news_list)
     unique_news = {item["title"]: item for item in news_list}.values()
@@ -507,102 +363,8 @@ async def fetch_bybit_news():
     print(f"📌 总共抓取 {total_count} 条新闻")
     print(f"🔍 去重后剩余 {filtered_count} 条新闻\n")
 
-    # print("\n=== 抓取结果 ===\n")
-    # for item in unique_news:
-    #     print(f"📌 {item['title']}\n🔗 {item['link']}\n📅 {item['time']}\n")
-
     return list(unique_news)
 
-# 统一处理新闻时间格式
-def format_news_time(news_time):
-    """
-    统一处理新闻时间的格式
-    支持多种格式：
-    1. '2025-02-27'
-    2. 'Published on Feb 20, 2025'
-    3. '2025-03-03 10:41'
-    4. 'Feb 26, 2025'
-    5. '03/12/2025, 03:12:02'
-    6. '1 hours 6 min 16 sec ago'
-    7. '2 days ago'
-    8. '3 minutes ago'
-    返回统一格式的时间：'YYYY-MM-DD HH:MM:SS UTC'
-    """
-    # 处理相对时间格式
-    try:
-        if "ago" in news_time.lower():
-            now = datetime.now()
-            parts = news_time.lower().split()
-            
-            if "day" in parts[1]:
-                days = int(parts[0])
-                result_time = now - timedelta(days=days)
-            elif "hour" in parts[1]:
-                hours = int(parts[0])
-                minutes = int(parts[2]) if len(parts) > 4 and "min" in parts[3] else 0
-                result_time = now - timedelta(hours=hours, minutes=minutes)
-            elif "minute" in parts[1] or "min" in parts[1]:
-                minutes = int(parts[0])
-                result_time = now - timedelta(minutes=minutes)
-            elif "second" in parts[1] or "sec" in parts[1]:
-                seconds = int(parts[0])
-                result_time = now - timedelta(seconds=seconds)
-            else:
-                return now.strftime("%Y-%m-%d %H:%M:%S UTC")
-                
-            return result_time.strftime("%Y-%m-%d %H:%M:%S UTC")
-    except (ValueError, IndexError):
-        pass
-
-    # 保留原有的格式处理代码
-    try:
-        if len(news_time) == 10:  # 格式 2025-02-27
-            return datetime.strptime(news_time, "%Y-%m-%d").strftime("%Y-%m-%d 00:00:00 UTC")
-    except ValueError:
-        pass
-
-    # 处理格式2: Published on Feb 20, 2025
-    try:
-        if news_time.startswith("Published on"):
-            news_time = news_time[13:].strip()  # 去掉 "Published on"
-            return datetime.strptime(news_time, "%b %d, %Y").strftime("%Y-%m-%d 00:00:00 UTC")
-    except ValueError:
-        pass
-    # 处理格式3: 2025-03-03 10:41
-    try:
-        if len(news_time) > 10:  # 格式 2025-03-03 10:41
-            return datetime.strptime(news_time, "%Y-%m-%d %H:%M").strftime("%Y-%m-%d %H:%M:%S UTC")
-    except ValueError:
-        pass
-
-    # 处理格式4: Feb 26, 2025
-    try:
-        if len(news_time.split()) == 3:  # 格式 Feb 26, 2025
-            return datetime.strptime(news_time, "%b %d, %Y").strftime("%Y-%m-%d 00:00:00 UTC")
-    except ValueError:
-        pass
-    
-    # 处理格式5: 添加对 MM/DD/YYYY, HH:MM:SS 格式的支持
-    try:
-        if '/' in news_time and ',' in news_time:
-            parsed_time = datetime.strptime(news_time.strip(), "%m/%d/%Y, %H:%M:%S")
-            return parsed_time.strftime("%Y-%m-%d %H:%M:%S UTC")
-    except ValueError:
-        pass
-    
-    print(f"❌ 无法解析时间: {news_time}")
-    return None
-
-    # 处理格式5: MM/DD/YYYY, HH:MM:SS 格式的支持
-    # try:
-    #     if '/' in news_time and ',' in news_time:
-    #         date_part, time_part = news_time.split(',')
-    #         parsed_time = datetime.strptime(news_time.strip(), "%m/%d/%Y, %H:%M:%S")
-    #         return parsed_time.strftime("%Y-%m-%d %H:%M:%S UTC")
-    # except ValueError:
-    #     pass
-
-
 # 测试抓取功能
 # Coinbase新闻抓取，Coinbase通过Twitter发布的消息，没有网页：https://x.com/CoinbaseAssets，https://x.com/CoinbaseIntExch
 # async def fetch_coinbase_news():
@@ -664,69 +426,35 @@ def format_news_time(news_time):
 # KuCoin新闻抓取
 @async_timeout(300)  # 5分钟超时
 async def fetch_kucoin_news():
-    url = "https://www.kucoin.com/announcement/new-listings"
+    config = EXCHANGE_CONFIGS["KuCoin"]
     news_list = []
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",  # 减少内存使用
-                "--disable-gpu",            # 禁用GPU加速
-                "--single-process"          # 使用单进程模式
-            ]
-        )
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page = await context.new_page()
-        
+    async with browser_pool.page(
+        "KuCoin",
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    ) as page:
         try:
             print("正在加载 KuCoin 页面...")
-            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            await page.wait_for_selector("ul.kux-e8uvvx", timeout=60000)
-            
-            html = await page.content()
-            soup = BeautifulSoup(html, "html.parser")
-            print("🔍 开始抓取 KuCoin 的新闻...")
+            await apply_request_policy(page, "KuCoin")
+            await goto_and_wait_ready(page, config)
             
-            # 获取所有新闻项
-            news_items = soup.select("ul.kux-e8uvvx > li")
+            # 公告列表与上次相同时无需获取和解析整个页面
+            if await list_region_unchanged(page, config):
+                return UnchangedNews()
             
-            for item in news_items:
-                title = None  # 初始化 title 为空
-                link = None
-                time = "No date found"
-                
-                # 获取标题和链接
-                link_tag = item.find("a", href=True)
-                if link_tag:
-                    link = "https://www.kucoin.com" + link_tag["href"]
-                    title_tag = link_tag.find("span")
-                    title = title_tag.text.strip() if title_tag else None
-                
-                # 获取时间
-                time_tag = item.find("p", class_='kux-q65diy')
-                time = time_tag.text.strip() if time_tag else "No date found"
-                
-                if title and link:
-                    news_list.append({
-                        "title": title,
-                        "link": link,
-                        "time": format_news_time(time),
-                        "source": "KuCoin"
-                    })
-                    
+            # 按 EXCHANGE_CONFIGS 中的选择器解析列表（解析后端见 html_parser.py）
+            news_list = await extract_page_news(page, config)
+            print(f"🔍 KuCoin 解析到 {len(news_list)} 条新闻")
+
         except Exception as e:
             print(f"KuCoin 抓取出错: {e}")
             html = await page.content()
             print("页面HTML前100个字符:")
             print(html[:1000])
-        finally:
-            await browser.close()
+
+    # 解析成功后才记录公告列表的哈希，解析失败时下次仍会完整解析
+    if news_list:
+        change_detector.commit(change_key(config.name, "browser"))
 
     # 统计信息
     total_count = len(news_list)
@@ -746,85 +474,30 @@ async def fetch_kucoin_news():
 # Gate.io新闻抓取
 @async_timeout(300)  # 5分钟超时
 async def fetch_gate_news():
-    url = "https://www.gate.io/announcements/newlisted"
+    config = EXCHANGE_CONFIGS["Gate.io"]
     news_list = []
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",  # 减少内存使用
-                "--disable-gpu",  # 禁用GPU加速
-                "--single-process"          # 使用单进程模式
-            ],
-            timeout=120000  # 增加浏览器启动超时时间到2分钟
-        )
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080}
-        )
-        page = await context.new_page()
-        
+    async with browser_pool.page(
+        "Gate.io",
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+        viewport={"width": 1920, "height": 1080}
+    ) as page:
         try:
             print("正在加载 Gate.io 页面...")
-            # 设置请求拦截，类似于Binance的处理方式
-            await page.route("**/*", lambda route: route.continue_())
-            
-            # 增加页面加载超时时间到2分钟
-            await page.goto(url, wait_until="networkidle", timeout=120000)
-            print("页面初步加载完成")
-            
-            # 等待页面加载完成
-            await page.wait_for_timeout(5000)
+            # 拦截图片、字体、统计和第三方脚本等无关请求
+            await apply_request_policy(page, "Gate.io")
             
-            # 使用更精确的选择器
-            selector = "div.flex.flex-col.gap-6.sm\\:gap-8 a"
-            print(f"等待选择器: {selector}")
-            await page.wait_for_selector(selector, timeout=60000)
+            # 列表项数量稳定后立即开始解析，不等待 networkidle
+            await goto_and_wait_ready(page, config)
             
-            # 获取页面 HTML
-            html = await page.content()
-            soup = BeautifulSoup(html, "html.parser")
-            print("🔍 开始抓取 Gate.io 的新闻...")
-            print(f"页面HTML前100个字符: {html[:100]}")  # 打印页面开头部分
-            # 获取所有新闻项，使用更精确的选择器
-            news_items = soup.select("div.flex.flex-col.gap-6.sm\\:gap-8 a")
-            # print(f"找到 {len(news_items)} 个新闻项")
+            # 公告列表与上次相同时无需获取和解析整个页面
+            if await list_region_unchanged(page, config):
+                return UnchangedNews()
             
-            for item in news_items:
-                title = None  # 初始化 title 为空
-                link = None
-                time = "No date found"
-                
-                # 获取标题
-                title_tag = item.find("p", class_="font-medium text-subtitle line-clamp-2")
-                title = title_tag.text.strip() if title_tag else None
-                
-                # 获取链接
-                link = "https://www.gate.io" + item["href"] if item.get("href") else None
-                
-                # 获取时间 - 使用图片中显示的结构
-                time_div = item.find("div", class_="flex gap-5 text-body-s text-t3")
-                if time_div:
-                    time_inner_div = time_div.find("div", class_="flex items-center gap-1")
-                    if time_inner_div:
-                        time_span = time_inner_div.find("span")
-                        time = time_span.text.strip() if time_span else "No date found"
-                
-                if title and link:
-                    news_list.append({
-                        "title": title,
-                        "link": link,
-                        "time": format_news_time(time),
-                        "source": "Gate.io"
-                    })
-                    # print(f"✅ 成功抓取: {title} | 时间: {time}")
-                else:
-                    print(f"⚠️ 跳过无效新闻项: 标题={title}, 链接={link}")
-                    
+            # 按 EXCHANGE_CONFIGS 中的选择器解析列表（解析后端见 html_parser.py）
+            news_list = await extract_page_news(page, config)
+            print(f"🔍 Gate.io 解析到 {len(news_list)} 条新闻")
+
         except Exception as e:
             print(f"Gate.io 抓取出错: {e}")
             print(f"\n错误详细信息:")
@@ -833,8 +506,10 @@ async def fetch_gate_news():
             html = await page.content()
             print("页面HTML前1000个字符:")
             print(html[:100])  # 输出HTML帮助调试
-        finally:
-            await browser.close()
+
+    # 解析成功后才记录公告列表的哈希，解析失败时下次仍会完整解析
+    if news_list:
+        change_detector.commit(change_key(config.name, "browser"))
 
     # 统计信息
     total_count = len(news_list)
@@ -851,104 +526,6 @@ async def fetch_gate_news():
     
     return list(unique_news)
 
-# 更新 main 函数
-async def main():
-    """
-    主函数：并行抓取所有交易所的新闻，并合并结果
-    
-    设置了总体超时控制，确保即使某个交易所抓取失败，也能返回其他交易所的结果
-    
-    Returns:
-        list: 合并后的新闻列表
-    """
-    logger.info("开始抓取所有交易所新闻...")
-    start_time = datetime.now()
-    
-    # 检查环境
-    is_railway = os.environ.get('RAILWAY_ENVIRONMENT') is not None
-    environment_name = "Railway环境" if is_railway else "本地环境"
-    
-    logger.info(f"🌍 当前在【{environment_name}】中执行抓取任务")
-    
-    try:
-        # 如果在 Railway 环境中，确保 Playwright 依赖已安装
-        if is_railway:
-            try:
-                logger.info("在 Railway 环境中，尝试安装 Playwright 依赖")
-                # 安装 Playwright 依赖
-                subprocess.run([sys.executable, "-m", "playwright", "install", "--with-deps", "chromium"], 
-                               check=True, capture_output=True)
-                logger.info("Playwright 依赖安装成功")
-            except Exception as e:
-                logger.error(f"安装 Playwright 依赖失败: {e}")
-                logger.exception("详细错误信息")
-                # 即使安装失败，仍然尝试使用 Playwright 方法
-                logger.info("尽管安装依赖失败，仍将尝试使用 Playwright 抓取方法")
-        
-        # 统一使用 Playwright 抓取方法
-        logger.info("使用 Playwright 抓取方法")
-        
-        # 配置 Playwright 启动选项，适应云环境
-        browser_launch_options = {
-            "headless": True,
-            "args": [
-                "--disable-gpu",
-                "--disable-dev-shm-usage",
-                "--disable-setuid-sandbox",
-                "--no-sandbox",
-                "--single-process",
-                "--no-zygote"
-            ]
-        }
-
-        # 创建任务列表
-        tasks = [
-            fetch_binance_news(),
-            fetch_okx_news(),
-            fetch_bitget_news(),
-            fetch_bybit_news(),
-            fetch_kucoin_news(),
-            fetch_gate_news()
-        ]
-
-        # 使用 gather 并行执行所有任务，设置 return_exceptions=True 避免一个任务失败影响其他任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 处理结果
-        all_news = []
-        exchange_names = ["Binance", "OKX", "Bitget", "Bybit", "KuCoin", "Gate.io"]
-        
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                # 如果是异常，记录错误但继续处理其他结果
-                logger.error(f"{exchange_names[i]} 抓取失败: {result}")
-            else:
-                # 正常结果，添加到总列表
-                logger.info(f"{exchange_names[i]} 抓取成功，获取 {len(result)} 条新闻")
-                all_news.extend(result)
-        
-        # 记录总执行时间
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        logger.info(f"所有交易所抓取完成，总耗时 {duration:.2f} 秒，共获取 {len(all_news)} 条新闻")
-        
-        return all_news
-
-    except Exception as e:
-        logger.error(f"抓取过程中出错: {e}")
-        logger.exception("详细错误信息")
-        return []
-import os
-import requests
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-import logging
-import subprocess
-import sys
-
-import shutil
-import tempfile
-
 def clean_temp_files():
     """
     清理Playwright临时文件
@@ -972,8 +549,45 @@ def clean_temp_files():
 
 
 
+def build_scrape_source(name, browser_fetch):
+    """
+    构建交易所的抓取源：有公告接口时优先请求接口，失败时回退到浏览器抓取
+
+    Args:
+        name (str): 交易所名称
+        browser_fetch (callable): 浏览器抓取函数
+    """
+    adapter = get_api_adapter(name)
+    if adapter:
+        return ScrapeSource(name, adapter.fetch, kind="api", fallback=browser_fetch, fallback_kind="browser")
+    return ScrapeSource(name, browser_fetch, kind="browser")
+
+
+# 抓取源配置：浏览器类抓取源共享浏览器页面并发限制，API 类抓取源不受浏览器并发限制
+SCRAPE_SOURCES = [
+    build_scrape_source("Binance", fetch_binance_news),
+    build_scrape_source("OKX", fetch_okx_news),
+    build_scrape_source("Bitget", fetch_bitget_news),
+    ScrapeSource("Bybit", fetch_bybit_news, kind="api"),
+    build_scrape_source("KuCoin", fetch_kucoin_news),
+    build_scrape_source("Gate.io", fetch_gate_news)
+]
+
+
+async def stream_news(sources=None):
+    """
+    并发抓取所有交易所的新闻，每个交易所完成后立即产出结果
+
+    Args:
+        sources (list): 要抓取的 ScrapeSource 列表，默认为全部交易所
+
+    Yields:
+        ScrapeOutcome: 单个交易所的抓取结果
+    """
+    orchestrator = ScrapeOrchestrator(sources or SCRAPE_SOURCES)
+    async for outcome in orchestrator.stream():
+        yield outcome
 
-logger = logging.getLogger(__name__)
 
 async def main():
     """
@@ -991,28 +605,12 @@ async def main():
     start_time = datetime.now()
     
     try:
-        # 创建任务列表
         all_news = []
-        exchange_names = ["Binance", "OKX", "Bitget", "Bybit", "KuCoin", "Gate.io"]
-        tasks = [
-            fetch_binance_news,
-            fetch_okx_news,
-            fetch_bitget_news,
-            fetch_bybit_news,  # Bybit使用API，不受影响
-            fetch_kucoin_news,
-            fetch_gate_news
-        ]
-        
-        # 一次只运行一个浏览器任务
-        for i, task_func in enumerate(tasks):
-            try:
-                result = await task_func()
-                logger.info(f"{exchange_names[i]} 抓取成功，获取 {len(result)} 条新闻")
-                all_news.extend(result)
-            except Exception as e:
-                logger.error(f"{exchange_names[i]} 抓取失败: {e}")
+        async for outcome in stream_news():
+            all_news.extend(outcome.news)
         
-        logger.info(f"总共获取到 {len(all_news)} 条新闻")
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(f"所有交易所抓取完成，总耗时 {duration:.2f} 秒，共获取 {len(all_news)} 条新闻")
         return all_news
     except Exception as e:
         logger.error(f"抓取过程中出错: {e}")
@@ -1020,5 +618,14 @@ async def main():
         return []  # 出错时返回空列表
 
 
+async def _run_standalone():
+    """单独运行抓取时，结束后关闭共享浏览器和 HTTP 会话"""
+    try:
+        return await main()
+    finally:
+        await browser_pool.close()
+        await close_http_session()
+
+
 if __name__ == '__main__':
-    asyncio.run(main())
+    asyncio.run(_run_standalone())
@@ -0,0 +1,76 @@
+# page_readiness.py
+import asyncio
+import logging
+import time
+
+from metrics import LatencyRegistry
+
+logger = logging.getLogger(__name__)
+
+# 轮询选择器的间隔（秒）
+READY_POLL_INTERVAL = 0.25
+
+# 每个交易所从开始导航到列表就绪的耗时
+READINESS_STATS = LatencyRegistry()
+
+# 每个交易所就绪失败（导航出错，或超时时列表为空）的累计次数
+READINESS_FAILURES = {}
+
+
+async def wait_until_ready(page, selector, min_items=1, timeout=60000, poll_interval=READY_POLL_INTERVAL):
+    """
+    等待列表选择器就绪：匹配数量至少为 min_items，且连续两次轮询数量不变
+
+    超时时如果列表中已有内容则按已加载的内容继续，否则抛出 TimeoutError
+
+    Args:
+        page: Playwright Page
+        selector (str): 列表项选择器
+        min_items (int): 至少需要的列表项数量
+        timeout (int): 超时时间（毫秒）
+        poll_interval (float): 轮询间隔（秒）
+
+    Returns:
+        int: 就绪时的列表项数量
+    """
+    deadline = time.monotonic() + timeout / 1000
+    last_count = -1
+    locator = page.locator(selector)
+
+    while True:
+        count = await locator.count()
+        if count >= min_items and count == last_count:
+            return count
+        if time.monotonic() >= deadline:
+            if count > 0:
+                logger.warning(f"等待 {selector} 超时，按已加载的 {count} 项继续")
+                return count
+            raise TimeoutError(f"等待 {selector} 超时（{timeout} 毫秒）")
+        last_count = count
+        await asyncio.sleep(poll_interval)
+
+
+async def goto_and_wait_ready(page, config):
+    """
+    打开交易所公告页，并等待公告列表就绪（不等待 networkidle，也不固定等待）
+
+    Args:
+        page: Playwright Page
+        config (NewsScraperConfig): 交易所配置，使用其中的 url、selectors、min_items 和 timeout
+
+    Returns:
+        int: 就绪时的列表项数量
+    """
+    selector = config.selectors.get('list') or config.selectors['wait_for']
+    start = time.monotonic()
+    try:
+        await page.goto(config.url, wait_until="domcontentloaded", timeout=config.timeout)
+        count = await wait_until_ready(page, selector, min_items=config.min_items, timeout=config.timeout)
+    except Exception:
+        READINESS_FAILURES[config.name] = READINESS_FAILURES.get(config.name, 0) + 1
+        raise
+
+    elapsed = time.monotonic() - start
+    READINESS_STATS.record(config.name, elapsed)
+    print(f"{config.name} 列表就绪: {count} 项，耗时 {elapsed:.2f} 秒")
+    return count
@@ -0,0 +1,95 @@
+# poll_schedule.py
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# 每类抓取源的默认轮询间隔（秒）：API 请求开销小，可以高频轮询；浏览器抓取开销大，间隔更长
+DEFAULT_POLL_INTERVALS = {
+    "api": int(os.environ.get('SCRAPER_API_INTERVAL_SECONDS', '30')),
+    "browser": int(os.environ.get('SCRAPER_BROWSER_INTERVAL_SECONDS', '300'))
+}
+
+# 单独指定的交易所轮询间隔（秒），例如 SCRAPER_POLL_INTERVALS="Bybit=15,Gate.io=600"
+POLL_INTERVAL_OVERRIDES = {"Bybit": 15}
+for _item in os.environ.get('SCRAPER_POLL_INTERVALS', '').split(','):
+    if '=' in _item:
+        _name, _seconds = _item.split('=', 1)
+        POLL_INTERVAL_OVERRIDES[_name.strip()] = int(_seconds)
+
+# 随机抖动占轮询间隔的比例，避免所有抓取源在同一时刻请求
+POLL_JITTER_RATIO = float(os.environ.get('SCRAPER_POLL_JITTER_RATIO', '0.2'))
+
+# 连续失败时轮询间隔翻倍，最长为基础间隔的 POLL_MAX_BACKOFF_FACTOR 倍，且不超过 POLL_MAX_INTERVAL 秒
+POLL_MAX_BACKOFF_FACTOR = int(os.environ.get('SCRAPER_POLL_MAX_BACKOFF_FACTOR', '16'))
+POLL_MAX_INTERVAL = int(os.environ.get('SCRAPER_POLL_MAX_INTERVAL_SECONDS', '1800'))
+
+
+class SourceSchedule:
+    """
+    单个抓取源的轮询节奏
+
+    成功时使用基础间隔；主抓取方式失败、由备用方式（通常是浏览器）提供结果时，
+    使用备用方式的间隔；抓取失败时间隔按连续失败次数翻倍
+
+    Args:
+        name (str): 交易所名称
+        base_interval (int): 基础轮询间隔（秒）
+        fallback_interval (int): 由备用抓取方式提供结果时的轮询间隔（秒）
+    """
+
+    def __init__(self, name, base_interval, fallback_interval=None):
+        self.name = name
+        self.base_interval = base_interval
+        self.fallback_interval = max(fallback_interval or base_interval, base_interval)
+        self.max_interval = max(min(base_interval * POLL_MAX_BACKOFF_FACTOR, POLL_MAX_INTERVAL), base_interval)
+        self.interval = base_interval
+        self.consecutive_failures = 0
+        self.runs = 0
+
+    @property
+    def jitter(self):
+        return max(1, int(self.interval * POLL_JITTER_RATIO))
+
+    def record(self, outcome, primary_kind):
+        """
+        根据抓取结果计算下一次轮询间隔
+
+        Args:
+            outcome (ScrapeOutcome): 本次抓取结果
+            primary_kind (str): 抓取源的主抓取方式
+
+        Returns:
+            bool: 轮询间隔是否发生变化
+        """
+        self.runs += 1
+        previous = self.interval
+        if outcome.ok:
+            self.consecutive_failures = 0
+            self.interval = self.base_interval if outcome.path == primary_kind else self.fallback_interval
+        else:
+            self.consecutive_failures += 1
+            self.interval = min(self.base_interval * 2 ** self.consecutive_failures, self.max_interval)
+
+        if self.interval != previous:
+            logger.info(f"{self.name} 轮询间隔调整为 {self.interval} 秒（连续失败 {self.consecutive_failures} 次）")
+        return self.interval != previous
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "consecutive_failures": self.consecutive_failures,
+            "runs": self.runs
+        }
+
+
+def build_schedule(source):
+    """
+    按抓取源的类型和配置生成轮询节奏
+
+    Args:
+        source (ScrapeSource): 抓取源
+    """
+    base_interval = POLL_INTERVAL_OVERRIDES.get(source.name, DEFAULT_POLL_INTERVALS.get(source.kind, 300))
+    fallback_interval = DEFAULT_POLL_INTERVALS.get(source.fallback_kind) if source.fallback else None
+    return SourceSchedule(source.name, base_interval, fallback_interval)
@@ -0,0 +1,116 @@
+# request_interceptor.py
+import logging
+import os
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 设置 SCRAPER_REQUEST_INTERCEPT=off 可关闭拦截，便于排查页面加载问题
+INTERCEPT_ENABLED = os.environ.get('SCRAPER_REQUEST_INTERCEPT', 'on').lower() not in ('off', 'false', '0')
+
+# 抓取公告列表用不到的资源类型
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset([
+    "image", "media", "font", "stylesheet", "texttrack", "manifest", "other"
+])
+
+# 统计、广告、客服插件等第三方域名，无论资源类型一律拦截
+ANALYTICS_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "facebook.com", "connect.facebook.net",
+    "hotjar.com", "clarity.ms", "bat.bing.com", "analytics.twitter.com", "ads-twitter.com",
+    "analytics.tiktok.com", "mixpanel.com", "amplitude.com", "segment.io", "segment.com",
+    "sensorsdata.cn", "sentry.io", "sentry-cdn.com", "appsflyer.com", "onelink.me", "branch.io",
+    "intercom.io", "intercomcdn.com", "zendesk.com", "zdassets.com", "cookielaw.org",
+    "onetrust.com", "criteo.com", "taboola.com", "yandex.ru", "adjust.com"
+)
+
+# 所有交易所都允许的第三方域名（人机验证脚本被拦截会导致页面无法加载）
+GLOBAL_ALLOWED_HOSTS = (
+    "challenges.cloudflare.com", "hcaptcha.com", "recaptcha.net", "www.google.com", "www.gstatic.com"
+)
+
+
+def _host_matches(host, suffixes):
+    return any(host == suffix or host.endswith("." + suffix) for suffix in suffixes)
+
+
+class RequestPolicy:
+    """
+    单个交易所的请求拦截策略
+
+    只保留渲染公告列表需要的文档、XHR/fetch 和第一方脚本，
+    拦截图片、字体、媒体、样式、统计脚本和第三方脚本
+
+    Args:
+        first_party_hosts (tuple): 交易所自己的域名（含静态资源 CDN），匹配子域名
+        blocked_resource_types (frozenset): 需要拦截的资源类型
+        block_third_party_scripts (bool): 是否拦截第一方域名以外的脚本
+    """
+
+    def __init__(self, first_party_hosts, blocked_resource_types=DEFAULT_BLOCKED_RESOURCE_TYPES,
+                 block_third_party_scripts=True):
+        self.first_party_hosts = tuple(first_party_hosts)
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.block_third_party_scripts = block_third_party_scripts
+
+    def should_block(self, resource_type, url):
+        """
+        判断请求是否应被拦截
+
+        Args:
+            resource_type (str): Playwright 的 request.resource_type
+            url (str): 请求地址
+
+        Returns:
+            bool: True 表示拦截
+        """
+        host = (urlsplit(url).hostname or "").lower()
+        if not host:
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        if _host_matches(host, ANALYTICS_HOSTS):
+            return True
+        if resource_type == "script" and self.block_third_party_scripts:
+            return not _host_matches(host, self.first_party_hosts + GLOBAL_ALLOWED_HOSTS)
+        return False
+
+
+# 各交易所的拦截策略，第一方域名包含页面依赖的静态资源 CDN
+REQUEST_POLICIES = {
+    "Binance": RequestPolicy(("binance.com", "bnbstatic.com", "binance.info")),
+    "OKX": RequestPolicy(("okx.com", "okx.cab", "okxcdn.com")),
+    "Bitget": RequestPolicy(("bitget.com", "bitgetimg.com", "bitgetapp.com")),
+    "Bybit": RequestPolicy(("bybit.com", "bycsi.com", "bybitglobal.com")),
+    "KuCoin": RequestPolicy(("kucoin.com", "staticimg.com", "kucoin.plus")),
+    "Gate.io": RequestPolicy(("gate.io", "gate.com", "gateimg.com"))
+}
+
+# 每个交易所的拦截统计：{"allowed": 放行请求数, "blocked": 拦截请求数}
+INTERCEPT_STATS = {}
+
+
+async def apply_request_policy(page, name):
+    """
+    为页面安装交易所对应的请求拦截策略
+
+    Args:
+        page: Playwright Page
+        name (str): 交易所名称，没有配置策略时不拦截
+    """
+    policy = REQUEST_POLICIES.get(name)
+    if not INTERCEPT_ENABLED or policy is None:
+        return
+
+    stats = INTERCEPT_STATS.setdefault(name, {"allowed": 0, "blocked": 0})
+
+    async def handle_route(route):
+        request = route.request
+        if policy.should_block(request.resource_type, request.url):
+            stats["blocked"] += 1
+            await route.abort()
+        else:
+            stats["allowed"] += 1
+            await route.continue_()
+
+    await page.route("**/*", handle_route)
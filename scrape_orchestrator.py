@@ -0,0 +1,165 @@
+# scrape_orchestrator.py
+import asyncio
+import logging
+import os
+import time
+
+from change_detector import UnchangedNews
+
+logger = logging.getLogger(__name__)
+
+# 并发限制：浏览器类任务最多同时打开的页面数，API 类任务默认不限制（0 表示不限制）
+BROWSER_CONCURRENCY = int(os.environ.get('SCRAPER_BROWSER_CONCURRENCY', '2'))
+API_CONCURRENCY = int(os.environ.get('SCRAPER_API_CONCURRENCY', '0'))
+
+# 每类任务的默认截止时间（秒），超时的抓取源返回空结果，不影响其他抓取源
+DEFAULT_DEADLINES = {
+    "browser": int(os.environ.get('SCRAPER_BROWSER_DEADLINE_SECONDS', '240')),
+    "api": int(os.environ.get('SCRAPER_API_DEADLINE_SECONDS', '60'))
+}
+
+
+# 每个交易所由哪种方式提供结果的累计次数，例如 {"Binance": {"api": 10, "browser": 1}}
+PATH_STATS = {}
+
+
+class ScrapeSource:
+    """
+    一个抓取源
+
+    Args:
+        name (str): 交易所名称
+        fetch (callable): 无参数的异步抓取函数，返回新闻列表
+        kind (str): "browser" 或 "api"，决定使用哪个并发限制
+        deadline (int): 截止时间（秒），默认按 kind 取值
+        fallback (callable): 主抓取方式失败或返回空列表时使用的备用抓取函数
+        fallback_kind (str): 备用抓取函数的类型
+    """
+
+    def __init__(self, name, fetch, kind="browser", deadline=None, fallback=None, fallback_kind="browser"):
+        self.name = name
+        self.fetch = fetch
+        self.kind = kind
+        self.deadline = deadline or DEFAULT_DEADLINES.get(kind, 300)
+        self.fallback = fallback
+        self.fallback_kind = fallback_kind
+
+
+class ScrapeOutcome:
+    """单个抓取源的结果"""
+
+    def __init__(self, name, news=None, error=None, duration=0.0, path=None):
+        self.name = name
+        self.news = news or []
+        self.error = error
+        self.duration = duration
+        # 实际提供结果的抓取方式（"api" 或 "browser"）
+        self.path = path
+        # 公告列表与上次相同，news 为空但不代表抓取失败
+        self.unchanged = isinstance(news, UnchangedNews)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class ScrapeOrchestrator:
+    """
+    并发抓取调度器
+
+    所有抓取源同时启动，按 kind 使用各自的并发限制（例如最多 2 个浏览器页面，
+    API 请求不限制），每个抓取源有独立的截止时间，结果在完成时立即产出，
+    因此一次抓取的总耗时接近最慢的单个抓取源，而不是所有抓取源耗时之和。
+    """
+
+    def __init__(self, sources, limits=None):
+        self.sources = list(sources)
+        if limits is None:
+            limits = {"browser": BROWSER_CONCURRENCY, "api": API_CONCURRENCY}
+        self._semaphores = {
+            kind: asyncio.Semaphore(limit) for kind, limit in limits.items() if limit and limit > 0
+        }
+
+    async def _run_fetch(self, name, fetch, kind, deadline):
+        semaphore = self._semaphores.get(kind)
+        if semaphore:
+            await semaphore.acquire()
+        # 截止时间从获得执行名额时开始计算，排队时间不计入
+        start = time.monotonic()
+        try:
+            news = await asyncio.wait_for(fetch(), timeout=deadline)
+            return ScrapeOutcome(name, news=news, duration=time.monotonic() - start, path=kind)
+        except asyncio.TimeoutError:
+            error = TimeoutError(f"超过截止时间 {deadline} 秒")
+            return ScrapeOutcome(name, error=error, duration=time.monotonic() - start, path=kind)
+        except Exception as e:
+            return ScrapeOutcome(name, error=e, duration=time.monotonic() - start, path=kind)
+        finally:
+            if semaphore:
+                semaphore.release()
+
+    async def _run_source(self, source):
+        outcome = await self._run_fetch(source.name, source.fetch, source.kind, source.deadline)
+
+        if source.fallback and (not outcome.ok or (not outcome.news and not outcome.unchanged)):
+            reason = outcome.error or "返回空列表"
+            logger.warning(f"{source.name} {source.kind} 抓取失败（{reason}），改用 {source.fallback_kind} 抓取")
+            primary_duration = outcome.duration
+            outcome = await self._run_fetch(
+                source.name, source.fallback, source.fallback_kind,
+                DEFAULT_DEADLINES.get(source.fallback_kind, source.deadline)
+            )
+            outcome.duration += primary_duration
+
+        if outcome.ok:
+            path_stats = PATH_STATS.setdefault(source.name, {})
+            path_stats[outcome.path] = path_stats.get(outcome.path, 0) + 1
+        return outcome
+
+    @staticmethod
+    def _log_outcome(outcome):
+        if outcome.unchanged:
+            logger.info(f"{outcome.name} 公告列表未变化（{outcome.path}），耗时 {outcome.duration:.2f} 秒")
+        elif outcome.ok:
+            logger.info(f"{outcome.name} 抓取成功（{outcome.path}），获取 {len(outcome.news)} 条新闻，耗时 {outcome.duration:.2f} 秒")
+        else:
+            logger.error(f"{outcome.name} 抓取失败: {outcome.error}")
+
+    async def run_source(self, source):
+        """
+        执行单个抓取源，与其他调用共享同一组并发限制
+
+        Returns:
+            ScrapeOutcome: 抓取结果
+        """
+        outcome = await self._run_source(source)
+        self._log_outcome(outcome)
+        return outcome
+
+    async def stream(self):
+        """
+        并发执行所有抓取源，每完成一个就产出一个 ScrapeOutcome
+
+        Yields:
+            ScrapeOutcome: 按完成顺序产出的抓取结果
+        """
+        tasks = [asyncio.create_task(self._run_source(source)) for source in self.sources]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                outcome = await next_done
+                self._log_outcome(outcome)
+                yield outcome
+        finally:
+            # 调用方提前停止迭代时，取消仍在运行的抓取任务
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def run(self):
+        """
+        执行所有抓取源并等待全部完成
+
+        Returns:
+            list: 所有 ScrapeOutcome
+        """
+        return [outcome async for outcome in self.stream()]
@@ -0,0 +1,73 @@
+# seen_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class SeenIdCache:
+    """
+    最近已存储新闻 unique_id 的有界 LRU/TTL 缓存
+
+    命中缓存的新闻一定已经在数据库中，可以直接跳过，不再访问数据库。
+    存储在数据库线程池中执行，多个线程可能同时访问，所有读写都持有锁
+
+    Args:
+        maxsize (int): 最多缓存的 unique_id 数量，超过后淘汰最久未使用的
+        ttl (int): 每个 unique_id 的有效期（秒）
+    """
+
+    def __init__(self, maxsize=20000, ttl=7 * 24 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()  # unique_id -> 过期时间
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def contains(self, unique_id):
+        """检查 unique_id 是否已缓存，同时更新命中统计和 LRU 顺序"""
+        with self._lock:
+            expires_at = self._items.get(unique_id)
+            if expires_at is not None and expires_at > time.monotonic():
+                self._items.move_to_end(unique_id)
+                self.hits += 1
+                return True
+            if expires_at is not None:
+                del self._items[unique_id]
+            self.misses += 1
+            return False
+
+    def add(self, unique_id):
+        with self._lock:
+            self._items[unique_id] = time.monotonic() + self.ttl
+            self._items.move_to_end(unique_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def add_many(self, unique_ids):
+        with self._lock:
+            for unique_id in unique_ids:
+                self.add(unique_id)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: 缓存大小、命中次数、未命中次数和命中率
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
@@ -0,0 +1,169 @@
+# source_adapters.py
+import logging
+import os
+from datetime import datetime, timezone
+
+from change_detector import NOT_MODIFIED, UnchangedNews, change_detector, change_key
+from http_client import get_json
+
+logger = logging.getLogger(__name__)
+
+# 设置 SCRAPER_USE_API_ADAPTERS=off 可关闭 API 抓取，全部改用浏览器
+API_ADAPTERS_ENABLED = os.environ.get('SCRAPER_USE_API_ADAPTERS', 'on').lower() not in ('off', 'false', '0')
+
+
+def format_timestamp_ms(timestamp_ms):
+    """将毫秒级时间戳转换为 'YYYY-MM-DD HH:MM:SS UTC' 格式，无法解析时返回 None"""
+    try:
+        dt = datetime.fromtimestamp(int(timestamp_ms) / 1000, tz=timezone.utc)
+        return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _check_code(name, data, expected_code):
+    if str(data.get("code")) != expected_code:
+        raise ValueError(f"{name} API 响应错误: code={data.get('code')}, msg={data.get('msg') or data.get('message')}")
+
+
+def parse_binance_api(data):
+    """解析 Binance CMS 公告接口（前端公告页使用的接口）"""
+    _check_code("Binance", data, "000000")
+    news_list = []
+    for catalog in (data.get("data") or {}).get("catalogs", []):
+        for article in catalog.get("articles", []):
+            if not article.get("title") or not article.get("code"):
+                continue
+            news_list.append({
+                "title": article["title"].strip(),
+                "link": f"https://www.binance.com/en/support/announcement/{article['code']}",
+                "time": format_timestamp_ms(article.get("releaseDate")),
+                "source": "Binance"
+            })
+    return news_list
+
+
+def parse_okx_api(data):
+    """解析 OKX 公开公告接口 /api/v5/support/announcements"""
+    _check_code("OKX", data, "0")
+    news_list = []
+    for page in data.get("data", []):
+        for item in page.get("details", []):
+            if not item.get("title") or not item.get("url"):
+                continue
+            news_list.append({
+                "title": item["title"].strip(),
+                "link": item["url"],
+                "time": format_timestamp_ms(item.get("pTime")),
+                "source": "OKX"
+            })
+    return news_list
+
+
+def parse_bitget_api(data):
+    """解析 Bitget 公开公告接口 /api/v2/public/annoucements"""
+    _check_code("Bitget", data, "00000")
+    news_list = []
+    for item in data.get("data", []):
+        if not item.get("annTitle") or not item.get("annUrl"):
+            continue
+        news_list.append({
+            "title": item["annTitle"].strip(),
+            "link": item["annUrl"],
+            "time": format_timestamp_ms(item.get("cTime")),
+            "source": "Bitget"
+        })
+    return news_list
+
+
+def parse_kucoin_api(data):
+    """解析 KuCoin 公开公告接口 /api/v3/announcements"""
+    _check_code("KuCoin", data, "200000")
+    news_list = []
+    for item in (data.get("data") or {}).get("items", []):
+        if not item.get("annTitle") or not item.get("annUrl"):
+            continue
+        news_list.append({
+            "title": item["annTitle"].strip(),
+            "link": item["annUrl"],
+            "time": format_timestamp_ms(item.get("cTime")),
+            "source": "KuCoin"
+        })
+    return news_list
+
+
+class ApiAdapter:
+    """
+    交易所公告的 HTTP/JSON 抓取方式
+
+    Args:
+        name (str): 交易所名称
+        url (str): 公告接口地址
+        params (dict): 查询参数
+        parse (callable): 将 JSON 响应解析为新闻列表的函数
+    """
+
+    def __init__(self, name, url, params, parse):
+        self.name = name
+        self.url = url
+        self.params = params
+        self.parse = parse
+
+    async def fetch(self):
+        """
+        请求接口并解析新闻
+
+        Returns:
+            list: 按标题去重后的新闻列表，公告列表未变化时返回 UnchangedNews
+
+        Raises:
+            Exception: 请求失败或响应格式不正确时抛出，由调用方决定是否回退到浏览器抓取
+        """
+        print(f"正在请求 {self.name} 公告接口: {self.url}")
+        data = await get_json(self.url, params=self.params, change_key=change_key(self.name, "api"))
+        if data is NOT_MODIFIED:
+            return UnchangedNews()
+        news_list = self.parse(data)
+        # 解析出新闻后才记录哈希：接口返回空列表（或格式变化解析不出新闻）时，
+        # 下次相同的响应不会被当作未变化，调度器仍会回退到浏览器抓取
+        if news_list:
+            change_detector.commit(change_key(self.name, "api"))
+        unique_news = list({item["title"]: item for item in news_list}.values())
+        print(f"{self.name} 接口获取 {len(news_list)} 条公告，去重后剩余 {len(unique_news)} 条")
+        return unique_news
+
+
+# 各交易所前端使用的公开公告接口，Gate.io 暂无可用接口，仍使用浏览器抓取
+API_ADAPTERS = {
+    "Binance": ApiAdapter(
+        "Binance",
+        "https://www.binance.com/bapi/composite/v1/public/cms/article/list/query",
+        {"type": 1, "catalogId": 48, "pageNo": 1, "pageSize": 20},
+        parse_binance_api
+    ),
+    "OKX": ApiAdapter(
+        "OKX",
+        "https://www.okx.com/api/v5/support/announcements",
+        {"annType": "announcements-new-listings", "page": 1},
+        parse_okx_api
+    ),
+    "Bitget": ApiAdapter(
+        "Bitget",
+        "https://api.bitget.com/api/v2/public/annoucements",
+        {"language": "en_US", "annType": "coin_listings"},
+        parse_bitget_api
+    ),
+    "KuCoin": ApiAdapter(
+        "KuCoin",
+        "https://api.kucoin.com/api/v3/announcements",
+        {"annType": "new-listings", "lang": "en_US", "pageSize": 20},
+        parse_kucoin_api
+    )
+}
+
+
+def get_api_adapter(name):
+    """返回交易所的 ApiAdapter，未配置或已关闭 API 抓取时返回 None"""
+    if not API_ADAPTERS_ENABLED:
+        return None
+    return API_ADAPTERS.get(name)
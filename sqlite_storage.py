@@ -0,0 +1,169 @@
+# sqlite_storage.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# 新闻数据库文件路径（NEWS_STORAGE_BACKEND=sqlite 时使用）
+NEWS_SQLITE_PATH = os.environ.get('NEWS_SQLITE_PATH', 'news.db')
+
+# 单独存储为列的字段，其他字段以 JSON 保存在 extra 列中
+COLUMNS = ("unique_id", "source", "title", "link", "time", "created_at", "published_at",
+           "last_updated", "pending_delivery", "delivered_at")
+DATETIME_COLUMNS = ("created_at", "published_at", "last_updated", "delivered_at")
+
+# 语句均为常量，sqlite3 按语句文本缓存编译结果，重复执行时不再重新解析（预编译语句）
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS news (
+        id INTEGER PRIMARY KEY,
+        unique_id TEXT NOT NULL,
+        source TEXT,
+        title TEXT,
+        link TEXT,
+        time TEXT,
+        created_at REAL NOT NULL,
+        published_at REAL,
+        last_updated REAL,
+        pending_delivery INTEGER NOT NULL DEFAULT 0,
+        delivered_at REAL,
+        extra TEXT
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS unique_id_index ON news (unique_id)",
+    "CREATE INDEX IF NOT EXISTS created_at_index ON news (created_at)",
+    "CREATE INDEX IF NOT EXISTS source_published_at_index ON news (source, published_at)",
+]
+SELECT_EXISTING = "SELECT unique_id FROM news WHERE unique_id IN ({})"
+INSERT_NEWS = (
+    "INSERT OR IGNORE INTO news (unique_id, source, title, link, time, created_at, published_at, "
+    "last_updated, pending_delivery, delivered_at, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+MARK_DELIVERED = "UPDATE news SET pending_delivery = 0, delivered_at = ? WHERE unique_id = ?"
+SELECT_UNDELIVERED = "SELECT * FROM news WHERE pending_delivery = 1 AND created_at >= ? ORDER BY created_at DESC"
+SELECT_LATEST = "SELECT * FROM news WHERE source = ? ORDER BY published_at DESC LIMIT ?"
+SELECT_PUBLISHED_BETWEEN = (
+    "SELECT * FROM news WHERE published_at >= ? AND published_at < ? ORDER BY published_at DESC"
+)
+SELECT_SOURCE_PUBLISHED_BETWEEN = (
+    "SELECT * FROM news WHERE source = ? AND published_at >= ? AND published_at < ? ORDER BY published_at DESC"
+)
+SELECT_RECENT_IDS = "SELECT unique_id FROM news WHERE created_at >= ?"
+
+# SQLite 单条语句的参数数量上限为 999（旧版本），IN 查询按此分批
+MAX_VARIABLES = 900
+
+
+def _to_timestamp(value):
+    """UTC datetime（与 MongoDB 中一样不带时区）转换为 Unix 时间戳"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _from_timestamp(value):
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+class SqliteNewsStorage:
+    """
+    基于本地 SQLite 文件的新闻存储，接口与 news_database.MongoNewsStorage 相同
+
+    适合新闻量很小的部署：读写都在本地完成，没有 MongoDB Atlas 的网络往返
+
+    - WAL 模式，读写互不阻塞，synchronous=NORMAL 时每次提交无需等待磁盘同步
+    - unique_id 唯一索引用于去重，created_at 索引用于补发和预加载，(source, published_at) 索引用于按交易所查询
+    - 每批新闻在一个事务中写入
+
+    各方法在数据库线程池中调用，连接允许跨线程使用，由锁保证同一时间只有一个线程访问
+
+    Args:
+        path (str): 数据库文件路径
+    """
+
+    def __init__(self, path=NEWS_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+        logger.info(f"新闻存储使用 SQLite 文件 {path}")
+
+    @staticmethod
+    def _to_row(document):
+        extra = {key: value for key, value in document.items() if key not in COLUMNS and key != "_id"}
+        values = [document.get(column) for column in COLUMNS]
+        for index, column in enumerate(COLUMNS):
+            if column in DATETIME_COLUMNS:
+                values[index] = _to_timestamp(values[index])
+        values[COLUMNS.index("pending_delivery")] = int(bool(document.get("pending_delivery")))
+        return (*values, json.dumps(extra, ensure_ascii=False, default=str) if extra else None)
+
+    @staticmethod
+    def _to_document(row):
+        document = json.loads(row["extra"]) if row["extra"] else {}
+        for column in COLUMNS:
+            value = row[column]
+            document[column] = _from_timestamp(value) if column in DATETIME_COLUMNS else value
+        document["pending_delivery"] = bool(row["pending_delivery"])
+        document["_id"] = row["id"]
+        return document
+
+    def insert_new(self, documents):
+        """
+        在一个事务中插入不存在的新闻，已存在的新闻保持不变
+
+        Args:
+            documents (list): [(unique_id, document), ...]
+
+        Returns:
+            tuple: (新插入新闻的 unique_id, 已在数据库中的 unique_id)
+        """
+        unique_ids = [unique_id for unique_id, _ in documents]
+        with self._lock, self.connection:
+            existing = set()
+            for start in range(0, len(unique_ids), MAX_VARIABLES):
+                batch = unique_ids[start:start + MAX_VARIABLES]
+                rows = self.connection.execute(SELECT_EXISTING.format(",".join("?" * len(batch))), batch)
+                existing.update(row["unique_id"] for row in rows)
+            new_documents = [(unique_id, document) for unique_id, document in documents if unique_id not in existing]
+            self.connection.executemany(INSERT_NEWS, [self._to_row(document) for _, document in new_documents])
+        return [unique_id for unique_id, _ in new_documents], unique_ids
+
+    def mark_delivered(self, unique_ids, delivered_at):
+        delivered_at = _to_timestamp(delivered_at)
+        with self._lock, self.connection:
+            self.connection.executemany(MARK_DELIVERED, [(delivered_at, unique_id) for unique_id in unique_ids])
+
+    def _select(self, statement, parameters):
+        with self._lock:
+            rows = self.connection.execute(statement, parameters).fetchall()
+        return [self._to_document(row) for row in rows]
+
+    def find_undelivered(self, since):
+        return self._select(SELECT_UNDELIVERED, (_to_timestamp(since),))
+
+    def find_latest(self, source, limit):
+        return self._select(SELECT_LATEST, (source, limit))
+
+    def find_published_between(self, start, end, source=None):
+        if source:
+            return self._select(SELECT_SOURCE_PUBLISHED_BETWEEN, (source, _to_timestamp(start), _to_timestamp(end)))
+        return self._select(SELECT_PUBLISHED_BETWEEN, (_to_timestamp(start), _to_timestamp(end)))
+
+    def recent_unique_ids(self, since):
+        with self._lock:
+            rows = self.connection.execute(SELECT_RECENT_IDS, (_to_timestamp(since),)).fetchall()
+        return [row["unique_id"] for row in rows]
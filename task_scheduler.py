@@ -62,75 +62,119 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO
 )
-# 在文件顶部导入超时处理工具
-from utils import timeout
 import logging
 
 logger = logging.getLogger(__name__)
 
-# 修改定时任务函数
-async def scheduled_task():
-    """
-    定时执行的任务，包含超时处理机制
+def log_pipeline_stats():
+    """输出抓取、存储和推送各环节的统计信息"""
+    from browser_pool import browser_pool
+    from request_interceptor import INTERCEPT_STATS
+    from page_readiness import READINESS_STATS, READINESS_FAILURES
+    logger.info(f"浏览器池统计: {browser_pool.get_stats()}")
+    logger.info(f"请求拦截统计: {INTERCEPT_STATS}")
+    logger.info(f"页面就绪耗时: {READINESS_STATS.summary()}，失败次数: {READINESS_FAILURES}")
+    
+    from scrape_orchestrator import PATH_STATS
+    logger.info(f"抓取方式统计: {PATH_STATS}")
+    schedule_stats = {name: schedule.stats() for name, schedule in SOURCE_SCHEDULES.items()}
+    logger.info(f"轮询节奏: {schedule_stats}")
+    
+    from change_detector import change_detector
+    logger.info(f"公告列表变化检测: {change_detector.stats()}")
+    
+    from news_database import seen_cache
+    logger.info(f"已存储新闻缓存统计: {seen_cache.stats()}")
+    
+    from news_repository import news_repository
+    logger.info(f"数据库操作耗时: {news_repository.stats()}")
     
-    每30分钟执行一次，抓取新闻并推送到 Telegram 和 Lark
-    如果执行时间超过25分钟，会自动终止任务
+    from telegram_delivery import DELIVERY_LATENCY
+    logger.info(f"Telegram 推送耗时: {DELIVERY_LATENCY.summary()}")
+    
+    from bot import peek_outbox_drainer
+    from delivery_outbox import PUBLISH_TO_DELIVERY_LATENCY
+    drainer = peek_outbox_drainer()
+    if drainer is not None:
+        logger.info(f"推送队列统计: {drainer.stats()}")
+    logger.info(f"发布到推送耗时: {PUBLISH_TO_DELIVERY_LATENCY.summary()}")
+
+
+# 每个交易所的轮询节奏，以及所有交易所共享的抓取调度器（共享浏览器并发限制）
+SOURCE_SCHEDULES = {}
+_orchestrator = None
+_scheduler = None
+
+
+async def scrape_source_task(source):
     """
+    抓取单个交易所并立即存储、推送新增新闻，然后按抓取结果调整该交易所的轮询间隔
+
+    Args:
+        source (ScrapeSource): 抓取源
+    """
+    from news_repository import news_repository
+    from bot import send_news
+    from change_detector import change_detector
+    
     try:
-        # 设置超时时间为25分钟（1500秒）
-        # 由于任务间隔为30分钟，设置25分钟的超时确保下一个任务能正常执行
-        with timeout(1500):
-            logger.info("开始执行定时任务...")
-            start_time = datetime.now()
-            
-            # 导入必要的模块
-            from news_scraper import main as scraper_main
-            from news_database import store_news
-            from bot import send_latest_news
-            
-            try:
-                # 抓取新闻，设置总超时为20分钟
-                news_list = await asyncio.wait_for(scraper_main(), timeout=1200)
-                logger.info(f"抓取完成，获取到 {len(news_list)} 条新闻")
-                
-                # 存储新闻
-                new_count = store_news(news_list)
-                
-                # 推送新闻
-                if new_count > 0:
-                    logger.info(f"发现 {new_count} 条新新闻，准备推送...")
-                    await send_latest_news()
-                else:
-                    logger.info("无新内容，跳过推送")
-            except asyncio.TimeoutError:
-                logger.error("新闻抓取超时，跳过本次任务")
-                
-            # 记录任务执行时间
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            logger.info(f"定时任务执行完成，耗时 {duration:.2f} 秒")
-            
-    except TimeoutError as e:
-        logger.error(f"定时任务执行超时: {e}")
-        # 可以在这里添加清理代码，例如关闭连接等
+        outcome = await _orchestrator.run_source(source)
+        if outcome.news:
+            result = await news_repository.store_news_bulk(outcome.news)
+            if not result.ok:
+                # 存储失败时下次完整解析，避免这些新闻因公告列表未变化而被跳过
+                change_detector.forget_source(source.name)
+            new_documents = result.new_documents
+            if new_documents:
+                logger.info(f"{source.name} 发现 {len(new_documents)} 条新新闻，准备推送...")
+                await send_news(new_documents)
     except Exception as e:
-        logger.error(f"定时任务执行出错: {e}")
+        logger.error(f"{source.name} 抓取任务出错: {e}")
         logger.exception("详细错误信息")
+        from scrape_orchestrator import ScrapeOutcome
+        outcome = ScrapeOutcome(source.name, error=e)
+    
+    schedule = SOURCE_SCHEDULES[source.name]
+    if schedule.record(outcome, source.kind) and _scheduler:
+        _scheduler.reschedule_job(
+            f"scrape_{source.name}", trigger='interval', seconds=schedule.interval, jitter=schedule.jitter
+        )
+
 
 def start_scheduler():
     """
     启动定时任务调度器
+
+    每个交易所按各自的间隔独立轮询（API 抓取源间隔短，浏览器抓取源间隔长），
+    带随机抖动，抓取失败时自动延长间隔；统计信息每 30 分钟输出一次
     """
+    global _orchestrator, _scheduler
+    from news_scraper import SCRAPE_SOURCES
+    from scrape_orchestrator import ScrapeOrchestrator
+    from poll_schedule import build_schedule
+    
     # 创建调度器实例
     scheduler = AsyncIOScheduler()
+    _orchestrator = ScrapeOrchestrator(SCRAPE_SOURCES)
     
-    # 添加定时任务，每30分钟执行一次
-    scheduler.add_job(scheduled_task, 'interval', minutes=30, id='news_scraper')
+    for source in SCRAPE_SOURCES:
+        schedule = build_schedule(source)
+        SOURCE_SCHEDULES[source.name] = schedule
+        # 启动后立即抓取一次（首次抓取同样经过共享的抓取调度器和并发限制）；
+        # 同一交易所的上一次抓取未完成时跳过本次，积压的多次执行合并为一次
+        scheduler.add_job(
+            scrape_source_task, 'interval', seconds=schedule.interval, jitter=schedule.jitter,
+            args=[source], id=f"scrape_{source.name}", max_instances=1, coalesce=True,
+            next_run_time=datetime.now()
+        )
+        logger.info(f"{source.name} 每 {schedule.interval} 秒轮询一次（{source.kind}）")
+    
+    scheduler.add_job(log_pipeline_stats, 'interval', minutes=30, id='pipeline_stats')
     
     # 启动调度器
     scheduler.start()
-    logger.info("定时任务调度器已启动，每30分钟执行一次抓取任务")
-    
+    _scheduler = scheduler
+    logger.info("定时任务调度器已启动，各交易所按独立间隔轮询")
     return scheduler
 
 # 如果直接运行此文件，则启动调度器并保持运行
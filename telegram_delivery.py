@@ -0,0 +1,147 @@
+# telegram_delivery.py
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from metrics import LatencyRegistry
+
+logger = logging.getLogger(__name__)
+
+# Telegram 限制：整个 Bot 每秒约 30 条消息，同一个聊天每秒约 1 条
+TELEGRAM_GLOBAL_RATE = float(os.environ.get('TELEGRAM_GLOBAL_RATE', '30'))
+TELEGRAM_PER_CHAT_INTERVAL = float(os.environ.get('TELEGRAM_PER_CHAT_INTERVAL_SECONDS', '1.0'))
+TELEGRAM_MAX_RETRIES = int(os.environ.get('TELEGRAM_MAX_RETRIES', '3'))
+
+# 每个聊天完成一次推送（所有消息）的耗时
+DELIVERY_LATENCY = LatencyRegistry()
+
+
+class RateLimiter:
+    """
+    按固定最小间隔发放名额的异步限速器
+
+    Args:
+        interval (float): 两次发放之间的最小间隔（秒）
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now = time.monotonic()
+            self._next_at = now + self.interval
+
+    def delay(self, seconds):
+        """被限流时推迟下一次发放"""
+        self._next_at = max(self._next_at, time.monotonic() + seconds)
+
+
+class ChatDeliveryReport:
+    """单个聊天的推送结果"""
+
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.sent = 0
+        self.retries = 0
+        self.latency = 0.0
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _retry_after_seconds(error):
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class TelegramDeliveryScheduler:
+    """
+    并发推送消息到多个 Telegram 聊天
+
+    不同聊天之间并发发送，同时遵守全局和单个聊天的发送频率限制；
+    被限流（429）时按 retry_after 等待后重试，网络错误按指数退避重试，
+    每个聊天独立重试，一个聊天失败不影响其他聊天。
+    全局和每个聊天的限速器在多次 deliver() 调用之间保留，连续推送同一聊天时仍遵守间隔和 retry_after
+
+    Args:
+        bot: telegram.Bot 实例
+        global_rate (float): 全局每秒最多发送的消息数
+        per_chat_interval (float): 同一个聊天两条消息之间的最小间隔（秒）
+        max_retries (int): 每条消息最多重试次数
+    """
+
+    def __init__(self, bot, global_rate=TELEGRAM_GLOBAL_RATE, per_chat_interval=TELEGRAM_PER_CHAT_INTERVAL,
+                 max_retries=TELEGRAM_MAX_RETRIES):
+        self.bot = bot
+        self.per_chat_interval = per_chat_interval
+        self.max_retries = max_retries
+        self._global_limiter = RateLimiter(1.0 / global_rate)
+        self._chat_limiters = {}
+
+    async def _send_message(self, chat_id, text, chat_limiter, report):
+        attempt = 0
+        while True:
+            await chat_limiter.acquire()
+            await self._global_limiter.acquire()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text, disable_web_page_preview=True)
+                report.sent += 1
+                return
+            except (BadRequest, Forbidden):
+                # 聊天不存在、Bot 被移出群组等错误，重试无意义
+                raise
+            except TelegramError as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                report.retries += 1
+                if isinstance(e, RetryAfter):
+                    wait = _retry_after_seconds(e)
+                    logger.warning(f"聊天 {chat_id} 被限流，{wait:.0f} 秒后重试")
+                    chat_limiter.delay(wait)
+                else:
+                    wait = 2 ** attempt
+                    logger.warning(f"发送到聊天 {chat_id} 失败: {e}，{wait} 秒后重试")
+                    await asyncio.sleep(wait)
+
+    async def _deliver_chat(self, chat_id, messages):
+        report = ChatDeliveryReport(chat_id)
+        chat_limiter = self._chat_limiters.setdefault(chat_id, RateLimiter(self.per_chat_interval))
+        start = time.monotonic()
+        try:
+            for text in messages:
+                await self._send_message(chat_id, text, chat_limiter, report)
+        except Exception as e:
+            report.error = e
+            logger.error(f"发送到聊天 {chat_id} 失败: {e}")
+        report.latency = time.monotonic() - start
+        DELIVERY_LATENCY.record(str(chat_id), report.latency)
+        return report
+
+    async def deliver(self, chat_ids, messages):
+        """
+        将消息按顺序发送到所有聊天
+
+        Args:
+            chat_ids (list): 聊天 ID 列表
+            messages (list): 消息文本列表
+
+        Returns:
+            list: 每个聊天的 ChatDeliveryReport
+        """
+        return await asyncio.gather(*(self._deliver_chat(chat_id, messages) for chat_id in chat_ids))
@@ -0,0 +1,69 @@
+from change_detector import ChangeDetector, change_key, content_digest
+
+KEY = change_key("Binance", "browser")
+
+
+def test_commit_after_parse():
+    print("\n=== 测试解析成功后才记录哈希 ===\n")
+    detector = ChangeDetector(max_age=1800)
+    digest = content_digest("<li>ALPHA</li>")
+    assert not detector.check(KEY, digest)
+    # 未 commit 时（解析失败）下次仍完整解析
+    assert not detector.check(KEY, digest)
+    detector.commit(KEY)
+    assert detector.check(KEY, digest)
+    assert not detector.check(KEY, content_digest("<li>BETA</li>"))
+    assert detector.stats()[KEY] == {"unchanged": 1, "not_modified": 0, "changed": 3}
+    print("✅ 内容未变化时跳过解析")
+
+
+def test_api_and_browser_keys():
+    print("\n=== 测试接口抓取和浏览器抓取分别记录 ===\n")
+    detector = ChangeDetector(max_age=1800)
+    api_key = change_key("Binance", "api")
+    digest = content_digest("same")
+    detector.check(api_key, digest)
+    detector.commit(api_key)
+    assert detector.check(api_key, digest)
+    assert not detector.check(KEY, digest)
+    print("✅ 一种抓取方式的哈希不影响另一种")
+
+
+def test_forget_source():
+    print("\n=== 测试存储失败后清除交易所状态 ===\n")
+    detector = ChangeDetector(max_age=1800)
+    keys = [change_key("Binance", "api"), KEY, change_key("OKX", "api")]
+    for key in keys:
+        detector.check(key, "digest", etag='"v1"')
+        detector.commit(key)
+    detector.check(KEY, "pending")
+
+    detector.forget_source("Binance")
+    assert not detector.check(keys[0], "digest")
+    assert detector.conditional_headers(KEY) == {}
+    detector.commit(KEY)
+    assert not detector.check(KEY, "pending")
+    # 其他交易所不受影响
+    assert detector.check(keys[2], "digest")
+    assert detector.conditional_headers(keys[2]) == {"If-None-Match": '"v1"'}
+    print("✅ 只清除该交易所所有抓取方式的状态")
+
+
+def test_max_age_and_disabled():
+    detector = ChangeDetector(max_age=-1)
+    detector.check(KEY, "digest")
+    detector.commit(KEY)
+    assert not detector.check(KEY, "digest")
+
+    detector = ChangeDetector(enabled=False)
+    detector.check(KEY, "digest", etag='"v1"')
+    detector.commit(KEY)
+    assert not detector.check(KEY, "digest")
+    assert detector.conditional_headers(KEY) == {}
+
+
+if __name__ == "__main__":
+    test_commit_after_parse()
+    test_api_and_browser_keys()
+    test_forget_source()
+    test_max_age_and_disabled()
@@ -0,0 +1,49 @@
+import os
+from datetime import datetime, timezone
+
+from exchange_scraper import EXCHANGE_CONFIGS, parse_news_html
+from fixtures import FIXTURE_DIR, load_html_fixture
+from html_parser import available_backends
+
+# 多个列表项共用一个父元素的 Binance 页面，每条公告的时间紧跟在公告链接之后
+SHARED_PARENT_FIXTURE = os.path.join(FIXTURE_DIR, "html", "binance_shared_parent.html")
+
+EXPECTED_SHARED_PARENT = [
+    ("Binance Will List ALPHA (ALPHA)", "2025-03-03 00:00:00 UTC"),
+    ("Binance Will List BETA (BETA)", "2025-03-02 00:00:00 UTC"),
+    ("Binance Will List GAMMA (GAMMA)", "2025-03-01 00:00:00 UTC"),
+    ("Binance Will List DELTA (DELTA)", "2025-02-27 00:00:00 UTC"),
+]
+
+
+def test_shared_parent_time():
+    print("\n=== 测试多个列表项共用父元素时的时间提取 ===\n")
+    with open(SHARED_PARENT_FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+    for backend in available_backends():
+        news_list = parse_news_html(html, EXCHANGE_CONFIGS["Binance"], backend=backend)
+        result = [(news["title"], news["time"]) for news in news_list]
+        assert result == EXPECTED_SHARED_PARENT, (backend, result)
+        print(f"✅ {backend}: {len(result)} 条新闻的时间均正确")
+
+
+def test_backends_agree_on_fixtures():
+    print("\n=== 测试各解析后端对快照的解析结果一致 ===\n")
+    for name, config in EXCHANGE_CONFIGS.items():
+        html = load_html_fixture(name)
+        if html is None:
+            continue
+        # 相对时间（如 "2 days ago"）以同一个抓取时间为基准
+        fetched_at = datetime.now(timezone.utc)
+        results = {backend: parse_news_html(html, config, backend=backend, fetched_at=fetched_at)
+                   for backend in available_backends()}
+        expected = next(iter(results.values()))
+        assert expected and all(news["time"] for news in expected), name
+        for backend, news_list in results.items():
+            assert news_list == expected, (name, backend)
+        print(f"✅ {name}: {len(expected)} 条新闻")
+
+
+if __name__ == "__main__":
+    test_shared_parent_time()
+    test_backends_agree_on_fixtures()
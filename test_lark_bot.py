@@ -0,0 +1,43 @@
+import json
+
+from lark_bot import split_message
+
+
+def encoded_size(text):
+    return len(json.dumps(text))
+
+
+def test_short_message():
+    assert split_message("🚀 Binance\nALPHA 上线\n") == ["🚀 Binance\nALPHA 上线\n"]
+    assert split_message("") == []
+
+
+def test_split_by_line():
+    print("\n=== 测试按行拆分消息 ===\n")
+    lines = [f"📰 第 {index} 条新闻：Binance Will List ALPHA{index}\n" for index in range(200)]
+    message = "".join(lines)
+    chunks = split_message(message, max_bytes=1000)
+    assert len(chunks) > 1
+    assert "".join(chunks) == message
+    for chunk in chunks:
+        assert encoded_size(chunk) <= 1000
+        # 每段都在行尾断开
+        assert chunk.endswith("\n")
+    print(f"✅ {len(lines)} 行拆分为 {len(chunks)} 段")
+
+
+def test_split_long_line():
+    print("\n=== 测试超长单行按字符截断 ===\n")
+    line = "新闻" * 1000
+    chunks = split_message(f"标题\n{line}\n结尾\n", max_bytes=500)
+    assert "".join(chunks) == f"标题\n{line}\n结尾\n"
+    assert all(encoded_size(chunk) <= 500 for chunk in chunks)
+    # 截断时取不超过限制的最长前缀
+    assert all(encoded_size(chunk + line[0]) > 500 for chunk in chunks[1:-2])
+    print(f"✅ 超长单行拆分为 {len(chunks)} 段")
+
+
+if __name__ == "__main__":
+    test_short_message()
+    test_split_by_line()
+    test_split_long_line()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from memory_store import MemoryStore
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def make_store(**kwargs):
+    kwargs.setdefault("max_documents", 0)
+    kwargs.setdefault("max_age", None)
+    kwargs.setdefault("snapshot_path", "")
+    store = MemoryStore(**kwargs)
+    for index, source in enumerate(["Binance", "OKX", "Binance", "Bybit", "Binance"]):
+        store.insert_one({
+            "unique_id": f"id-{index}",
+            "source": source,
+            "title": f"News {index}",
+            "created_at": NOW - timedelta(hours=10 - index),
+            "published_at": NOW - timedelta(days=index),
+            "pending_delivery": index % 2 == 0
+        })
+    return store
+
+
+def titles(documents):
+    return [document["title"] for document in documents]
+
+
+def test_query_sort_limit():
+    print("\n=== 测试查询、排序和数量限制 ===\n")
+    store = make_store()
+    assert store.find_one({"unique_id": "id-3"})["title"] == "News 3"
+    assert store.find_one({"unique_id": "missing"}) is None
+    assert titles(store.find({"unique_id": {"$in": ["id-4", "id-1", "missing"]}})) == ["News 4", "News 1"]
+
+    latest = store.find({"source": "Binance"}).sort("published_at", -1).limit(2)
+    assert titles(latest) == ["News 0", "News 2"]
+    assert titles(store.find({"source": {"$ne": "Binance"}}).sort([("title", 1)])) == ["News 1", "News 3"]
+    assert store.count_documents({"pending_delivery": True}) == 3
+
+    # 投影只返回指定字段
+    assert list(store.find({"unique_id": "id-0"}, {"unique_id": 1, "_id": 0})) == [{"unique_id": "id-0"}]
+    print("✅ 查询、排序和数量限制正确")
+
+
+def test_update_and_upsert():
+    print("\n=== 测试更新和 $setOnInsert ===\n")
+    store = make_store()
+    result = store.update_one({"unique_id": "id-0"}, {"$set": {"pending_delivery": False}})
+    assert result.matched_count == 1 and result.upserted_id is None
+    assert store.find_one({"unique_id": "id-0"})["pending_delivery"] is False
+
+    assert store.update_one({"unique_id": "missing"}, {"$set": {"title": "x"}}).matched_count == 0
+    assert store.find_one({"unique_id": "missing"}) is None
+
+    # 已存在的文档只应用 $set，$setOnInsert 只在插入时生效
+    update = {"$set": {"title": "Updated"}, "$setOnInsert": {"created_at": NOW, "source": "KuCoin"}}
+    store.update_one({"unique_id": "id-1"}, update, upsert=True)
+    existing = store.find_one({"unique_id": "id-1"})
+    assert existing["title"] == "Updated" and existing["source"] == "OKX"
+
+    result = store.update_one({"unique_id": "id-new"}, update, upsert=True)
+    assert result.upserted_id is not None
+    inserted = store.find_one({"unique_id": "id-new"})
+    assert inserted["title"] == "Updated" and inserted["source"] == "KuCoin" and inserted["created_at"] == NOW
+
+    assert store.update_many({"source": "Binance"}, {"$set": {"pending_delivery": False}}).matched_count == 3
+    assert store.count_documents({"pending_delivery": True}) == 0
+    assert store.delete_many({"source": "Binance"}).matched_count == 3
+    assert len(store) == 3 and store.find_one({"unique_id": "id-0"}) is None
+    print("✅ 更新、upsert 和删除正确")
+
+
+def test_created_at_range():
+    print("\n=== 测试按入库时间范围查询 ===\n")
+    store = make_store()
+    since = NOW - timedelta(hours=7, minutes=30)
+    assert titles(store.find({"created_at": {"$gte": since}})) == ["News 3", "News 4"]
+    assert titles(store.find({"created_at": {"$gt": NOW - timedelta(hours=7)}})) == ["News 4"]
+    assert titles(store.find({"created_at": {"$gte": NOW - timedelta(hours=10), "$lt": NOW - timedelta(hours=8)}})) \
+        == ["News 0", "News 1"]
+
+    # 修改 created_at 后按新的入库时间索引
+    store.update_one({"unique_id": "id-0"}, {"$set": {"created_at": NOW}})
+    assert titles(store.find({"created_at": {"$gte": since}})) == ["News 3", "News 4", "News 0"]
+    assert titles(store.data)[0] == "News 1"
+    print("✅ 入库时间范围查询正确")
+
+
+def test_eviction():
+    print("\n=== 测试淘汰最早入库的文档 ===\n")
+    store = make_store(max_documents=3)
+    assert len(store) == 3
+    assert titles(store.data) == ["News 2", "News 3", "News 4"]
+    assert store.find_one({"unique_id": "id-0"}) is None
+    assert store.stats()["evicted"] == 2
+
+    store = make_store(max_age=timedelta(hours=8, minutes=30))
+    assert titles(store.data) == ["News 2", "News 3", "News 4"]
+    print("✅ 按数量和入库时间淘汰正确")
+
+
+def test_snapshot_round_trip():
+    print("\n=== 测试快照保存和恢复 ===\n")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "memory_store.jsonl")
+        store = make_store()
+        store.snapshot_path = path
+        assert store.snapshot()
+
+        restored = MemoryStore(max_documents=0, max_age=None, snapshot_path=path)
+        assert restored.data == store.data
+        # 恢复后新插入的文档不会与快照中的 _id 冲突
+        restored.insert_one({"unique_id": "id-new", "created_at": NOW})
+        assert len({document["_id"] for document in restored.data}) == 6
+
+        restored.clear()
+        reopened = MemoryStore(max_documents=0, max_age=None, snapshot_path=path)
+        assert len(reopened) == 0
+        # 临时目录删除后退出时不再保存快照
+        restored.snapshot_path = reopened.snapshot_path = ""
+    print("✅ 快照保存和恢复正确")
+
+
+if __name__ == "__main__":
+    test_query_sort_limit()
+    test_update_and_upsert()
+    test_created_at_range()
+    test_eviction()
+    test_snapshot_round_trip()
@@ -0,0 +1,47 @@
+import time
+
+from seen_cache import SeenIdCache
+
+
+def test_lru_eviction():
+    print("\n=== 测试按最近使用顺序淘汰 ===\n")
+    cache = SeenIdCache(maxsize=3)
+    cache.add_many(["a", "b", "c"])
+    # 访问 a 后 b 成为最久未使用的
+    assert cache.contains("a")
+    cache.add("d")
+    assert len(cache) == 3
+    assert not cache.contains("b")
+    assert all(cache.contains(unique_id) for unique_id in ("a", "c", "d"))
+    print("✅ 超过容量时淘汰最久未使用的 unique_id")
+
+
+def test_ttl_expiry():
+    print("\n=== 测试过期 ===\n")
+    cache = SeenIdCache(ttl=0.05)
+    cache.add("a")
+    assert cache.contains("a")
+    time.sleep(0.1)
+    assert not cache.contains("a")
+    # 过期的 unique_id 被删除
+    assert len(cache) == 0
+    cache.add("a")
+    assert cache.contains("a")
+    print("✅ 过期的 unique_id 不再命中")
+
+
+def test_stats():
+    cache = SeenIdCache()
+    assert cache.stats()["hit_rate"] is None
+    cache.add("a")
+    cache.contains("a")
+    cache.contains("b")
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+    cache.clear()
+    assert len(cache) == 0 and not cache.contains("a")
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_stats()
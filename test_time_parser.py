@@ -0,0 +1,57 @@
+import contextlib
+import io
+from datetime import datetime, timezone
+
+from bench_time_parser import legacy_format_news_time
+from news_scraper import parse_bybit_announcements
+from time_parser import format_news_time
+
+# (时间文本, 原实现的结果, time_parser 的结果)
+CASES = [
+    ("2025-02-27", "2025-02-27 00:00:00 UTC", "2025-02-27 00:00:00 UTC"),
+    ("2025-03-03 10:41", "2025-03-03 10:41:00 UTC", "2025-03-03 10:41:00 UTC"),
+    ("Published on Feb 20, 2025", "2025-02-20 00:00:00 UTC", "2025-02-20 00:00:00 UTC"),
+    ("Feb 26, 2025", "2025-02-26 00:00:00 UTC", "2025-02-26 00:00:00 UTC"),
+    ("not a date", None, None),
+    ("2025-13-45", None, None),
+]
+
+# Bybit 公告 API 返回毫秒时间戳 1740998460000，即 2025-03-03 10:41:00 UTC
+BYBIT_PUBLISH_TIME = 1740998460000
+BYBIT_TIME = "2025-03-03 10:41:00 UTC"
+
+
+def test_format_news_time():
+    print("\n=== 测试 time_parser 与原实现的解析结果 ===\n")
+    for text, legacy, expected in CASES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert legacy_format_news_time(text) == legacy, text
+        assert format_news_time(text) == expected, text
+        print(f"✅ {text!r} -> {expected}")
+
+
+def test_unparseable_returns_none():
+    for text in (None, "", "   ", "No date found"):
+        assert format_news_time(text) is None, text
+
+
+def test_bybit_epoch():
+    print("\n=== 测试 Bybit 毫秒时间戳 ===\n")
+    data = {"retCode": 0, "result": {"list": [
+        {"title": "New Listing: ALPHA/USDT", "url": "https://announcements.bybit.com/alpha", "publishTime": BYBIT_PUBLISH_TIME}
+    ]}}
+    with contextlib.redirect_stdout(io.StringIO()):
+        news_list = parse_bybit_announcements(data)
+    assert news_list[0]["time"] == BYBIT_TIME
+    # 原实现按服务器本地时区转换时间戳，以下为服务器时区为 UTC 时原实现的结果
+    legacy = datetime.fromtimestamp(BYBIT_PUBLISH_TIME / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    assert legacy == BYBIT_TIME
+    # 存储时 time 字段会再次解析为 published_at，结果不变
+    assert format_news_time(news_list[0]["time"]) == BYBIT_TIME
+    print(f"✅ {BYBIT_PUBLISH_TIME} -> {BYBIT_TIME}")
+
+
+if __name__ == "__main__":
+    test_format_news_time()
+    test_unparseable_returns_none()
+    test_bybit_epoch()
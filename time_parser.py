@@ -0,0 +1,133 @@
+# time_parser.py
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# 缓存最近解析过的时间文本（同一页面的时间在多次轮询之间基本不变）
+TIME_PARSER_CACHE_SIZE = int(os.environ.get('TIME_PARSER_CACHE_SIZE', '4096'))
+
+# 推送和存储使用的统一时间格式
+NEWS_TIME_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+
+MONTHS = {name: index for index, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+RELATIVE_UNITS = {
+    "s": "seconds", "sec": "seconds", "secs": "seconds", "second": "seconds", "seconds": "seconds",
+    "m": "minutes", "min": "minutes", "mins": "minutes", "minute": "minutes", "minutes": "minutes",
+    "h": "hours", "hr": "hours", "hrs": "hours", "hour": "hours", "hours": "hours",
+    "d": "days", "day": "days", "days": "days",
+    "w": "weeks", "week": "weeks", "weeks": "weeks"
+}
+
+_CLOCK = r"(?:[ T](?P<{0}_H>\d{{1,2}}):(?P<{0}_M>\d{{2}})(?::(?P<{0}_S>\d{{2}}))?)?"
+
+# 各交易所使用的时间格式，合并为一个正则，一次匹配即可确定格式
+TIME_PATTERNS = {
+    # 2025-02-27 / 2025-03-03 10:41 / 2025-03-03 10:41:00 UTC
+    "iso": r"(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})" + _CLOCK.format("iso") + r"(?:\s*(?:UTC|Z))?",
+    # 03/12/2025, 03:12:02（KuCoin，月/日/年）
+    "us": r"(?P<us_m>\d{1,2})/(?P<us_d>\d{1,2})/(?P<us_y>\d{4}),?" + _CLOCK.format("us").replace("[ T]", r"\s+"),
+    # Published on Feb 20, 2025 / Feb 26, 2025 / February 26, 2025
+    "month": r"(?:published on\s+)?(?P<month_b>[a-z]{3})[a-z]*\.?\s+(?P<month_d>\d{1,2}),?\s+(?P<month_y>\d{4})",
+    # 1 hours 6 min 16 sec ago / 2 days ago / 3 minutes ago
+    "relative": r"(?P<relative_parts>(?:\d+\s*[a-z]+\s*)+)ago"
+}
+
+TIME_REGEX = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in TIME_PATTERNS.items()), re.IGNORECASE)
+RELATIVE_PART_REGEX = re.compile(r"(\d+)\s*([a-z]+)")
+
+
+def _build_datetime(match, prefix):
+    return datetime(
+        int(match[f"{prefix}_y"]), int(match[f"{prefix}_m"]), int(match[f"{prefix}_d"]),
+        int(match[f"{prefix}_H"] or 0), int(match[f"{prefix}_M"] or 0), int(match[f"{prefix}_S"] or 0),
+        tzinfo=timezone.utc
+    )
+
+
+@lru_cache(maxsize=TIME_PARSER_CACHE_SIZE)
+def _parse_text(text):
+    """
+    解析时间文本，结果与当前时间无关，因此可以缓存
+
+    Returns:
+        tuple: (绝对时间, 相对时间偏移)，无法解析时两者都为 None
+    """
+    match = TIME_REGEX.fullmatch(text.strip())
+    try:
+        if match is None:
+            raise ValueError("未知格式")
+        kind = match.lastgroup
+        if kind == "iso" or kind == "us":
+            return _build_datetime(match, kind), None
+        if kind == "month":
+            month = MONTHS.get(match["month_b"].lower())
+            if month is None:
+                raise ValueError(f"未知月份 {match['month_b']}")
+            return datetime(int(match["month_y"]), month, int(match["month_d"]), tzinfo=timezone.utc), None
+        offsets = {}
+        for value, unit in RELATIVE_PART_REGEX.findall(match["relative_parts"].lower()):
+            if unit not in RELATIVE_UNITS:
+                raise ValueError(f"未知时间单位 {unit}")
+            offsets[RELATIVE_UNITS[unit]] = offsets.get(RELATIVE_UNITS[unit], 0) + int(value)
+        return None, timedelta(**offsets)
+    except ValueError as e:
+        # 同一文本只会记录一次（结果被缓存）
+        logger.warning(f"❌ 无法解析时间: {text}（{e}）")
+        return None, None
+
+
+def parse_news_time(news_time, now=None):
+    """
+    将交易所页面上的时间文本解析为带时区（UTC）的 datetime
+
+    支持的格式：
+    1. '2025-02-27'、'2025-03-03 10:41'、'2025-03-03 10:41:00 UTC'
+    2. 'Published on Feb 20, 2025'、'Feb 26, 2025'
+    3. '03/12/2025, 03:12:02'
+    4. '1 hours 6 min 16 sec ago'、'2 days ago'、'3 minutes ago'
+
+    Args:
+        news_time (str): 时间文本
+        now (datetime): 相对时间的基准，应为抓取页面的时间，默认使用当前 UTC 时间
+
+    Returns:
+        datetime: 解析结果，无法解析时返回 None
+    """
+    if not news_time:
+        return None
+    absolute, offset = _parse_text(news_time)
+    if absolute is not None:
+        return absolute
+    if offset is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    return (now - offset).replace(microsecond=0)
+
+
+def format_news_time(news_time, now=None):
+    """
+    统一处理新闻时间的格式，返回 'YYYY-MM-DD HH:MM:SS UTC'，无法解析时返回 None
+
+    Args:
+        news_time (str): 时间文本，支持的格式见 parse_news_time
+        now (datetime): 相对时间的基准，应为抓取页面的时间
+    """
+    parsed = parse_news_time(news_time, now)
+    return parsed.strftime(NEWS_TIME_FORMAT) if parsed else None
+
+
+def cache_stats():
+    """
+    Returns:
+        dict: 时间文本缓存的命中次数、未命中次数和当前大小
+    """
+    info = _parse_text.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}